@@ -10,10 +10,13 @@ import os
 # Configuration du chemin
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from config import APP_TITLE, APP_ICON, APP_LAYOUT
+from config import APP_TITLE, APP_ICON, APP_LAYOUT, CACHE_DEBUG_ENABLED
 from database.db_setup import init_database
 from services.auth_service import init_session, is_authenticated, is_admin, is_project_manager, is_member
 from components.sidebar import render_sidebar
+from utils.cache import cache_bypass
+from database.identity_map import request_scope
+from services.notification_service import worker as notification_worker
 
 # Pages Admin
 from pages.login import render_login_page
@@ -153,6 +156,9 @@ def main():
     # Initialiser la base de données
     init_database()
     
+    # Envoi des notifications par email en arrière-plan (si un serveur SMTP est configuré)
+    notification_worker.start()
+    
     # Initialiser la session
     init_session()
     
@@ -163,13 +169,25 @@ def main():
         # Navigation avec sidebar
         selected_page = render_sidebar()
         
-        # Router vers la page sélectionnée selon le rôle
-        if is_admin():
-            render_admin_page(selected_page)
-        elif is_project_manager():
-            render_project_manager_page(selected_page)
-        else:
-            render_member_page(selected_page)
+        # Une carte d'identité par exécution: chaque entité n'est lue qu'une fois
+        with request_scope():
+            # ?nocache=1 désactive le cache de lecture pour cette exécution: débogage
+            # réservé aux administrateurs, et seulement si CACHE_DEBUG=1
+            if CACHE_DEBUG_ENABLED and is_admin() and st.query_params.get("nocache") == "1":
+                with cache_bypass():
+                    render_role_page(selected_page)
+            else:
+                render_role_page(selected_page)
+
+
+def render_role_page(page: str):
+    """Route vers la page sélectionnée selon le rôle."""
+    if is_admin():
+        render_admin_page(page)
+    elif is_project_manager():
+        render_project_manager_page(page)
+    else:
+        render_member_page(page)
 
 
 def render_admin_page(page: str):
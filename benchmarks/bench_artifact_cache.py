@@ -0,0 +1,67 @@
+"""
+Benchmark: téléchargements répétés d'un export, reconstruit à chaque fois
+vs relu depuis le cache d'exports (utils/artifact_cache).
+
+Usage:
+    python benchmarks/bench_artifact_cache.py [projets] [tâches_par_projet] [téléchargements]
+"""
+
+import sys
+import tempfile
+import time
+
+from large_db import prepare_environment
+
+projects = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+tasks_per_project = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+downloads = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+db_path = prepare_environment(projects, tasks_per_project)
+
+from database.db_setup import init_database
+from services.job_service import JOB_KINDS
+from utils.artifact_cache import ArtifactCache
+
+init_database()
+
+
+def rebuild(kind, params):
+    handler = JOB_KINDS[kind].handler
+    with tempfile.TemporaryFile() as out:
+        handler(out, params, lambda fraction, message=None: None)
+        return out.tell()
+
+
+def cached(cache, kind, params):
+    job_kind = JOB_KINDS[kind]
+    artifact = cache.get_or_build(
+        kind, params, job_kind.tags,
+        lambda out: job_kind.handler(out, params, lambda fraction, message=None: None),
+        job_kind.suffix
+    )
+    return len(cache.read_bytes(artifact.path))
+
+
+def measure(label, func):
+    started = time.perf_counter()
+    for _ in range(downloads):
+        size = func()
+    seconds = time.perf_counter() - started
+    print(f"  {label:<12} {seconds:7.2f} s  {seconds / downloads * 1000:9.1f} ms/téléchargement  "
+          f"({size / 2 ** 20:.1f} Mo)")
+    return seconds
+
+
+if __name__ == "__main__":
+    print(f"Base: {db_path} ({projects} projets x {tasks_per_project} tâches), "
+          f"{downloads} téléchargements")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ArtifactCache(directory)
+        for kind, params in (('projects_csv', {}), ('team_performance_csv', {}),
+                             ('export_bundle', {'format': 'csv', 'compression': 'zip'})):
+            print(f"\n{JOB_KINDS[kind].label}")
+            slow = measure("reconstruit", lambda: rebuild(kind, params))
+            fast = measure("en cache", lambda: cached(cache, kind, params))
+            print(f"  x{slow / fast:.1f}")
+        stats = cache.stats()
+        print(f"\nTaux de succès {stats['hit_rate']}% ({stats['hits']} succès, "
+              f"{stats['builds']} constructions), {stats['bytes'] / 2 ** 20:.1f} Mo sur disque")
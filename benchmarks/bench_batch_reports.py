@@ -0,0 +1,62 @@
+"""
+Benchmark: rapports PDF de tous les projets, un par un (write_pdf_report:
+requêtes par projet) vs par lots (données préchargées par requêtes
+groupées, mise en page dans un pool de processus).
+
+Usage:
+    python benchmarks/bench_batch_reports.py [projets] [tâches_par_projet] [processus...]
+"""
+
+import io
+import os
+import sys
+import time
+
+from large_db import prepare_environment
+
+projects = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+tasks_per_project = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+worker_counts = [int(arg) for arg in sys.argv[3:]] or sorted({1, 2, min(os.cpu_count() or 1, 4)})
+db_path = prepare_environment(projects, tasks_per_project)
+
+from database import crud
+from database.db_setup import init_database
+from services.report_service import write_pdf_report
+from services.batch_report_service import write_project_reports_zip
+
+init_database()
+
+
+def one_by_one():
+    size = 0
+    for project in crud.get_all_projects():
+        buffer = io.BytesIO()
+        write_pdf_report(buffer, project.id)
+        size += len(buffer.getvalue())
+    return size
+
+
+def batch(workers):
+    def run():
+        buffer = io.BytesIO()
+        write_project_reports_zip(buffer, workers=workers)
+        return len(buffer.getvalue())
+    return run
+
+
+def measure(label, func, reference=None):
+    started = time.perf_counter()
+    size = func()
+    seconds = time.perf_counter() - started
+    speedup = f"  x{reference / seconds:.1f}" if reference else ""
+    print(f"  {label:<22} {seconds:7.2f} s  {projects / seconds:7.1f} rapports/s  "
+          f"({size / 2 ** 20:.1f} Mo){speedup}")
+    return seconds
+
+
+if __name__ == "__main__":
+    print(f"Base: {db_path} ({projects} projets x {tasks_per_project} tâches), "
+          f"{os.cpu_count()} processeurs")
+    reference = measure("un par un", one_by_one)
+    for workers in worker_counts:
+        measure(f"par lots, {workers} processus", batch(workers), reference)
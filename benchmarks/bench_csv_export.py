@@ -0,0 +1,84 @@
+"""
+Benchmark: export CSV matérialisé (listes + StringIO) vs export en flux
+(fetchmany + encodage par blocs), en lignes par seconde et pic mémoire
+Python (tracemalloc, mesuré sur une exécution séparée).
+
+Usage:
+    python benchmarks/bench_csv_export.py [projets] [tâches_par_projet]
+"""
+
+import io
+import csv
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from large_db import prepare_environment
+
+projects = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+tasks_per_project = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+db_path = prepare_environment(projects, tasks_per_project)
+
+from database import crud
+from database.db_setup import init_database
+from services.export_service import (
+    PROJECT_TASKS_HEADER, encode_csv, iter_project_tasks_csv
+)
+
+init_database()
+
+
+def _task_row(task):
+    return (task.id, task.title, task.description or '', task.status, task.priority,
+            task.progress, task.assigned_to_name or 'Non assigné',
+            task.deadline or '', task.created_at or '')
+
+
+def materialized(project_id=None):
+    """Ancienne implémentation: toutes les tâches en liste, puis un seul str."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(PROJECT_TASKS_HEADER)
+    for task in crud.get_all_tasks(project_id=project_id):
+        writer.writerow(_task_row(task))
+    return output.getvalue().encode('utf-8')
+
+
+def streamed(project_id=None):
+    """Export en flux vers un fichier temporaire."""
+    if project_id:
+        chunks = iter_project_tasks_csv(project_id)
+    else:
+        chunks = encode_csv(PROJECT_TASKS_HEADER, (_task_row(t) for t in crud.iter_tasks()))
+    with tempfile.TemporaryFile() as out:
+        for chunk in chunks:
+            out.write(chunk)
+        return out.tell()
+
+
+def measure(label, func, rows):
+    """Débit sur une exécution normale, pic mémoire sur une seconde (tracemalloc ralentit)."""
+    started = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - started
+    size = result if isinstance(result, int) else len(result)
+    del result
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<14} {seconds:7.2f} s  {rows / seconds:10,.0f} lignes/s  "
+          f"pic {peak / 2 ** 20:8.1f} Mo  ({size / 2 ** 20:.1f} Mo de CSV)")
+
+
+if __name__ == "__main__":
+    print(f"Base: {db_path} ({projects} projets x {tasks_per_project} tâches)")
+    project_id = crud.get_all_projects()[0].id
+    for label, scope, rows in (
+        ("Un projet", project_id, tasks_per_project),
+        ("Toutes les tâches", None, projects * tasks_per_project)
+    ):
+        print(f"\n{label} ({rows:,} lignes)")
+        measure("matérialisé", lambda: materialized(scope), rows)
+        measure("en flux", lambda: streamed(scope), rows)
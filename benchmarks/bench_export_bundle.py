@@ -0,0 +1,83 @@
+"""
+Benchmark: sauvegarde complète en fichiers CSV séparés non compressés vs
+archives zip/gzip compressées en flux (taille, durée, temps de transfert).
+
+Usage:
+    python benchmarks/bench_export_bundle.py [projets] [tâches_par_projet] [débit_Mbit/s]
+"""
+
+import sys
+import time
+
+from large_db import prepare_environment
+
+projects = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+tasks_per_project = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+bandwidth = float(sys.argv[3]) if len(sys.argv) > 3 else 10.0
+db_path = prepare_environment(projects, tasks_per_project)
+
+from database import crud
+from database.db_setup import init_database
+from services.export_service import BUNDLE_DATASETS, encode_csv, write_export_bundle
+
+init_database()
+
+
+class CountingSink:
+    """Fichier binaire qui ne garde que le nombre d'octets écrits."""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.size
+
+    def flush(self):
+        pass
+
+
+def separate_csv():
+    sink = CountingSink()
+    for name in BUNDLE_DATASETS:
+        columns, rows = crud.iter_dataset(name)
+        for chunk in encode_csv(columns, rows):
+            sink.write(chunk)
+    return sink.size, None
+
+
+def bundle(fmt, compression):
+    def run():
+        sink = CountingSink()
+        manifest = write_export_bundle(sink, fmt, compression)
+        return sink.size, manifest
+    return run
+
+
+def measure(label, func, reference=None):
+    started = time.perf_counter()
+    size, manifest = func()
+    seconds = time.perf_counter() - started
+    transfer = size * 8 / (bandwidth * 1e6)
+    ratio = f"  x{reference / size:5.1f} vs CSV séparés" if reference else ""
+    if manifest:
+        raw = sum(entry['bytes'] for entry in manifest['datasets'].values())
+        ratio += f", x{raw / size:5.1f} vs contenu brut ({raw / 2 ** 20:.1f} Mo)"
+    print(f"  {label:<16} {size / 2 ** 20:8.2f} Mo  {seconds:6.2f} s  "
+          f"transfert {transfer:7.2f} s{ratio}")
+    return size, manifest
+
+
+if __name__ == "__main__":
+    print(f"Base: {db_path} ({projects} projets x {tasks_per_project} tâches), "
+          f"transfert à {bandwidth:g} Mbit/s")
+    reference, _ = measure("CSV séparés", separate_csv)
+    for label, fmt, compression in (("zip (CSV)", 'csv', 'zip'),
+                                    ("zip (NDJSON)", 'ndjson', 'zip'),
+                                    ("gzip (NDJSON)", 'ndjson', 'gzip')):
+        _, manifest = measure(label, bundle(fmt, compression), reference)
+    rows = {name: entry['rows'] for name, entry in manifest['datasets'].items()}
+    print(f"  lignes: {rows}")
@@ -0,0 +1,50 @@
+"""
+Benchmark: rapport d'un projet en PDF (write_pdf_report) vs en HTML
+autonome (write_html_report), mêmes données, en durée et taille.
+
+Chaque taille de projet est mesurée dans un processus séparé.
+
+Usage:
+    python benchmarks/bench_html_report.py [tâches...]
+"""
+
+import io
+import subprocess
+import sys
+import time
+
+
+def run(tasks: int):
+    """Mesure les deux formats dans ce processus (appelé par main)."""
+    from large_db import prepare_environment
+    prepare_environment(1, tasks, members=20)
+    from database import crud
+    from database.db_setup import init_database
+    from services.report_service import write_pdf_report
+    from services.html_report_service import write_html_report
+    init_database()
+    project_id = crud.get_all_projects()[0].id
+
+    timings = {}
+    for label, write in (("PDF", write_pdf_report), ("HTML", write_html_report)):
+        buffer = io.BytesIO()
+        started = time.perf_counter()
+        write(buffer, project_id)
+        seconds = time.perf_counter() - started
+        timings[label] = seconds
+        print(f"  {label:<5} {seconds:8.3f} s  {tasks / seconds:10,.0f} tâches/s  "
+              f"({len(buffer.getvalue()) / 2 ** 20:.2f} Mo)", flush=True)
+    print(f"  HTML x{timings['PDF'] / timings['HTML']:.1f} plus rapide", flush=True)
+
+
+def main(argv):
+    for tasks in [int(arg) for arg in argv] or [1000, 10000, 100000]:
+        print(f"\nProjet de {tasks:,} tâches", flush=True)
+        subprocess.run([sys.executable, __file__, '--run', str(tasks)], check=True)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--run']:
+        run(int(sys.argv[2]))
+    else:
+        main(sys.argv[1:])
@@ -0,0 +1,94 @@
+"""
+Benchmark: rapport PDF d'un projet avec toutes les tâches dans une seule
+Table (ancienne mise en page) vs tâches lues en flux et mises en page par
+blocs de LongTable (write_pdf_report), en durée, pic mémoire Python
+(tracemalloc, mesuré sur une exécution séparée) et pic mémoire du processus.
+
+Chaque taille de projet est mesurée dans un processus séparé.
+
+Usage:
+    python benchmarks/bench_pdf_report.py [tâches...] [--max-single N]
+
+La mise en page d'une Table unique est quadratique (chaque page redécoupe
+le reste du tableau): elle n'est mesurée que jusqu'à N tâches (10000 par
+défaut).
+"""
+
+import io
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+
+def single_table(project_id):
+    """Ancienne mise en page: toutes les tâches en mémoire, une seule Table."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Table
+    from database import crud
+    from services import report_service as rs
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    tasks = crud.get_all_tasks(project_id=project_id)
+    data = [["Titre", "Assigné à", "Statut", "Prio.", "Avancement", "Deadline"]]
+    data += [rs._task_pdf_row(task) for task in tasks]
+    table = Table(data, colWidths=rs._PDF_TASK_COL_WIDTHS, repeatRows=1)
+    table.setStyle(rs._PDF_TASK_TABLE_STYLE)
+    doc.build([table])
+    return len(buffer.getvalue())
+
+
+def streamed(project_id):
+    """Rapport complet du projet, tâches lues en flux par blocs."""
+    from services.report_service import write_pdf_report
+
+    buffer = io.BytesIO()
+    write_pdf_report(buffer, project_id)
+    return len(buffer.getvalue())
+
+
+def run(tasks: int, mode: str):
+    """Mesure une mise en page dans ce processus (appelé par main)."""
+    from large_db import prepare_environment
+    prepare_environment(1, tasks, members=20)
+    from database import crud
+    from database.db_setup import init_database
+    init_database()
+    project_id = crud.get_all_projects()[0].id
+    func = single_table if mode == 'single' else streamed
+
+    started = time.perf_counter()
+    size = func(project_id)
+    seconds = time.perf_counter() - started
+    tracemalloc.start()
+    func(project_id)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    label = "Table unique" if mode == 'single' else "LongTable/blocs"
+    print(f"  {label:<16} {seconds:8.2f} s  {tasks / seconds:8,.0f} tâches/s  "
+          f"pic Python {peak / 2 ** 20:7.1f} Mo  pic processus {rss:7.1f} Mo  "
+          f"({size / 2 ** 20:.1f} Mo de PDF)", flush=True)
+
+
+def main(argv):
+    max_single = 10000
+    if '--max-single' in argv:
+        index = argv.index('--max-single')
+        max_single = int(argv[index + 1])
+        del argv[index:index + 2]
+    sizes = [int(arg) for arg in argv] or [1000, 10000, 100000]
+    for tasks in sizes:
+        print(f"\nProjet de {tasks:,} tâches", flush=True)
+        modes = ['single', 'streamed'] if tasks <= max_single else ['streamed']
+        for mode in modes:
+            subprocess.run([sys.executable, __file__, '--run', str(tasks), mode], check=True)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--run']:
+        run(int(sys.argv[2]), sys.argv[3])
+    else:
+        main(sys.argv[1:])
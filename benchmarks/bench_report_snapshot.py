@@ -0,0 +1,73 @@
+"""
+Benchmark: rapport de performance de l'équipe avec et sans instantané de
+lecture, pendant qu'un thread ajoute en continu des tâches en retard.
+
+Un rapport est incohérent quand le nombre de tâches en retard des
+statistiques diffère de la longueur de la liste des tâches en retard.
+
+Usage:
+    python benchmarks/bench_report_snapshot.py [projets] [tâches_par_projet] [rapports]
+"""
+
+import sys
+import threading
+import time
+import statistics
+from datetime import date, timedelta
+
+from large_db import prepare_environment
+
+projects = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+tasks_per_project = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+reports = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+db_path = prepare_environment(projects, tasks_per_project)
+
+from database import crud
+from database.db_setup import init_database, get_connection
+from services.report_service import generate_team_performance_report
+
+init_database()
+
+# Sans cache: avec instantané (uncached), et fonction d'origine (__wrapped__)
+with_snapshot = generate_team_performance_report.uncached
+without_snapshot = with_snapshot.__wrapped__
+
+
+def writer(stop: threading.Event, counter):
+    """Ajoute des tâches en retard tant que le benchmark tourne."""
+    project_id = crud.get_all_projects()[0].id
+    deadline = date.today() - timedelta(days=1)
+    while not stop.is_set():
+        crud.create_task(project_id, f"Tâche concurrente {counter[0]}", deadline=deadline)
+        counter[0] += 1
+        time.sleep(0.002)
+
+
+def run(label, report_func):
+    durations, inconsistent = [], 0
+    for _ in range(reports):
+        started = time.perf_counter()
+        report = report_func()
+        durations.append(time.perf_counter() - started)
+        if report['dashboard_stats'].overdue_tasks != len(report['overdue_tasks']):
+            inconsistent += 1
+    print(f"  {label:<22} {statistics.mean(durations) * 1000:8.1f} ms/rapport  "
+          f"incohérents: {inconsistent}/{reports}")
+
+
+if __name__ == "__main__":
+    print(f"Base: {db_path} ({projects} projets x {tasks_per_project} tâches)")
+    stop, counter = threading.Event(), [0]
+    thread = threading.Thread(target=writer, args=(stop, counter), daemon=True)
+    thread.start()
+    try:
+        run("connexions séparées", without_snapshot)
+        run("instantané de lecture", with_snapshot)
+    finally:
+        stop.set()
+        thread.join()
+        conn = get_connection()
+        conn.execute("DELETE FROM tasks WHERE title LIKE 'Tâche concurrente %'")
+        conn.commit()
+        conn.close()
+    print(f"  écritures concurrentes: {counter[0]}")
@@ -0,0 +1,91 @@
+"""
+Benchmark: chargement séquentiel vs concurrent (load_all_sections) des
+sections des pages lourdes, et d'une page de sections dominées par les
+agrégats SQL (le module sqlite3 libère le GIL pendant les requêtes). Le
+gain dépend du nombre de cœurs: avec un seul, le pool n'a qu'un thread.
+
+Usage:
+    python benchmarks/bench_section_loader.py [projets] [tâches_par_projet]
+"""
+
+import os
+import sys
+import time
+import statistics
+
+from large_db import prepare_environment
+
+projects = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+tasks_per_project = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+db_path = prepare_environment(projects, tasks_per_project)
+
+from database import crud
+from services.progress_service import (
+    get_dashboard_statistics, get_all_members_performance, get_team_velocity,
+    get_progress_over_time, get_workload_distribution
+)
+from services.evm_service import get_portfolio_evm
+from services.time_service import get_time_summary
+from config import SECTION_LOADER_WORKERS
+from utils.section_loader import load_all_sections
+
+PAGES = {
+    'Tableau de bord admin': {
+        'stats': get_dashboard_statistics,
+        'projects': crud.get_all_projects,
+        'velocity': get_team_velocity,
+        'performances': get_all_members_performance,
+        'overdue_tasks': crud.get_overdue_tasks
+    },
+    'Rapports (analyses)': {
+        'progress': lambda: get_progress_over_time(days=30),
+        'performance': get_all_members_performance,
+        'evm': get_portfolio_evm,
+        'time': lambda: get_time_summary(days=30),
+        'workload': get_workload_distribution
+    },
+    'Agrégats SQL': {
+        'stats': get_dashboard_statistics,
+        'progress_30': lambda: get_progress_over_time(days=30),
+        'progress_90': lambda: get_progress_over_time(days=90),
+        'velocity': get_team_velocity,
+        'performance': get_all_members_performance,
+        'workload': get_workload_distribution
+    }
+}
+REPEAT = 3
+
+
+def sequential(calls):
+    timings = {}
+    for name, func in calls.items():
+        started = time.perf_counter()
+        func()
+        timings[name] = time.perf_counter() - started
+    return timings
+
+
+def concurrent(calls):
+    return {name: r.seconds for name, r in load_all_sections(calls, timeout=600).items()}
+
+
+def measure(runner, calls):
+    totals = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        timings = runner(calls)
+        totals.append(time.perf_counter() - started)
+    return statistics.median(totals), timings
+
+
+if __name__ == "__main__":
+    print(f"Base: {db_path} ({projects} projets x {tasks_per_project} tâches)")
+    print(f"Cœurs: {os.cpu_count()}, threads du pool: {SECTION_LOADER_WORKERS}")
+    for page, calls in PAGES.items():
+        seq_total, seq_timings = measure(sequential, calls)
+        con_total, _ = measure(concurrent, calls)
+        print(f"\n{page}")
+        for name, seconds in seq_timings.items():
+            print(f"  {name:<15} {seconds * 1000:9.1f} ms")
+        print(f"  {'séquentiel':<15} {seq_total * 1000:9.1f} ms")
+        print(f"  {'concurrent':<15} {con_total * 1000:9.1f} ms  (x{seq_total / con_total:.2f})")
@@ -0,0 +1,110 @@
+"""
+Benchmark: résumés hebdomadaires de tous les chefs de projet, un par un
+(requêtes par chef de projet et par projet suivi) vs en une passe
+(build_weekly_digests: requêtes groupées par projet).
+
+Usage:
+    python benchmarks/bench_weekly_digests.py [chefs_de_projet] [projets_par_chef]
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from large_db import prepare_environment
+
+managers = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+projects_per_manager = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+db_path = prepare_environment(500, 50, path=os.path.join(
+    tempfile.gettempdir(), f"gp_bench_digests_{managers}x{projects_per_manager}.db"
+))
+
+from database import crud
+from database.db_setup import init_database
+from services.progress_service import calculate_project_health
+from services.digest_service import (
+    build_weekly_digests, build_manager_digest, render_digest_message, digest_week
+)
+from config import DIGEST_OVERDUE_LIMIT, DIGEST_VELOCITY_WEEKS
+
+init_database()
+
+
+def add_managers():
+    """Ajoute les chefs de projet, chacun membre de quelques projets (une seule fois)."""
+    conn = sqlite3.connect(db_path)
+    if conn.execute("SELECT COUNT(*) FROM users WHERE role = 'project_manager'").fetchone()[0] < managers:
+        rng = random.Random(42)
+        password_hash = conn.execute("SELECT password_hash FROM users LIMIT 1").fetchone()[0]
+        project_ids = [row[0] for row in conn.execute("SELECT id FROM projects")]
+        for i in range(managers):
+            cursor = conn.execute('''
+                INSERT INTO users (username, email, password_hash, role, full_name)
+                VALUES (?, ?, ?, 'project_manager', ?)
+            ''', (f"bench.pm{i}", f"pm{i}@test.com", password_hash, f"Chef de projet {i}"))
+            conn.executemany("INSERT INTO project_members (project_id, user_id) VALUES (?, ?)",
+                             [(pid, cursor.lastrowid) for pid in rng.sample(project_ids, projects_per_manager)])
+        conn.commit()
+    conn.close()
+
+
+def project_digest(project_id):
+    """Données d'un projet avec les fonctions par projet existantes."""
+    today = date.today().isoformat()
+    now = datetime.now()
+    tasks = crud.get_all_tasks(project_id=project_id)
+    velocity = [0] * DIGEST_VELOCITY_WEEKS
+    for task in tasks:
+        if task.status == 'COMPLETED' and task.completed_at:
+            week = (now - datetime.fromisoformat(str(task.completed_at))) // timedelta(days=7)
+            if 0 <= week < DIGEST_VELOCITY_WEEKS:
+                velocity[DIGEST_VELOCITY_WEEKS - 1 - week] += 1
+    return {
+        'project': crud.get_project_by_id(project_id),
+        'stats': crud.get_project_stats(project_id),
+        'blocked_tasks': sum(task.status == 'BLOCKED' for task in tasks),
+        'overdue': sorted((task for task in tasks
+                           if task.deadline and str(task.deadline) < today and task.status != 'COMPLETED'),
+                          key=lambda task: (str(task.deadline), task.id))[:DIGEST_OVERDUE_LIMIT],
+        'velocity': velocity,
+        'health': calculate_project_health(project_id)
+    }
+
+
+def one_by_one(outbox):
+    week = digest_week()
+    os.makedirs(outbox, exist_ok=True)
+    count = 0
+    for user in crud.get_all_users(role='project_manager'):
+        project_ids = [project.id for project in crud.get_user_projects(user.id)]
+        projects = {project_id: project_digest(project_id) for project_id in project_ids}
+        message = render_digest_message(build_manager_digest(user, project_ids, projects), week)
+        with open(os.path.join(outbox, f"{user.id}.eml"), 'wb') as out:
+            out.write(message.as_bytes())
+        count += 1
+    return count
+
+
+def one_pass(outbox):
+    return len(build_weekly_digests(outbox)['written'])
+
+
+def measure(label, func, reference=None):
+    outbox = tempfile.mkdtemp()
+    started = time.perf_counter()
+    count = func(outbox)
+    seconds = time.perf_counter() - started
+    speedup = f"  x{reference / seconds:.1f}" if reference else ""
+    print(f"  {label:<12} {seconds:7.2f} s  {count / seconds:8.0f} résumés/s{speedup}")
+    return seconds
+
+
+if __name__ == "__main__":
+    add_managers()
+    print(f"Base: {db_path} ({managers} chefs de projet x {projects_per_manager} projets)")
+    reference = measure("un par un", one_by_one)
+    measure("une passe", one_pass, reference)
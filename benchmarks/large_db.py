@@ -0,0 +1,121 @@
+"""
+Génération d'une base de données volumineuse pour les benchmarks.
+
+Usage dans un script de benchmark (avant tout import de l'application):
+
+    from large_db import prepare_environment
+    db_path = prepare_environment(projects=500, tasks_per_project=200)
+"""
+
+import os
+import random
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATUSES = ['TODO', 'IN_PROGRESS', 'REVIEW', 'COMPLETED', 'BLOCKED']
+PRIORITIES = ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL']
+
+
+def prepare_environment(projects: int = 500, tasks_per_project: int = 200, members: int = 100,
+                        seed: int = 42, path: str = None) -> str:
+    """
+    Crée (ou réutilise) une base volumineuse et y pointe l'application.
+
+    Les caches de lecture sont désactivés pour mesurer les accès réels.
+    Doit être appelée avant l'import des modules de l'application.
+    """
+    path = path or os.path.join(
+        tempfile.gettempdir(), f"gp_bench_{projects}x{tasks_per_project}_{members}.db"
+    )
+    os.environ["DATABASE_PATH"] = path
+    os.environ.setdefault("READ_CACHE", "0")
+    os.environ.setdefault("SHARED_CACHE", "0")
+    if BASE_DIR not in sys.path:
+        sys.path.insert(0, BASE_DIR)
+
+    if not os.path.exists(path):
+        generate(path, projects, tasks_per_project, members, seed)
+    return path
+
+
+def generate(path: str, projects: int, tasks_per_project: int, members: int, seed: int = 42):
+    """Remplit une nouvelle base avec des projets, milestones, tâches et temps saisis."""
+    from database import db_setup
+    db_setup.DATABASE_PATH = path
+    db_setup.init_database()
+
+    rng = random.Random(seed)
+    conn = db_setup.get_connection()
+    cursor = conn.cursor()
+    password_hash = cursor.execute("SELECT password_hash FROM users LIMIT 1").fetchone()[0]
+
+    cursor.executemany('''
+        INSERT INTO users (username, email, password_hash, role, full_name)
+        VALUES (?, ?, ?, 'member', ?)
+    ''', [(f"bench.user{i}", f"bench{i}@test.com", password_hash, f"Membre {i}")
+          for i in range(members)])
+    user_ids = [row[0] for row in cursor.execute("SELECT id FROM users WHERE role = 'member'")]
+
+    today = date.today()
+    now = datetime.now()
+    for p in range(projects):
+        start = today - timedelta(days=rng.randint(30, 365))
+        end = start + timedelta(days=rng.randint(60, 540))
+        cursor.execute('''
+            INSERT INTO projects (name, description, start_date, end_date, status, budget, created_by)
+            VALUES (?, ?, ?, ?, ?, ?, 1)
+        ''', (f"Projet {p}", f"Projet de benchmark {p}", start.isoformat(), end.isoformat(),
+              rng.choice(['NOT_STARTED', 'IN_PROGRESS', 'IN_PROGRESS', 'COMPLETED']),
+              rng.choice([None, rng.randint(5, 500) * 1000])))
+        project_id = cursor.lastrowid
+
+        milestone_ids = []
+        for m in range(rng.randint(0, 5)):
+            cursor.execute('''
+                INSERT INTO milestones (project_id, name, due_date) VALUES (?, ?, ?)
+            ''', (project_id, f"Jalon {m}", (start + timedelta(days=30 * (m + 1))).isoformat()))
+            milestone_ids.append(cursor.lastrowid)
+
+        team = rng.sample(user_ids, min(len(user_ids), rng.randint(3, 10)))
+        cursor.executemany('''
+            INSERT OR IGNORE INTO project_members (project_id, user_id) VALUES (?, ?)
+        ''', [(project_id, u) for u in team])
+
+        tasks = []
+        for t in range(tasks_per_project):
+            status = rng.choice(STATUSES)
+            created = now - timedelta(days=rng.randint(1, 300), minutes=rng.randint(0, 1440))
+            completed = (created + timedelta(days=rng.randint(1, 60))).isoformat() \
+                if status == 'COMPLETED' else None
+            tasks.append((
+                project_id, rng.choice(milestone_ids) if milestone_ids and rng.random() < 0.7 else None,
+                f"Tâche {p}-{t}", rng.choice(PRIORITIES), status,
+                100 if status == 'COMPLETED' else rng.randint(0, 90),
+                rng.choice(team) if rng.random() < 0.9 else None,
+                (today + timedelta(days=rng.randint(-60, 120))).isoformat(),
+                rng.choice([None, rng.randint(1, 40)]),
+                created.isoformat(sep=' ', timespec='seconds'), completed
+            ))
+        cursor.executemany('''
+            INSERT INTO tasks (project_id, milestone_id, title, priority, status, progress,
+                               assigned_to, deadline, estimated_hours, created_at, completed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', tasks)
+
+    # Temps saisis: quelques entrées par tâche commencée
+    cursor.execute('''
+        INSERT INTO time_entries (task_id, user_id, project_id, started_at, duration_hours, note, created_at)
+        SELECT id, assigned_to, project_id,
+               strftime('%Y-%m-%dT%H:%M:%S', created_at, '+' || (id % 20) || ' days'),
+               (id % 8) + 0.5, NULL, strftime('%Y-%m-%dT%H:%M:%S', 'now')
+        FROM tasks WHERE status != 'TODO' AND assigned_to IS NOT NULL
+    ''')
+    cursor.execute("DELETE FROM task_status_history")
+    db_setup.backfill_status_history(cursor)
+    db_setup.rebuild_time_rollups(cursor)
+    conn.commit()
+    cursor.execute("ANALYZE")
+    conn.close()
@@ -458,6 +458,158 @@ def create_completion_rate_chart(data: List[Dict[str, Any]]) -> go.Figure:
     return fig
 
 
+def create_evm_chart(data: List[Dict[str, Any]], title: str = "Valeur acquise par projet") -> go.Figure:
+    """
+    Crée un graphique comparant PV, EV et AC par projet.
+    """
+    if not data:
+        return go.Figure()
+    
+    df = pd.DataFrame(data)
+    
+    fig = go.Figure()
+    
+    series = [
+        ('planned_value', 'Valeur planifiée (PV)', COLORS['gray']),
+        ('earned_value', 'Valeur acquise (EV)', COLORS['success']),
+        ('actual_cost', 'Coût réel (AC)', COLORS['warning'])
+    ]
+    for column, label, color in series:
+        fig.add_trace(go.Bar(
+            name=label,
+            x=df['name'],
+            y=df[column],
+            marker_color=color,
+            hovertemplate='%{x}<br>' + label + ': %{y:,.0f} €<extra></extra>'
+        ))
+    
+    fig.update_layout(
+        title=title,
+        xaxis_title="",
+        yaxis_title="Montant (€)",
+        barmode='group',
+        height=400,
+        margin=dict(l=20, r=20, t=50, b=20),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1)
+    )
+    
+    fig.update_xaxes(showgrid=False)
+    fig.update_yaxes(showgrid=True, gridcolor='rgba(0,0,0,0.1)')
+    
+    return fig
+
+
+def create_capacity_heatmap(data: Dict[str, Any], title: str = "Charge planifiée par semaine") -> go.Figure:
+    """
+    Crée une heatmap membres × semaines de la charge planifiée (% de la capacité).
+    """
+    if not data or not data['members']:
+        return go.Figure()
+    
+    fig = go.Figure(data=go.Heatmap(
+        z=data['load'],
+        x=data['weeks'],
+        y=data['members'],
+        customdata=data['hours'],
+        colorscale=[
+            [0.0, '#f7fafc'],
+            [0.5, COLORS['success']],
+            [0.75, COLORS['warning']],
+            [1.0, COLORS['danger']]
+        ],
+        zmin=0,
+        zmax=200,
+        colorbar=dict(title="% capacité"),
+        hovertemplate='%{y}<br>Semaine du %{x}<br>%{customdata:.1f} h (%{z:.0f}%)<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=f"{title} (capacité {data['capacity']:.0f} h/semaine)",
+        xaxis_title="Semaine",
+        yaxis_title="",
+        height=min(max(300, len(data['members']) * 25), 2000),
+        margin=dict(l=150, r=20, t=50, b=20),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    
+    fig.update_yaxes(autorange='reversed')
+    
+    return fig
+
+
+def create_cumulative_flow_chart(data: Dict[str, Any], title: str = "Flux cumulé des tâches") -> go.Figure:
+    """
+    Crée un diagramme de flux cumulé (aires empilées par statut).
+    """
+    if not data or not data['dates']:
+        return go.Figure()
+    
+    fig = go.Figure()
+    
+    # Statuts terminés en bas de la pile, à faire en haut
+    for status in ['COMPLETED', 'REVIEW', 'IN_PROGRESS', 'BLOCKED', 'TODO']:
+        if status not in data['series']:
+            continue
+        fig.add_trace(go.Scatter(
+            x=data['dates'],
+            y=data['series'][status],
+            name=TASK_STATUS.get(status, status),
+            mode='lines',
+            stackgroup='flow',
+            line=dict(width=0.5, color=STATUS_COLORS.get(status, COLORS['gray'])),
+            hovertemplate='%{x}<br>' + TASK_STATUS.get(status, status) + ': %{y}<extra></extra>'
+        ))
+    
+    fig.update_layout(
+        title=title,
+        xaxis_title="Date",
+        yaxis_title="Nombre de tâches",
+        height=350,
+        margin=dict(l=20, r=20, t=50, b=20),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1)
+    )
+    
+    fig.update_xaxes(showgrid=False)
+    fig.update_yaxes(showgrid=True, gridcolor='rgba(0,0,0,0.1)')
+    
+    return fig
+
+
+def create_time_logged_chart(data: List[Dict[str, Any]], title: str = "Temps saisi par jour") -> go.Figure:
+    """
+    Crée un histogramme des heures saisies par jour.
+    """
+    if not data:
+        return go.Figure()
+    
+    fig = go.Figure(go.Bar(
+        x=[d['date'] for d in data],
+        y=[d['hours'] for d in data],
+        marker_color=COLORS['primary'],
+        hovertemplate='%{x}<br>%{y:.1f} h<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=title,
+        xaxis_title="Date",
+        yaxis_title="Heures",
+        height=300,
+        margin=dict(l=20, r=20, t=50, b=20),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    
+    fig.update_xaxes(showgrid=False)
+    fig.update_yaxes(showgrid=True, gridcolor='rgba(0,0,0,0.1)')
+    
+    return fig
+
+
 def create_dashboard_metrics() -> Dict[str, go.Figure]:
     """
     Crée un ensemble de graphiques pour le tableau de bord.
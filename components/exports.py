@@ -0,0 +1,142 @@
+"""
+Téléchargements préparés en arrière-plan (préparer, suivre, télécharger).
+
+Un export coûteux (PDF, sauvegarde) n'est construit que lorsque
+l'utilisateur clique sur « Préparer »: la demande est ajoutée à la file des
+travaux (services/job_service) et la page affiche l'avancement dans un
+fragment qui consulte l'état du travail toutes les JOB_POLL_SECONDS
+secondes, sans bloquer la session. Le fichier produit reste disponible:
+la liste « Mes exports » permet de revenir le télécharger plus tard.
+Si les données changent après la préparation, le bouton de préparation
+est proposé à nouveau.
+"""
+
+from typing import Any, Dict
+import streamlit as st
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.auth_service import get_current_user_id
+from services.job_service import (
+    submit_report_job, get_report_job, get_user_report_jobs, is_job_outdated,
+    read_job_artifact, get_job_label
+)
+from database.models import ReportJob
+from config import JOB_STATUS, JOB_POLL_SECONDS
+
+
+def render_job_download(key: str, kind: str, params: Dict[str, Any], label: str,
+                        file_name: str, prepare_label: str = "⚙️ Préparer l'export"):
+    """
+    Affiche le bouton de préparation d'un export, puis son avancement et
+    le bouton de téléchargement.
+
+    Args:
+        key: identifiant de l'export dans la session (jeu de données + paramètres)
+        kind: type de travail (services.job_service.JOB_KINDS)
+        params: paramètres du travail
+        label, file_name: paramètres de st.download_button
+    """
+    state_key = f"_export_job_{key}"
+    job_id = st.session_state.get(state_key)
+    job = get_report_job(job_id) if job_id else None
+
+    if job is None or job.status in ('FAILED', 'EXPIRED') or \
+            (job.status == 'DONE' and is_job_outdated(job)):
+        if job is not None and job.status == 'FAILED':
+            st.error(f"Échec de la préparation: {job.error}")
+        elif job is not None and job.status == 'DONE':
+            st.caption("Les données ont changé depuis la préparation.")
+        elif job is not None and job.status == 'EXPIRED':
+            st.caption("Le fichier préparé n'est plus disponible.")
+        if not st.button(prepare_label, key=f"prepare_{key}"):
+            return
+        job_id = submit_report_job(kind, params, get_current_user_id(), file_name)
+        st.session_state[state_key] = job_id
+
+    render_job_status(job_id, label, key)
+
+
+def render_job_status(job_id: int, label: str = None, key: str = ""):
+    """Avancement d'un travail (actualisé tant qu'il est en cours), puis son résultat."""
+    job = get_report_job(job_id)
+    if job is None:
+        return
+    if not job.is_active:
+        _render_job_result(job, label, key)
+        return
+
+    @st.fragment(run_every=JOB_POLL_SECONDS)
+    def poll():
+        current = get_report_job(job_id)
+        if current is None or not current.is_active:
+            # Réexécution complète: le fragment n'a plus à être actualisé
+            st.rerun()
+        _render_job_progress(current)
+
+    poll()
+
+
+def render_job_list(user_id: int, limit: int = 10):
+    """Derniers exports de l'utilisateur, avec leur avancement ou leur fichier."""
+    jobs = get_user_report_jobs(user_id, limit)
+    if not jobs:
+        st.caption("Aucun export demandé.")
+        return
+
+    def show(jobs):
+        for job in jobs:
+            col1, col2 = st.columns([3, 2])
+            with col1:
+                st.markdown(f"**{get_job_label(job)}** · {job.file_name or ''}")
+                st.caption(f"Demandé le {str(job.created_at)[:16].replace('T', ' ')}")
+            with col2:
+                if job.is_active:
+                    _render_job_progress(job)
+                else:
+                    _render_job_result(job, "📥 Télécharger", "list")
+
+    if not any(job.is_active for job in jobs):
+        show(jobs)
+        return
+
+    @st.fragment(run_every=JOB_POLL_SECONDS)
+    def poll():
+        current = get_user_report_jobs(user_id, limit)
+        if not any(job.is_active for job in current):
+            st.rerun()
+        show(current)
+
+    poll()
+
+
+def _render_job_progress(job: ReportJob):
+    text = JOB_STATUS[job.status]
+    if job.message:
+        text += f" · {job.message}"
+    st.progress(min(max(job.progress, 0.0), 1.0), text=text)
+
+
+def _read_artifact(job_id: int) -> bytes:
+    """Contenu du fichier au moment du téléchargement (jamais un fichier vide à la place)."""
+    data = read_job_artifact(job_id)
+    if data is None:
+        raise FileNotFoundError("Le fichier n'est plus disponible: préparez l'export à nouveau.")
+    return data
+
+
+def _render_job_result(job: ReportJob, label: str, key: str):
+    if job.status == 'DONE':
+        size = f" ({job.artifact_size / 1024:,.0f} Ko)" if job.artifact_size else ""
+        st.download_button(
+            f"{label or '📥 Télécharger'}{size}",
+            data=lambda: _read_artifact(job.id),
+            file_name=job.file_name or f"export_{job.id}",
+            mime=job.mime,
+            key=f"download_job_{job.id}_{key}"
+        )
+    elif job.status == 'FAILED':
+        st.error(f"Échec: {job.error}")
+    else:
+        st.caption(f"{JOB_STATUS.get(job.status, job.status)}: fichier supprimé.")
@@ -141,7 +141,7 @@ def render_task_form(task: Optional[Task] = None,
             # Sélection du membre
             if members:
                 member_options = [None] + [m.id for m in members]
-                member_labels = ["Non assigné"] + [m.full_name or m.username for m in members]
+                member_labels = {m.id: m.full_name or m.username for m in members}
                 current_member_idx = 0
                 if task and task.assigned_to:
                     try:
@@ -151,7 +151,7 @@ def render_task_form(task: Optional[Task] = None,
                 assigned_to = st.selectbox(
                     "Assigné à",
                     options=member_options,
-                    format_func=lambda x: member_labels[member_options.index(x)],
+                    format_func=lambda x: member_labels.get(x, "Non assigné"),
                     index=current_member_idx,
                     key=f"{key_prefix}_assigned"
                 )
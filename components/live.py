@@ -0,0 +1,73 @@
+"""
+Sections de tableau de bord rafraîchies automatiquement (fragments Streamlit).
+
+Chaque section est un fragment réexécuté toutes les DASHBOARD_REFRESH_SECONDS
+secondes indépendamment du reste de la page. À chaque tick, seul le jeton
+de modification des tables lues par la section est consulté (PRAGMA
+data_version, puis les compteurs de change_counters si une écriture a eu
+lieu): les données ne sont rechargées que si ce jeton a changé.
+"""
+
+import time
+from datetime import datetime
+from typing import Any, Callable, Iterable
+import streamlit as st
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.cache import change_token
+from database.identity_map import request_scope
+from config import DASHBOARD_REFRESH_SECONDS, DASHBOARD_MAX_DATA_AGE
+
+
+def load_live_data(key: str, tags: Iterable[str], loader: Callable[[], Any],
+                   token: Callable[[], Any] = None) -> Any:
+    """
+    Retourne les données d'une section, rechargées seulement si les tables ont changé.
+
+    Les données sont conservées dans la session; elles sont aussi rechargées
+    au-delà de DASHBOARD_MAX_DATA_AGE secondes (retards calculés à la date du jour).
+    Une fonction token peut remplacer le jeton de modification des tables.
+    """
+    token = token() if token else change_token(*tags)
+    sections = st.session_state.setdefault('_live_sections', {})
+    entry = sections.get(key)
+    if (entry is None or token is None or entry['token'] != token
+            or time.monotonic() - entry['loaded'] > DASHBOARD_MAX_DATA_AGE):
+        entry = {'token': token, 'data': loader(), 'loaded': time.monotonic(),
+                 'loaded_at': datetime.now()}
+        sections[key] = entry
+    return entry['data']
+
+
+def live_section(key: str, tags: Iterable[str], loader: Callable[[], Any],
+                 render: Callable[[Any], None], run_every: float = DASHBOARD_REFRESH_SECONDS,
+                 token: Callable[[], Any] = None):
+    """
+    Affiche une section dans un fragment rafraîchi automatiquement.
+
+    Args:
+        key: identifiant de la section (unique dans la session)
+        tags: tables lues par la section
+        loader: fonction de chargement des données
+        render: fonction d'affichage recevant les données
+        token: jeton de fraîcheur à utiliser à la place de celui des tables
+    """
+    tags = tuple(tags)
+
+    @st.fragment(run_every=run_every)
+    def section():
+        # Une réexécution du fragment est une exécution à part entière
+        with request_scope():
+            render(load_live_data(key, tags, loader, token))
+
+    section()
+
+
+def render_refresh_caption(key: str):
+    """Affiche l'heure du dernier chargement des données d'une section."""
+    entry = st.session_state.get('_live_sections', {}).get(key)
+    if entry:
+        st.caption(f"🔄 Données du {entry['loaded_at'].strftime('%d/%m/%Y %H:%M:%S')}, "
+                   f"actualisation automatique toutes les {DASHBOARD_REFRESH_SECONDS} s")
@@ -8,7 +8,9 @@ import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # Configuration de la base de données
-DATABASE_PATH = os.path.join(BASE_DIR, "database", "gestion_projets.db")
+DATABASE_PATH = os.environ.get(
+    "DATABASE_PATH", os.path.join(BASE_DIR, "database", "gestion_projets.db")
+)
 
 # Rôles utilisateurs
 ROLE_ADMIN = "admin"
@@ -55,6 +57,42 @@ MILESTONE_STATUS = {
     "COMPLETED": "Terminé"
 }
 
+# Capacité hebdomadaire d'un membre (heures)
+WEEKLY_CAPACITY_HOURS = 35
+
+# Cache de lecture des services (READ_CACHE=0 pour le désactiver)
+READ_CACHE_ENABLED = os.environ.get("READ_CACHE", "1") != "0"
+READ_CACHE_MAX_ENTRIES = 512
+READ_CACHE_TTL_SECONDS = 60
+# ?nocache=1 (administrateurs uniquement) contourne le cache de lecture:
+# réservé au débogage (CACHE_DEBUG=1 pour l'autoriser)
+CACHE_DEBUG_ENABLED = os.environ.get("CACHE_DEBUG", "0") == "1"
+
+# Cache partagé entre les processus Streamlit d'un même hôte (SHARED_CACHE=0 pour le désactiver)
+SHARED_CACHE_ENABLED = os.environ.get("SHARED_CACHE", "1") != "0"
+SHARED_CACHE_PATH = os.environ.get(
+    "SHARED_CACHE_PATH", os.path.join(BASE_DIR, "database", "shared_cache.db")
+)
+SHARED_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Annuaire des utilisateurs en mémoire: intervalle de vérification des
+# modifications faites par les autres processus (secondes)
+USER_DIRECTORY_CHECK_SECONDS = 0.5
+
+# Actualisation automatique des tableaux de bord (secondes)
+DASHBOARD_REFRESH_SECONDS = 5
+DASHBOARD_MAX_DATA_AGE = 300
+
+# Instantané du tableau de bord administrateur: reconstruit en arrière-plan
+# toutes les DASHBOARD_SNAPSHOT_INTERVAL secondes ou dès qu'une table change
+DASHBOARD_SNAPSHOT_INTERVAL = 60
+DASHBOARD_SNAPSHOT_POLL_SECONDS = 1
+
+# Chargement concurrent des sections de page: threads (un par cœur, les
+# lectures SQLite libèrent le GIL) et délai maximal par section
+SECTION_LOADER_WORKERS = min(os.cpu_count() or 1, 6)
+SECTION_TIMEOUT_SECONDS = 20
+
 # Configuration de l'interface
 APP_TITLE = "Gestion de Projets"
 APP_ICON = "🎯"
@@ -69,3 +107,84 @@ THEME_COLORS = {
     "danger": "#f56565",
     "info": "#4299e1"
 }
+
+# Exports en flux: lignes lues par fetchmany, taille des blocs encodés et
+# niveau de compression des sauvegardes (zip/gzip, 1 à 9)
+EXPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_BYTES = 64 * 1024
+EXPORT_COMPRESSION_LEVEL = 6
+
+# Rapports PDF: lignes par bloc de tableau (LongTable) mis en page à la fois
+PDF_TABLE_CHUNK_ROWS = 500
+
+# Rapports PDF par lots: processus de mise en page, et projets chargés par
+# requêtes groupées à la fois
+BATCH_REPORT_WORKERS = min(os.cpu_count() or 1, 4)
+BATCH_REPORT_PREFETCH = 50
+
+# Travaux d'export en arrière-plan: threads d'exécution, intervalle de
+# consultation de la file, durée pendant laquelle un travail terminé donne
+# accès à son fichier, délai au-delà duquel un travail sans nouvelles est
+# abandonné
+JOB_STATUS = {
+    "QUEUED": "En attente",
+    "RUNNING": "En cours",
+    "DONE": "Terminé",
+    "FAILED": "Échec",
+    "EXPIRED": "Expiré"
+}
+JOB_WORKERS = 2
+JOB_POLL_SECONDS = 1
+JOB_ARTIFACT_TTL_SECONDS = 24 * 3600
+JOB_CLEANUP_INTERVAL = 300
+JOB_STALE_SECONDS = 600
+
+# Cache des fichiers d'export (adressé par contenu): répertoire et taille maximale
+ARTIFACT_CACHE_DIR = os.environ.get(
+    "ARTIFACT_CACHE_DIR", os.path.join(BASE_DIR, "database", "artifacts")
+)
+ARTIFACT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Résumés hebdomadaires des chefs de projet: boîte d'envoi locale (un
+# fichier .eml par destinataire et par semaine), expéditeur, tâches en
+# retard listées par projet et nombre de semaines de vélocité
+DIGEST_OUTBOX_DIR = os.environ.get(
+    "DIGEST_OUTBOX_DIR", os.path.join(BASE_DIR, "database", "outbox")
+)
+DIGEST_SENDER = os.environ.get("DIGEST_SENDER", "noreply@gestion-projets.local")
+DIGEST_OVERDUE_LIMIT = 10
+DIGEST_VELOCITY_WEEKS = 4
+
+# Notifications par email: serveur SMTP (sans SMTP_HOST, rien n'est envoyé
+# et les notifications restent dans la boîte d'envoi), identifiants et
+# STARTTLS facultatifs, délai des opérations réseau en secondes
+SMTP_HOST = os.environ.get("SMTP_HOST")
+SMTP_PORT = int(os.environ.get("SMTP_PORT", "25"))
+SMTP_USER = os.environ.get("SMTP_USER")
+SMTP_PASSWORD = os.environ.get("SMTP_PASSWORD")
+SMTP_STARTTLS = os.environ.get("SMTP_STARTTLS", "0") == "1"
+SMTP_TIMEOUT = 10
+
+# Envoi des notifications: les évènements d'un destinataire survenus dans
+# la fenêtre de regroupement partent dans un seul message; destinataires
+# par lot (une connexion SMTP réutilisée pour tous les lots d'un passage),
+# intervalle de consultation de la boîte d'envoi, tentatives et délai
+# d'attente croissant entre deux tentatives, délai au-delà duquel un lot
+# pris par un processus arrêté est repris, intervalle de recherche des
+# tâches en retard et conservation des notifications envoyées (jours)
+NOTIFY_STATUS = {
+    "PENDING": "En attente",
+    "SENDING": "En cours d'envoi",
+    "SENT": "Envoyée",
+    "FAILED": "Échec"
+}
+NOTIFY_SENDER = os.environ.get("NOTIFY_SENDER", DIGEST_SENDER)
+NOTIFY_COALESCE_SECONDS = 60
+NOTIFY_BATCH_SIZE = 50
+NOTIFY_POLL_SECONDS = 15
+NOTIFY_MAX_ATTEMPTS = 6
+NOTIFY_RETRY_BASE_SECONDS = 60
+NOTIFY_RETRY_MAX_SECONDS = 3600
+NOTIFY_LEASE_SECONDS = 300
+NOTIFY_OVERDUE_INTERVAL = 3600
+NOTIFY_RETENTION_DAYS = 30
@@ -3,17 +3,35 @@ Opérations CRUD (Create, Read, Update, Delete) pour la base de données.
 """
 
 import sqlite3
-from datetime import datetime, date
-from typing import List, Optional, Dict, Any
+from datetime import datetime, date, timedelta
+from typing import List, Optional, Dict, Any, Iterator
 import bcrypt
 
-from .db_setup import get_connection
+from .db_setup import get_connection, read_snapshot
+from . import journal, identity_map, notifications
+from .identity_map import batch_loader
+from .user_directory import directory
+from utils.cache import bump_versions, invalidated
+from config import EXPORT_BATCH_SIZE
 from .models import (
     User, Project, Milestone, Task, ProjectMember, 
-    TaskComment, ActivityLog, DashboardStats, MemberPerformance
+    TaskComment, ActivityLog, DashboardStats, MemberPerformance, ProjectBundle,
+    ReportJob, Notification
 )
 
 
+def _select_by_ids(cursor, query: str, ids: List[int], params: tuple = (),
+                   chunk_size: int = 500) -> list:
+    """Exécute une requête 'IN ({})' par paquets d'identifiants (params placés avant)."""
+    rows = []
+    ids = list(ids)
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        cursor.execute(query.format(", ".join("?" * len(chunk))), [*params, *chunk])
+        rows.extend(cursor.fetchall())
+    return rows
+
+
 # ================== UTILISATEURS ==================
 
 def create_user(username: str, email: str, password: str, role: str = "member", 
@@ -27,8 +45,10 @@ def create_user(username: str, email: str, password: str, role: str = "member",
             INSERT INTO users (username, email, password_hash, role, full_name)
             VALUES (?, ?, ?, ?, ?)
         ''', (username, email, password_hash, role, full_name))
-        conn.commit()
         user_id = cursor.lastrowid
+        bump_versions(cursor, 'users')
+        conn.commit()
+        invalidated('users')
         log_activity(user_id, "USER_CREATED", "user", user_id, f"Utilisateur {username} créé")
         return user_id
     except sqlite3.IntegrityError:
@@ -39,50 +59,28 @@ def create_user(username: str, email: str, password: str, role: str = "member",
 
 def get_user_by_id(user_id: int) -> Optional[User]:
     """Récupère un utilisateur par son ID."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-    row = cursor.fetchone()
-    conn.close()
-    return User.from_row(row)
+    return identity_map.load('users', user_id)
+
+
+@batch_loader('users', 'users')
+def get_users_by_ids(user_ids: List[int]) -> Dict[int, User]:
+    """Récupère plusieurs utilisateurs (id -> User), depuis l'annuaire en mémoire."""
+    return directory.get_many(user_ids)
 
 
 def get_user_by_email(email: str) -> Optional[User]:
     """Récupère un utilisateur par son email."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
-    row = cursor.fetchone()
-    conn.close()
-    return User.from_row(row)
+    return directory.by_email(email)
 
 
 def get_user_by_username(username: str) -> Optional[User]:
     """Récupère un utilisateur par son nom d'utilisateur."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-    row = cursor.fetchone()
-    conn.close()
-    return User.from_row(row)
+    return directory.by_username(username)
 
 
 def get_all_users(role: str = None, active_only: bool = True) -> List[User]:
-    """Récupère tous les utilisateurs."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    query = "SELECT * FROM users WHERE 1=1"
-    params = []
-    if role:
-        query += " AND role = ?"
-        params.append(role)
-    if active_only:
-        query += " AND is_active = 1"
-    query += " ORDER BY full_name, username"
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-    conn.close()
-    return [User.from_row(row) for row in rows]
+    """Récupère tous les utilisateurs (triés par nom), depuis l'annuaire en mémoire."""
+    return directory.users(role=role, active_only=active_only)
 
 
 def get_members() -> List[User]:
@@ -109,18 +107,27 @@ def update_user(user_id: int, **kwargs) -> bool:
         values.append(bcrypt.hashpw(kwargs['password'].encode('utf-8'), bcrypt.gensalt()).decode('utf-8'))
     
     if not updates:
+        conn.close()
         return False
     
     updates.append("updated_at = ?")
     values.append(datetime.now().isoformat())
     values.append(user_id)
     
-    cursor.execute(f"UPDATE users SET {', '.join(updates)} WHERE id = ?", values)
-    conn.commit()
-    success = cursor.rowcount > 0
-    conn.close()
+    try:
+        cursor.execute(f"UPDATE users SET {', '.join(updates)} WHERE id = ?", values)
+        success = cursor.rowcount > 0
+        if success:
+            bump_versions(cursor, 'users')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
     
     if success:
+        invalidated('users')
         log_activity(user_id, "USER_UPDATED", "user", user_id)
     
     return success
@@ -155,8 +162,12 @@ def create_project(name: str, description: str = None, start_date: date = None,
             INSERT INTO projects (name, description, start_date, end_date, created_by, budget)
             VALUES (?, ?, ?, ?, ?, ?)
         ''', (name, description, start_date, end_date, created_by, budget))
-        conn.commit()
         project_id = cursor.lastrowid
+        journal.record_changes(cursor, 'project', project_id, project_id, None,
+                               _fetch_row(cursor, 'projects', project_id), created_by)
+        bump_versions(cursor, 'projects')
+        conn.commit()
+        invalidated('projects')
         log_activity(created_by, "PROJECT_CREATED", "project", project_id, f"Projet '{name}' créé")
         return project_id
     except Exception as e:
@@ -168,22 +179,37 @@ def create_project(name: str, description: str = None, start_date: date = None,
 
 def get_project_by_id(project_id: int) -> Optional[Project]:
     """Récupère un projet par son ID avec les statistiques."""
+    return identity_map.load('projects', project_id)
+
+
+@batch_loader('projects', 'projects', 'tasks', 'members')
+def get_projects_by_ids(project_ids: List[int]) -> Dict[int, Project]:
+    """Récupère plusieurs projets avec leurs statistiques (id -> Project)."""
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM projects WHERE id = ?", (project_id,))
-    row = cursor.fetchone()
-    if row:
-        project = Project.from_row(row)
-        # Calculer les statistiques
-        cursor.execute("SELECT COUNT(*) FROM tasks WHERE project_id = ?", (project_id,))
-        project.task_count = cursor.fetchone()[0]
-        cursor.execute("SELECT COUNT(*) FROM project_members WHERE project_id = ?", (project_id,))
-        project.member_count = cursor.fetchone()[0]
-        project.progress = calculate_project_progress(project_id)
-        conn.close()
-        return project
+    rows = _select_by_ids(cursor, "SELECT * FROM projects WHERE id IN ({})", project_ids)
+    projects = _attach_project_stats(cursor, [Project.from_row(row) for row in rows])
     conn.close()
-    return None
+    return {project.id: project for project in projects}
+
+
+def _attach_project_stats(cursor, projects: List[Project],
+                          task_stats: Dict[int, Any] = None) -> List[Project]:
+    """
+    Calcule tâches, membres et avancement de plusieurs projets en requêtes groupées.
+
+    task_stats: agrégats déjà lus par l'appelant (_select_task_aggregates_by_project)
+    """
+    ids = [project.id for project in projects]
+    if task_stats is None:
+        task_stats = _select_task_aggregates_by_project(cursor, ids)
+    member_counts = _count_members_by_project(cursor, ids)
+    for project in projects:
+        row = task_stats.get(project.id)
+        project.task_count = row['total'] if row else 0
+        project.member_count = member_counts.get(project.id, 0)
+        project.progress = _progress_from_counts(row) if row else 0.0
+    return projects
 
 
 def get_all_projects(status: str = None) -> List[Project]:
@@ -198,25 +224,23 @@ def get_all_projects(status: str = None) -> List[Project]:
     query += " ORDER BY created_at DESC"
     cursor.execute(query, params)
     rows = cursor.fetchall()
-    
-    projects = []
-    for row in rows:
-        project = Project.from_row(row)
-        cursor.execute("SELECT COUNT(*) FROM tasks WHERE project_id = ?", (project.id,))
-        project.task_count = cursor.fetchone()[0]
-        cursor.execute("SELECT COUNT(*) FROM project_members WHERE project_id = ?", (project.id,))
-        project.member_count = cursor.fetchone()[0]
-        project.progress = calculate_project_progress(project.id)
-        projects.append(project)
-    
+    projects = _attach_project_stats(cursor, [Project.from_row(row) for row in rows])
     conn.close()
+    identity_map.prime('projects', projects)
     return projects
 
 
 def get_user_projects(user_id: int) -> List[Project]:
     """Récupère les projets auxquels un utilisateur participe."""
     conn = get_connection()
-    cursor = conn.cursor()
+    projects = _select_user_projects(conn.cursor(), user_id)
+    conn.close()
+    identity_map.prime('projects', projects)
+    return projects
+
+
+def _select_user_projects(cursor, user_id: int) -> List[Project]:
+    """Requête de get_user_projects sur un curseur existant."""
     cursor.execute('''
         SELECT DISTINCT p.* FROM projects p
         LEFT JOIN project_members pm ON p.id = pm.project_id
@@ -224,17 +248,7 @@ def get_user_projects(user_id: int) -> List[Project]:
         ORDER BY p.created_at DESC
     ''', (user_id, user_id))
     rows = cursor.fetchall()
-    
-    projects = []
-    for row in rows:
-        project = Project.from_row(row)
-        cursor.execute("SELECT COUNT(*) FROM tasks WHERE project_id = ?", (project.id,))
-        project.task_count = cursor.fetchone()[0]
-        project.progress = calculate_project_progress(project.id)
-        projects.append(project)
-    
-    conn.close()
-    return projects
+    return _attach_project_stats(cursor, [Project.from_row(row) for row in rows])
 
 
 def update_project(project_id: int, **kwargs) -> bool:
@@ -252,33 +266,63 @@ def update_project(project_id: int, **kwargs) -> bool:
             values.append(value)
     
     if not updates:
+        conn.close()
         return False
     
+    now = datetime.now().isoformat()
     updates.append("updated_at = ?")
-    values.append(datetime.now().isoformat())
+    values.append(now)
     values.append(project_id)
     
-    cursor.execute(f"UPDATE projects SET {', '.join(updates)} WHERE id = ?", values)
-    conn.commit()
-    success = cursor.rowcount > 0
-    conn.close()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        previous = _fetch_row(cursor, 'projects', project_id)
+        cursor.execute(f"UPDATE projects SET {', '.join(updates)} WHERE id = ?", values)
+        success = cursor.rowcount > 0
+        if success:
+            changes = {f: v for f, v in kwargs.items() if f in allowed_fields}
+            journal.record_changes(cursor, 'project', project_id, project_id, previous,
+                                   changes, changed_at=now)
+            bump_versions(cursor, 'projects')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
     
     if success:
+        invalidated('projects')
         log_activity(None, "PROJECT_UPDATED", "project", project_id)
     
     return success
 
 
+# Tables modifiées par la suppression d'un projet (suppressions en cascade)
+PROJECT_DELETION_TAGS = ('projects', 'milestones', 'tasks', 'members', 'comments')
+
+
 def delete_project(project_id: int) -> bool:
     """Supprime un projet."""
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM projects WHERE id = ?", (project_id,))
-    conn.commit()
-    success = cursor.rowcount > 0
-    conn.close()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        previous = _fetch_row(cursor, 'projects', project_id)
+        cursor.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+        success = cursor.rowcount > 0
+        if success:
+            journal.record_deletion(cursor, 'project', project_id, project_id, previous)
+            bump_versions(cursor, *PROJECT_DELETION_TAGS)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
     
     if success:
+        invalidated(*PROJECT_DELETION_TAGS)
         log_activity(None, "PROJECT_DELETED", "project", project_id)
     
     return success
@@ -296,7 +340,11 @@ def calculate_project_progress(project_id: int) -> float:
     ''', (project_id,))
     row = cursor.fetchone()
     conn.close()
-    
+    return _progress_from_counts(row)
+
+
+def _progress_from_counts(row) -> float:
+    """Avancement à partir des colonnes total, completed et avg_progress."""
     if row and row['total'] > 0:
         # Moyenne pondérée entre tâches complétées et progression moyenne
         completed_ratio = (row['completed'] / row['total']) * 100
@@ -317,8 +365,12 @@ def create_milestone(project_id: int, name: str, description: str = None,
             INSERT INTO milestones (project_id, name, description, due_date)
             VALUES (?, ?, ?, ?)
         ''', (project_id, name, description, due_date))
-        conn.commit()
         milestone_id = cursor.lastrowid
+        journal.record_changes(cursor, 'milestone', milestone_id, project_id, None,
+                               _fetch_row(cursor, 'milestones', milestone_id))
+        bump_versions(cursor, 'milestones')
+        conn.commit()
+        invalidated('milestones')
         log_activity(None, "MILESTONE_CREATED", "milestone", milestone_id, f"Milestone '{name}' créé")
         return milestone_id
     except Exception as e:
@@ -331,23 +383,30 @@ def create_milestone(project_id: int, name: str, description: str = None,
 def get_project_milestones(project_id: int) -> List[Milestone]:
     """Récupère les milestones d'un projet."""
     conn = get_connection()
-    cursor = conn.cursor()
+    milestones = _select_project_milestones(conn.cursor(), project_id)
+    conn.close()
+    return milestones
+
+
+def _select_project_milestones(cursor, project_id: int) -> List[Milestone]:
+    """Milestones d'un projet avec nombre de tâches et avancement (une requête groupée)."""
     cursor.execute('''
         SELECT * FROM milestones WHERE project_id = ? ORDER BY due_date, created_at
     ''', (project_id,))
     rows = cursor.fetchall()
+    cursor.execute('''
+        SELECT milestone_id, COUNT(*), AVG(progress) FROM tasks
+        WHERE project_id = ? AND milestone_id IS NOT NULL
+        GROUP BY milestone_id
+    ''', (project_id,))
+    task_stats = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
     
     milestones = []
     for row in rows:
         milestone = Milestone.from_row(row)
-        cursor.execute("SELECT COUNT(*) FROM tasks WHERE milestone_id = ?", (milestone.id,))
-        milestone.task_count = cursor.fetchone()[0]
-        cursor.execute("SELECT AVG(progress) FROM tasks WHERE milestone_id = ?", (milestone.id,))
-        avg = cursor.fetchone()[0]
+        milestone.task_count, avg = task_stats.get(milestone.id, (0, None))
         milestone.progress = round(avg, 1) if avg else 0.0
         milestones.append(milestone)
-    
-    conn.close()
     return milestones
 
 
@@ -366,13 +425,28 @@ def update_milestone(milestone_id: int, **kwargs) -> bool:
             values.append(value)
     
     if not updates:
+        conn.close()
         return False
     
     values.append(milestone_id)
-    cursor.execute(f"UPDATE milestones SET {', '.join(updates)} WHERE id = ?", values)
-    conn.commit()
-    success = cursor.rowcount > 0
-    conn.close()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        previous = _fetch_row(cursor, 'milestones', milestone_id)
+        cursor.execute(f"UPDATE milestones SET {', '.join(updates)} WHERE id = ?", values)
+        success = cursor.rowcount > 0
+        if success:
+            changes = {f: v for f, v in kwargs.items() if f in allowed_fields}
+            journal.record_changes(cursor, 'milestone', milestone_id, previous['project_id'],
+                                   previous, changes)
+            bump_versions(cursor, 'milestones')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    if success:
+        invalidated('milestones')
     return success
 
 
@@ -380,10 +454,23 @@ def delete_milestone(milestone_id: int) -> bool:
     """Supprime un milestone."""
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM milestones WHERE id = ?", (milestone_id,))
-    conn.commit()
-    success = cursor.rowcount > 0
-    conn.close()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        previous = _fetch_row(cursor, 'milestones', milestone_id)
+        cursor.execute("DELETE FROM milestones WHERE id = ?", (milestone_id,))
+        success = cursor.rowcount > 0
+        if success:
+            journal.record_deletion(cursor, 'milestone', milestone_id, previous['project_id'],
+                                    previous)
+            bump_versions(cursor, 'milestones', 'tasks')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    if success:
+        invalidated('milestones', 'tasks')
     return success
 
 
@@ -392,8 +479,9 @@ def delete_milestone(milestone_id: int) -> bool:
 def create_task(project_id: int, title: str, description: str = None, 
                 priority: str = "MEDIUM", assigned_to: int = None,
                 deadline: date = None, milestone_id: int = None,
-                estimated_hours: float = None) -> Optional[int]:
-    """Crée une nouvelle tâche."""
+                estimated_hours: float = None, user_id: int = None) -> Optional[int]:
+    """Crée une nouvelle tâche (user_id: auteur de la création)."""
+    actor_id = user_id if user_id is not None else assigned_to
     conn = get_connection()
     cursor = conn.cursor()
     try:
@@ -403,9 +491,16 @@ def create_task(project_id: int, title: str, description: str = None,
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         ''', (project_id, milestone_id, title, description, priority, 
               assigned_to, deadline, estimated_hours))
-        conn.commit()
         task_id = cursor.lastrowid
-        log_activity(assigned_to, "TASK_CREATED", "task", task_id, f"Tâche '{title}' créée")
+        now = datetime.now().isoformat()
+        _record_status_change(cursor, task_id, project_id, None, "TODO", actor_id, now)
+        row = _fetch_row(cursor, 'tasks', task_id)
+        journal.record_changes(cursor, 'task', task_id, project_id, None, row, actor_id, now)
+        notifications.record_task_events(cursor, None, row, user_id, now)
+        bump_versions(cursor, 'tasks')
+        conn.commit()
+        invalidated('tasks')
+        log_activity(actor_id, "TASK_CREATED", "task", task_id, f"Tâche '{title}' créée")
         return task_id
     except Exception as e:
         print(f"Erreur création tâche: {e}")
@@ -416,32 +511,51 @@ def create_task(project_id: int, title: str, description: str = None,
 
 def get_task_by_id(task_id: int) -> Optional[Task]:
     """Récupère une tâche par son ID."""
+    return identity_map.load('tasks', task_id)
+
+
+@batch_loader('tasks', 'tasks', 'projects', 'users')
+def get_tasks_by_ids(task_ids: List[int]) -> Dict[int, Task]:
+    """Récupère plusieurs tâches en une requête (id -> Task)."""
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute('''
+    rows = _select_by_ids(cursor, '''
         SELECT t.*, u.full_name as assigned_name, p.name as project_name
         FROM tasks t
         LEFT JOIN users u ON t.assigned_to = u.id
         LEFT JOIN projects p ON t.project_id = p.id
-        WHERE t.id = ?
-    ''', (task_id,))
-    row = cursor.fetchone()
+        WHERE t.id IN ({})
+    ''', task_ids)
     conn.close()
     
-    if row:
+    tasks = {}
+    for row in rows:
         task = Task.from_row(row)
         task.assigned_to_name = row['assigned_name']
         task.project_name = row['project_name']
-        return task
-    return None
+        tasks[task.id] = task
+    return tasks
 
 
 def get_all_tasks(project_id: int = None, status: str = None, 
                   assigned_to: int = None) -> List[Task]:
     """Récupère les tâches avec filtres optionnels."""
     conn = get_connection()
-    cursor = conn.cursor()
-    
+    tasks = _select_tasks(conn.cursor(), project_id, status, assigned_to)
+    conn.close()
+    identity_map.prime('tasks', tasks)
+    return tasks
+
+
+def _select_tasks(cursor, project_id: int = None, status: str = None,
+                  assigned_to: int = None) -> List[Task]:
+    """Requête de get_all_tasks sur un curseur existant."""
+    cursor.execute(*_tasks_query(project_id, status, assigned_to))
+    return [_task_from_row(row) for row in cursor.fetchall()]
+
+
+def _tasks_query(project_id: int = None, status: str = None, assigned_to: int = None):
+    """Requête et paramètres de la liste des tâches filtrée."""
     query = '''
         SELECT t.*, u.full_name as assigned_name, p.name as project_name
         FROM tasks t
@@ -462,19 +576,14 @@ def get_all_tasks(project_id: int = None, status: str = None,
         params.append(assigned_to)
     
     query += " ORDER BY t.deadline, t.priority DESC, t.created_at DESC"
-    
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-    conn.close()
-    
-    tasks = []
-    for row in rows:
-        task = Task.from_row(row)
-        task.assigned_to_name = row['assigned_name']
-        task.project_name = row['project_name']
-        tasks.append(task)
-    
-    return tasks
+    return query, params
+
+
+def _task_from_row(row) -> Task:
+    task = Task.from_row(row)
+    task.assigned_to_name = row['assigned_name']
+    task.project_name = row['project_name']
+    return task
 
 
 def get_user_tasks(user_id: int, status: str = None) -> List[Task]:
@@ -516,46 +625,104 @@ def update_task(task_id: int, user_id: int = None, **kwargs) -> bool:
     
     allowed_fields = ['title', 'description', 'priority', 'status', 'progress',
                       'assigned_to', 'deadline', 'milestone_id', 
-                      'estimated_hours', 'actual_hours']
-    updates = []
-    values = []
+                      'estimated_hours']
+    changes = {}
     
     for field, value in kwargs.items():
         if field in allowed_fields:
-            updates.append(f"{field} = ?")
-            values.append(value)
+            changes[field] = value
     
-    if not updates:
+    if not changes:
+        conn.close()
         return False
     
+    now = datetime.now().isoformat()
+    
     # Marquer comme terminé si le statut change à COMPLETED
     if 'status' in kwargs and kwargs['status'] == 'COMPLETED':
-        updates.append("completed_at = ?")
-        values.append(datetime.now().isoformat())
-        updates.append("progress = ?")
-        values.append(100)
+        changes['completed_at'] = now
+        changes['progress'] = 100
     
+    updates = [f"{field} = ?" for field in changes]
+    values = list(changes.values())
     updates.append("updated_at = ?")
-    values.append(datetime.now().isoformat())
+    values.append(now)
     values.append(task_id)
     
-    cursor.execute(f"UPDATE tasks SET {', '.join(updates)} WHERE id = ?", values)
-    conn.commit()
-    success = cursor.rowcount > 0
-    conn.close()
+    try:
+        # Lire l'ancienne ligne dans la même transaction que la mise à jour
+        cursor.execute("BEGIN IMMEDIATE")
+        previous = _fetch_row(cursor, 'tasks', task_id)
+        
+        cursor.execute(f"UPDATE tasks SET {', '.join(updates)} WHERE id = ?", values)
+        success = cursor.rowcount > 0
+        
+        if success:
+            if 'status' in changes and previous['status'] != changes['status']:
+                _record_status_change(cursor, task_id, previous['project_id'], previous['status'],
+                                      changes['status'], user_id, now)
+            journal.record_changes(cursor, 'task', task_id, previous['project_id'], previous,
+                                   changes, user_id, now)
+            notifications.record_task_events(cursor, previous, {**previous, **changes},
+                                             user_id, now)
+            bump_versions(cursor, 'tasks')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
     
     if success:
+        invalidated('tasks')
         log_activity(user_id, "TASK_UPDATED", "task", task_id)
     
     return success
 
 
+def _fetch_row(cursor, table: str, entity_id: int) -> Optional[Dict[str, Any]]:
+    """Lit une ligne complète avec le curseur (et donc la transaction) de l'appelant."""
+    cursor.execute(f"SELECT * FROM {table} WHERE id = ?", (entity_id,))
+    row = cursor.fetchone()
+    return dict(row) if row else None
+
+
+def _record_status_change(cursor, task_id: int, project_id: int, from_status: Optional[str],
+                          to_status: str, user_id: Optional[int], changed_at: str):
+    """Ajoute une transition dans l'historique des statuts (transaction de l'appelant)."""
+    cursor.execute('''
+        INSERT INTO task_status_history (task_id, project_id, from_status, to_status, 
+                                         changed_by, changed_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (task_id, project_id, from_status, to_status, user_id, changed_at))
+
+
+def get_task_status_history(task_id: int) -> List[Dict[str, Any]]:
+    """Récupère l'historique des statuts d'une tâche."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT h.*, u.full_name as user_name
+        FROM task_status_history h
+        LEFT JOIN users u ON h.changed_by = u.id
+        WHERE h.task_id = ?
+        ORDER BY h.changed_at, h.id
+    ''', (task_id,))
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+
 def update_task_progress(task_id: int, progress: int, user_id: int = None, 
-                         comment: str = None) -> bool:
-    """Met à jour la progression d'une tâche."""
+                         comment: str = None, hours: float = None) -> bool:
+    """Met à jour la progression d'une tâche et enregistre le temps passé."""
     status = "COMPLETED" if progress >= 100 else "IN_PROGRESS" if progress > 0 else "TODO"
     success = update_task(task_id, user_id=user_id, progress=progress, status=status)
     
+    if success and hours:
+        add_time_entries([{'task_id': task_id, 'user_id': user_id,
+                           'duration_hours': hours, 'note': comment}])
+    
     if success and comment:
         add_task_comment(task_id, user_id, comment)
     
@@ -566,17 +733,165 @@ def delete_task(task_id: int) -> bool:
     """Supprime une tâche."""
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-    conn.commit()
-    success = cursor.rowcount > 0
-    conn.close()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        previous = _fetch_row(cursor, 'tasks', task_id)
+        cursor.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+        success = cursor.rowcount > 0
+        if success:
+            journal.record_deletion(cursor, 'task', task_id, previous['project_id'], previous)
+            bump_versions(cursor, 'tasks', 'comments')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
     
     if success:
+        invalidated('tasks', 'comments')
         log_activity(None, "TASK_DELETED", "task", task_id)
     
     return success
 
 
+# ================== TEMPS PASSÉ ==================
+
+def add_time_entries(entries: List[Dict[str, Any]]) -> int:
+    """
+    Enregistre un lot de saisies de temps en une seule transaction.
+    
+    Chaque saisie est un dict avec 'task_id', 'user_id', 'duration_hours'
+    et optionnellement 'started_at' et 'note'. Les cumuls (tâche,
+    utilisateur, projet par jour) sont mis à jour de manière incrémentale
+    et les heures réelles des tâches concernées en sont dérivées.
+    
+    Returns:
+        Nombre de saisies enregistrées (les tâches inconnues sont ignorées)
+    """
+    if not entries:
+        return 0
+    
+    conn = get_connection()
+    cursor = conn.cursor()
+    now = datetime.now().isoformat()
+    
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        task_ids = sorted({e['task_id'] for e in entries})
+        previous = {
+            row['id']: dict(row)
+            for row in _select_by_ids(cursor, "SELECT * FROM tasks WHERE id IN ({})", task_ids)
+        }
+        
+        rows = []
+        rollups = {}
+        authors = {}
+        for entry in entries:
+            task = previous.get(entry['task_id'])
+            if task is None:
+                continue
+            project_id = task['project_id']
+            started_at = entry.get('started_at') or now
+            if isinstance(started_at, (datetime, date)):
+                started_at = started_at.isoformat()
+            hours = float(entry['duration_hours'])
+            rows.append((entry['task_id'], entry.get('user_id'), project_id, started_at,
+                         hours, entry.get('note'), now))
+            authors.setdefault(entry['task_id'], entry.get('user_id'))
+            day = started_at[:10]
+            for scope, key in (('task', entry['task_id']), ('user', entry.get('user_id')),
+                               ('project', project_id)):
+                if key is None:
+                    continue
+                total = rollups.setdefault((scope, key, day), [0.0, 0])
+                total[0] += hours
+                total[1] += 1
+        
+        cursor.executemany('''
+            INSERT INTO time_entries (task_id, user_id, project_id, started_at,
+                                      duration_hours, note, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        cursor.executemany('''
+            INSERT INTO time_rollups (scope, key, day, hours, entries)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (scope, key, day) DO UPDATE SET
+                hours = hours + excluded.hours,
+                entries = entries + excluded.entries
+        ''', [(scope, key, day, hours, count) for (scope, key, day), (hours, count) in rollups.items()])
+        
+        # Heures réelles dérivées des cumuls par tâche, et journalisées comme
+        # toute modification d'une tâche (requêtes "à une date donnée")
+        actual_hours = dict(_select_by_ids(cursor, '''
+            SELECT key, SUM(hours) FROM time_rollups
+            WHERE scope = 'task' AND key IN ({}) GROUP BY key
+        ''', sorted(authors)))
+        cursor.executemany("UPDATE tasks SET actual_hours = ? WHERE id = ?",
+                           [(hours, task_id) for task_id, hours in actual_hours.items()])
+        for task_id, hours in actual_hours.items():
+            old_row = previous[task_id]
+            journal.record_changes(cursor, 'task', task_id, old_row['project_id'], old_row,
+                                   {'actual_hours': hours}, authors[task_id], now)
+        
+        if rows:
+            bump_versions(cursor, 'time', 'tasks')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    if rows:
+        invalidated('time', 'tasks')
+    return len(rows)
+
+
+def get_task_time_entries(task_id: int, limit: int = 50) -> List[Dict[str, Any]]:
+    """Récupère les dernières saisies de temps d'une tâche."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT e.*, u.full_name as user_name
+        FROM time_entries e
+        LEFT JOIN users u ON e.user_id = u.id
+        WHERE e.task_id = ?
+        ORDER BY e.started_at DESC, e.id DESC
+        LIMIT ?
+    ''', (task_id, limit))
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+
+def get_time_rollups(scope: str, key: int = None, start: str = None,
+                     end: str = None) -> List[Dict[str, Any]]:
+    """
+    Récupère les cumuls journaliers de temps d'un périmètre ('task', 'user' ou 'project').
+    
+    Returns:
+        Liste de dicts avec 'key', 'day', 'hours' et 'entries'
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    query = "SELECT key, day, hours, entries FROM time_rollups WHERE scope = ?"
+    params = [scope]
+    if key is not None:
+        query += " AND key = ?"
+        params.append(key)
+    if start:
+        query += " AND day >= ?"
+        params.append(str(start))
+    if end:
+        query += " AND day <= ?"
+        params.append(str(end))
+    query += " ORDER BY day, key"
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+
 # ================== MEMBRES DE PROJET ==================
 
 def add_project_member(project_id: int, user_id: int, 
@@ -589,7 +904,9 @@ def add_project_member(project_id: int, user_id: int,
             INSERT INTO project_members (project_id, user_id, role_in_project)
             VALUES (?, ?, ?)
         ''', (project_id, user_id, role_in_project))
+        bump_versions(cursor, 'members')
         conn.commit()
+        invalidated('members')
         log_activity(user_id, "MEMBER_ADDED", "project", project_id)
         return True
     except sqlite3.IntegrityError:
@@ -602,14 +919,22 @@ def remove_project_member(project_id: int, user_id: int) -> bool:
     """Retire un membre d'un projet."""
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute('''
-        DELETE FROM project_members WHERE project_id = ? AND user_id = ?
-    ''', (project_id, user_id))
-    conn.commit()
-    success = cursor.rowcount > 0
-    conn.close()
+    try:
+        cursor.execute('''
+            DELETE FROM project_members WHERE project_id = ? AND user_id = ?
+        ''', (project_id, user_id))
+        success = cursor.rowcount > 0
+        if success:
+            bump_versions(cursor, 'members')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
     
     if success:
+        invalidated('members')
         log_activity(user_id, "MEMBER_REMOVED", "project", project_id)
     
     return success
@@ -618,7 +943,13 @@ def remove_project_member(project_id: int, user_id: int) -> bool:
 def get_project_members(project_id: int) -> List[ProjectMember]:
     """Récupère les membres d'un projet."""
     conn = get_connection()
-    cursor = conn.cursor()
+    members = _select_project_members(conn.cursor(), project_id)
+    conn.close()
+    return members
+
+
+def _select_project_members(cursor, project_id: int) -> List[ProjectMember]:
+    """Requête de get_project_members sur un curseur existant."""
     cursor.execute('''
         SELECT pm.*, u.full_name, u.email as user_email
         FROM project_members pm
@@ -626,11 +957,9 @@ def get_project_members(project_id: int) -> List[ProjectMember]:
         WHERE pm.project_id = ?
         ORDER BY u.full_name
     ''', (project_id,))
-    rows = cursor.fetchall()
-    conn.close()
     
     members = []
-    for row in rows:
+    for row in cursor.fetchall():
         member = ProjectMember.from_row(row)
         member.user_name = row['full_name']
         member.user_email = row['user_email']
@@ -663,8 +992,11 @@ def add_task_comment(task_id: int, user_id: int, comment: str) -> Optional[int]:
             INSERT INTO task_comments (task_id, user_id, comment)
             VALUES (?, ?, ?)
         ''', (task_id, user_id, comment))
-        conn.commit()
         comment_id = cursor.lastrowid
+        notifications.record_comment(cursor, task_id, user_id, comment)
+        bump_versions(cursor, 'comments')
+        conn.commit()
+        invalidated('comments')
         return comment_id
     except Exception as e:
         print(f"Erreur ajout commentaire: {e}")
@@ -708,11 +1040,15 @@ def log_activity(user_id: int, action: str, entity_type: str = None,
             INSERT INTO activity_log (user_id, action, entity_type, entity_id, details)
             VALUES (?, ?, ?, ?, ?)
         ''', (user_id, action, entity_type, entity_id, details))
+        # Version du tag 'activity' incrémentée dans la même transaction
+        bump_versions(cursor, 'activity')
         conn.commit()
     except Exception as e:
         print(f"Erreur log activité: {e}")
+        return
     finally:
         conn.close()
+    invalidated('activity')
 
 
 def get_recent_activities(limit: int = 20, user_id: int = None) -> List[ActivityLog]:
@@ -797,7 +1133,19 @@ def get_dashboard_stats() -> DashboardStats:
 def get_member_performance(user_id: int = None) -> List[MemberPerformance]:
     """Récupère les performances des membres."""
     conn = get_connection()
-    cursor = conn.cursor()
+    performances = _select_member_performance(conn.cursor(), user_id)
+    conn.close()
+    return performances
+
+
+def _select_member_performance(cursor, user_id: int = None) -> List[MemberPerformance]:
+    """Requête de get_member_performance sur un curseur existant."""
+    cursor.execute(*_member_performance_query(user_id))
+    return [_performance_from_row(row) for row in cursor.fetchall()]
+
+
+def _member_performance_query(user_id: int = None):
+    """Requête et paramètres des performances des membres actifs."""
     today = date.today().isoformat()
     
     query = '''
@@ -820,69 +1168,745 @@ def get_member_performance(user_id: int = None) -> List[MemberPerformance]:
         params.append(user_id)
     
     query += " GROUP BY u.id ORDER BY completed_tasks DESC"
-    
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
+    return query, params
+
+
+def _performance_from_row(row) -> MemberPerformance:
+    perf = MemberPerformance(
+        user_id=row['user_id'],
+        user_name=row['user_name'] or "Inconnu",
+        total_tasks=row['total_tasks'] or 0,
+        completed_tasks=row['completed_tasks'] or 0,
+        in_progress_tasks=row['in_progress_tasks'] or 0,
+        overdue_tasks=row['overdue_tasks'] or 0,
+        average_progress=round(row['avg_progress'], 1) if row['avg_progress'] else 0.0
+    )
+    if perf.total_tasks > 0:
+        perf.completion_rate = round((perf.completed_tasks / perf.total_tasks) * 100, 1)
+    return perf
+
+
+def get_task_distribution(project_id: int = None) -> Dict[str, Dict[str, int]]:
+    """
+    Nombre de tâches par statut et par priorité (une requête groupée).
+    
+    Returns:
+        Dict avec 'status' et 'priority' (valeur -> nombre de tâches), pour
+        un projet ou pour tous les projets si project_id est None
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    query = "SELECT status, priority, COUNT(*) FROM tasks"
+    params = ()
+    if project_id:
+        query += " WHERE project_id = ?"
+        params = (project_id,)
+    cursor.execute(query + " GROUP BY status, priority", params)
+    distribution = {'status': {}, 'priority': {}}
+    for status, priority, count in cursor.fetchall():
+        distribution['status'][status] = distribution['status'].get(status, 0) + count
+        distribution['priority'][priority] = distribution['priority'].get(priority, 0) + count
     conn.close()
-    
-    performances = []
-    for row in rows:
-        perf = MemberPerformance(
-            user_id=row['user_id'],
-            user_name=row['user_name'] or "Inconnu",
-            total_tasks=row['total_tasks'] or 0,
-            completed_tasks=row['completed_tasks'] or 0,
-            in_progress_tasks=row['in_progress_tasks'] or 0,
-            overdue_tasks=row['overdue_tasks'] or 0,
-            average_progress=round(row['avg_progress'], 1) if row['avg_progress'] else 0.0
-        )
-        if perf.total_tasks > 0:
-            perf.completion_rate = round((perf.completed_tasks / perf.total_tasks) * 100, 1)
-        performances.append(perf)
-    
-    return performances
+    return distribution
 
 
 def get_project_stats(project_id: int) -> Dict[str, Any]:
     """Récupère les statistiques d'un projet spécifique."""
     conn = get_connection()
     cursor = conn.cursor()
-    today = date.today().isoformat()
-    
-    stats = {
-        'total_tasks': 0,
-        'completed_tasks': 0,
-        'in_progress_tasks': 0,
-        'todo_tasks': 0,
-        'overdue_tasks': 0,
-        'progress': 0.0,
-        'members': 0
-    }
-    
-    cursor.execute("SELECT COUNT(*) FROM tasks WHERE project_id = ?", (project_id,))
-    stats['total_tasks'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM tasks WHERE project_id = ? AND status = 'COMPLETED'", (project_id,))
-    stats['completed_tasks'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM tasks WHERE project_id = ? AND status = 'IN_PROGRESS'", (project_id,))
-    stats['in_progress_tasks'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM tasks WHERE project_id = ? AND status = 'TODO'", (project_id,))
-    stats['todo_tasks'] = cursor.fetchone()[0]
-    
+    stats = _project_stats(_select_task_aggregates(cursor, project_id),
+                           _count_project_members(cursor, project_id))
+    conn.close()
+    return stats
+
+
+def _select_task_aggregates(cursor, project_id: int):
+    """Comptes par statut, retards et avancement moyen des tâches d'un projet (une requête)."""
     cursor.execute('''
-        SELECT COUNT(*) FROM tasks 
-        WHERE project_id = ? AND deadline < ? AND status != 'COMPLETED'
-    ''', (project_id, today))
-    stats['overdue_tasks'] = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT AVG(progress) FROM tasks WHERE project_id = ?", (project_id,))
-    avg = cursor.fetchone()[0]
-    stats['progress'] = round(avg, 1) if avg else 0.0
-    
+        SELECT COUNT(*) as total,
+               COALESCE(SUM(status = 'COMPLETED'), 0) as completed,
+               COALESCE(SUM(status = 'IN_PROGRESS'), 0) as in_progress,
+               COALESCE(SUM(status = 'TODO'), 0) as todo,
+               COALESCE(SUM(deadline < ? AND status != 'COMPLETED'), 0) as overdue,
+               AVG(progress) as avg_progress
+        FROM tasks WHERE project_id = ?
+    ''', (date.today().isoformat(), project_id))
+    return cursor.fetchone()
+
+
+def _select_task_aggregates_by_project(cursor, project_ids: List[int]) -> Dict[int, Any]:
+    """Agrégats de _select_task_aggregates pour plusieurs projets (project_id -> ligne)."""
+    rows = _select_by_ids(cursor, '''
+        SELECT project_id, COUNT(*) as total,
+               COALESCE(SUM(status = 'COMPLETED'), 0) as completed,
+               COALESCE(SUM(status = 'IN_PROGRESS'), 0) as in_progress,
+               COALESCE(SUM(status = 'TODO'), 0) as todo,
+               COALESCE(SUM(deadline < ? AND status != 'COMPLETED'), 0) as overdue,
+               AVG(progress) as avg_progress
+        FROM tasks WHERE project_id IN ({}) GROUP BY project_id
+    ''', project_ids, params=(date.today().isoformat(),))
+    return {row['project_id']: row for row in rows}
+
+
+def _count_members_by_project(cursor, project_ids: List[int]) -> Dict[int, int]:
+    return dict(_select_by_ids(cursor, '''
+        SELECT project_id, COUNT(*) FROM project_members
+        WHERE project_id IN ({}) GROUP BY project_id
+    ''', project_ids))
+
+
+def _count_project_members(cursor, project_id: int) -> int:
     cursor.execute("SELECT COUNT(*) FROM project_members WHERE project_id = ?", (project_id,))
-    stats['members'] = cursor.fetchone()[0]
+    return cursor.fetchone()[0]
+
+
+def _project_stats(aggregates, member_count: int) -> Dict[str, Any]:
+    """Dictionnaire de get_project_stats à partir des agrégats des tâches."""
+    avg = aggregates['avg_progress']
+    return {
+        'total_tasks': aggregates['total'],
+        'completed_tasks': aggregates['completed'],
+        'in_progress_tasks': aggregates['in_progress'],
+        'todo_tasks': aggregates['todo'],
+        'overdue_tasks': aggregates['overdue'],
+        'progress': round(avg, 1) if avg else 0.0,
+        'members': member_count
+    }
+
+
+PROJECT_BUNDLE_PARTS = ('stats', 'milestones', 'members', 'tasks', 'logged_hours')
+
+
+def load_project_bundle(project_id: int, parts=PROJECT_BUNDLE_PARTS) -> Optional[ProjectBundle]:
+    """
+    Charge un projet et les parties demandées en une seule transaction de lecture.
+    
+    Args:
+        project_id: ID du projet
+        parts: parties à charger parmi PROJECT_BUNDLE_PARTS
+    
+    Returns:
+        ProjectBundle (les parties non demandées valent None), ou None si le projet n'existe pas.
+        Les agrégats des tâches sont calculés une fois et partagés entre le projet et les stats.
+    """
+    unknown = set(parts) - set(PROJECT_BUNDLE_PARTS)
+    if unknown:
+        raise ValueError(f"Parties inconnues: {', '.join(sorted(unknown))}")
+    
+    # Transaction de lecture: toutes les parties voient le même état de la base
+    with read_snapshot() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM projects WHERE id = ?", (project_id,))
+        project = Project.from_row(cursor.fetchone())
+        if project is None:
+            return None
+        
+        aggregates = _select_task_aggregates(cursor, project_id)
+        project.task_count = aggregates['total']
+        project.member_count = _count_project_members(cursor, project_id)
+        project.progress = _progress_from_counts(aggregates)
+        bundle = ProjectBundle(project=project)
+        
+        if 'stats' in parts:
+            bundle.stats = _project_stats(aggregates, project.member_count)
+        if 'milestones' in parts:
+            bundle.milestones = _select_project_milestones(cursor, project_id)
+        if 'members' in parts:
+            bundle.members = _select_project_members(cursor, project_id)
+        if 'tasks' in parts:
+            bundle.tasks = _select_tasks(cursor, project_id=project_id)
+        if 'logged_hours' in parts:
+            cursor.execute('''
+                SELECT COALESCE(SUM(hours), 0) FROM time_rollups
+                WHERE scope = 'project' AND key = ?
+            ''', (project_id,))
+            bundle.logged_hours = round(cursor.fetchone()[0], 2)
+    
+    identity_map.prime('projects', [project])
+    if bundle.tasks:
+        identity_map.prime('tasks', bundle.tasks)
+    return bundle
+
+
+PROJECT_BUNDLES_PARTS = ('stats', 'members', 'tasks', 'logged_hours')
+
+
+def load_project_bundles(project_ids: List[int],
+                         parts=PROJECT_BUNDLES_PARTS) -> Dict[int, ProjectBundle]:
+    """
+    Charge plusieurs projets et les parties demandées en requêtes groupées.
+
+    Équivalent à load_project_bundle pour chaque projet, mais chaque partie
+    est lue en une requête par paquet d'identifiants au lieu d'une requête
+    par projet (rapports par lots).
+
+    Args:
+        project_ids: IDs des projets
+        parts: parties à charger parmi PROJECT_BUNDLES_PARTS
+
+    Returns:
+        Dict project_id -> ProjectBundle (les projets inexistants sont absents)
+    """
+    unknown = set(parts) - set(PROJECT_BUNDLES_PARTS)
+    if unknown:
+        raise ValueError(f"Parties inconnues: {', '.join(sorted(unknown))}")
+
+    with read_snapshot() as conn:
+        cursor = conn.cursor()
+        rows = _select_by_ids(cursor, "SELECT * FROM projects WHERE id IN ({})", project_ids)
+        ids = [row['id'] for row in rows]
+        aggregates = _select_task_aggregates_by_project(cursor, ids)
+        projects = _attach_project_stats(cursor, [Project.from_row(row) for row in rows], aggregates)
+        bundles = {project.id: ProjectBundle(project=project) for project in projects}
+
+        if 'stats' in parts:
+            empty = {'total': 0, 'completed': 0, 'in_progress': 0, 'todo': 0,
+                     'overdue': 0, 'avg_progress': None}
+            for project in projects:
+                bundles[project.id].stats = _project_stats(
+                    aggregates.get(project.id, empty), project.member_count
+                )
+        if 'members' in parts:
+            for bundle in bundles.values():
+                bundle.members = []
+            for row in _select_by_ids(cursor, '''
+                SELECT pm.*, u.full_name, u.email as user_email
+                FROM project_members pm
+                JOIN users u ON pm.user_id = u.id
+                WHERE pm.project_id IN ({})
+                ORDER BY u.full_name
+            ''', ids):
+                member = ProjectMember.from_row(row)
+                member.user_name = row['full_name']
+                member.user_email = row['user_email']
+                bundles[member.project_id].members.append(member)
+        if 'tasks' in parts:
+            for bundle in bundles.values():
+                bundle.tasks = []
+            query, _ = _tasks_query()
+            query = query.replace("WHERE 1=1", "WHERE t.project_id IN ({})")
+            for row in _select_by_ids(cursor, query, ids):
+                task = _task_from_row(row)
+                bundles[task.project_id].tasks.append(task)
+        if 'logged_hours' in parts:
+            for bundle in bundles.values():
+                bundle.logged_hours = 0.0
+            for project_id, hours in _select_by_ids(cursor, '''
+                SELECT key, SUM(hours) FROM time_rollups
+                WHERE scope = 'project' AND key IN ({}) GROUP BY key
+            ''', ids):
+                bundles[project_id].logged_hours = round(hours, 2)
+
+    return bundles
+
+
+def load_member_data(user_id: int) -> Dict[str, Any]:
+    """
+    Charge en une seule transaction de lecture les données des pages membre.
+    
+    Returns:
+        Dict avec performance (ou None), tasks (tâches assignées), projects
+        (avec avancement) et project_stats (project_id -> format get_project_stats)
+    """
+    with read_snapshot() as conn:
+        cursor = conn.cursor()
+        performances = _select_member_performance(cursor, user_id)
+        tasks = _select_tasks(cursor, assigned_to=user_id)
+        projects = _select_user_projects(cursor, user_id)
+        ids = [project.id for project in projects]
+        aggregates = _select_task_aggregates_by_project(cursor, ids)
+        member_counts = _count_members_by_project(cursor, ids)
+    
+    empty = {'total': 0, 'completed': 0, 'in_progress': 0, 'todo': 0,
+             'overdue': 0, 'avg_progress': None}
+    identity_map.prime('tasks', tasks)
+    identity_map.prime('projects', projects)
+    return {
+        'performance': performances[0] if performances else None,
+        'tasks': tasks,
+        'projects': projects,
+        'project_stats': {
+            project_id: _project_stats(aggregates.get(project_id, empty),
+                                       member_counts.get(project_id, 0))
+            for project_id in ids
+        }
+    }
+
+
+def get_manager_projects(user_ids: List[int] = None) -> Dict[int, List[int]]:
+    """
+    Projets de chaque chef de projet actif (créés par lui ou dont il est membre).
+
+    Args:
+        user_ids: chefs de projet à inclure (None: tous)
+
+    Returns:
+        Dict user_id -> IDs des projets, en une requête
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    query = '''
+        SELECT u.id, p.id
+        FROM users u
+        JOIN projects p ON p.created_by = u.id
+        WHERE u.role = 'project_manager' AND u.is_active = 1
+        UNION
+        SELECT u.id, pm.project_id
+        FROM users u
+        JOIN project_members pm ON pm.user_id = u.id
+        WHERE u.role = 'project_manager' AND u.is_active = 1
+    '''
+    cursor.execute(query)
+    wanted = set(user_ids) if user_ids is not None else None
+    projects: Dict[int, List[int]] = {}
+    for user_id, project_id in cursor.fetchall():
+        if wanted is None or user_id in wanted:
+            projects.setdefault(user_id, []).append(project_id)
+    conn.close()
+    for project_ids in projects.values():
+        project_ids.sort()
+    return projects
+
+
+def load_project_digests(project_ids: List[int], overdue_limit: int = 10,
+                         weeks: int = 4) -> Dict[int, Dict[str, Any]]:
+    """
+    Charge en une transaction de lecture les données des résumés hebdomadaires.
+
+    Chaque requête porte sur tous les projets à la fois (par paquets
+    d'identifiants), quel que soit le nombre de chefs de projet qui les suivent.
+
+    Args:
+        project_ids: IDs des projets
+        overdue_limit: tâches en retard conservées par projet (les plus anciennes)
+        weeks: nombre de semaines de vélocité
+
+    Returns:
+        Dict project_id -> {'project', 'stats', 'blocked_tasks', 'overdue',
+        'velocity' (tâches complétées par semaine, de la plus ancienne à la
+        semaine en cours)}
+    """
+    today = date.today()
+    now = datetime.now()
+    with read_snapshot() as conn:
+        cursor = conn.cursor()
+        bundles = load_project_bundles(project_ids, parts=('stats',))
+        ids = list(bundles)
+        digests = {
+            project_id: {
+                'project': bundle.project,
+                'stats': bundle.stats,
+                'blocked_tasks': 0,
+                'overdue': [],
+                'velocity': [0] * weeks
+            }
+            for project_id, bundle in bundles.items()
+        }
+
+        for project_id, count in _select_by_ids(cursor, '''
+            SELECT project_id, COUNT(*) FROM tasks
+            WHERE status = 'BLOCKED' AND project_id IN ({}) GROUP BY project_id
+        ''', ids):
+            digests[project_id]['blocked_tasks'] = count
+
+        # Tâches en retard les plus anciennes de chaque projet (fenêtre par projet)
+        overdue_query = '''
+            SELECT * FROM (
+                SELECT t.*, u.full_name as assigned_name, p.name as project_name,
+                       ROW_NUMBER() OVER (PARTITION BY t.project_id ORDER BY t.deadline, t.id) as rank
+                FROM tasks t
+                LEFT JOIN users u ON t.assigned_to = u.id
+                LEFT JOIN projects p ON t.project_id = p.id
+                WHERE t.deadline < ? AND t.status != 'COMPLETED' AND t.project_id IN ({})
+            ) WHERE rank <= %d
+        ''' % overdue_limit
+        for row in _select_by_ids(cursor, overdue_query, ids, params=(today.isoformat(),)):
+            digests[row['project_id']]['overdue'].append(_task_from_row(row))
+
+        # Semaine 0: les 7 derniers jours, semaine 1: les 7 jours précédents, etc.
+        for project_id, week, count in _select_by_ids(cursor, '''
+            SELECT project_id, CAST((julianday(?) - julianday(completed_at)) / 7 AS INTEGER) as week,
+                   COUNT(*)
+            FROM tasks
+            WHERE status = 'COMPLETED'
+              AND julianday(completed_at) BETWEEN julianday(?) AND julianday(?)
+              AND project_id IN ({})
+            GROUP BY project_id, week
+        ''', ids, params=(now.isoformat(), (now - timedelta(days=7 * weeks)).isoformat(), now.isoformat())):
+            if 0 <= week < weeks:
+                digests[project_id]['velocity'][weeks - 1 - week] = count
+
+    return digests
+
+
+# ================== EXPORTS (LECTURE EN FLUX) ==================
+
+def _iter_rows(query: str, params=(), batch_size: int = EXPORT_BATCH_SIZE):
+    """
+    Parcourt le résultat d'une requête par paquets de batch_size lignes.
+    
+    Le curseur SQLite avance au fil de fetchmany: seules les lignes du paquet
+    courant sont en mémoire. La connexion est fermée quand le générateur est
+    épuisé ou fermé.
+    """
+    conn = get_connection()
+    try:
+        cursor = conn.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        conn.close()
+
+
+def iter_tasks(project_id: int = None, status: str = None, assigned_to: int = None,
+               batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Task]:
+    """Tâches filtrées comme get_all_tasks, lues en flux (exports volumineux)."""
+    query, params = _tasks_query(project_id, status, assigned_to)
+    for row in _iter_rows(query, params, batch_size):
+        yield _task_from_row(row)
+
+
+def iter_projects(batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Project]:
+    """Projets avec statistiques comme get_all_projects, lus en flux."""
+    query = '''
+        SELECT p.*,
+               COALESCE(t.total, 0) as total,
+               COALESCE(t.completed, 0) as completed,
+               t.avg_progress,
+               COALESCE(m.members, 0) as members
+        FROM projects p
+        LEFT JOIN (
+            SELECT project_id, COUNT(*) as total,
+                   SUM(status = 'COMPLETED') as completed,
+                   AVG(progress) as avg_progress
+            FROM tasks GROUP BY project_id
+        ) t ON t.project_id = p.id
+        LEFT JOIN (
+            SELECT project_id, COUNT(*) as members
+            FROM project_members GROUP BY project_id
+        ) m ON m.project_id = p.id
+        ORDER BY p.created_at DESC
+    '''
+    for row in _iter_rows(query, (), batch_size):
+        project = Project.from_row(row)
+        project.task_count = row['total']
+        project.member_count = row['members']
+        project.progress = _progress_from_counts(row)
+        yield project
+
+
+def iter_member_performance(batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[MemberPerformance]:
+    """Performances des membres comme get_member_performance, lues en flux."""
+    query, params = _member_performance_query()
+    for row in _iter_rows(query, params, batch_size):
+        yield _performance_from_row(row)
+
+
+# Jeux de données des sauvegardes complètes (tables brutes, ordre stable)
+EXPORT_DATASETS = {
+    'projects': "SELECT * FROM projects ORDER BY id",
+    'tasks': "SELECT * FROM tasks ORDER BY id",
+    'milestones': "SELECT * FROM milestones ORDER BY id",
+    'members': '''
+        SELECT pm.*, u.username, u.full_name
+        FROM project_members pm
+        LEFT JOIN users u ON pm.user_id = u.id
+        ORDER BY pm.id
+    ''',
+    'comments': "SELECT * FROM task_comments ORDER BY id",
+    'activity': "SELECT * FROM activity_log ORDER BY id"
+}
+
+
+def iter_dataset(name: str, batch_size: int = EXPORT_BATCH_SIZE):
+    """
+    Colonnes et lignes (en flux) d'un jeu de données de EXPORT_DATASETS.
+    
+    Returns:
+        Tuple (noms des colonnes, itérateur de lignes)
+    """
+    query = EXPORT_DATASETS[name]
+    conn = get_connection()
+    columns = [column[0] for column in conn.execute(f"{query} LIMIT 0").description]
+    conn.close()
+    return columns, _iter_rows(query, (), batch_size)
+
+
+# ================== TRAVAUX D'EXPORT ==================
+# Connexions hors instantané de lecture: l'avancement est écrit pendant que
+# le travail lit la base dans un read_snapshot()
+
+def create_report_job(kind: str, params: str, data_version: str = None, file_name: str = None,
+                      mime: str = None, requested_by: int = None) -> int:
+    """Ajoute un travail d'export à la file (params: JSON)."""
+    conn = get_connection(use_snapshot=False)
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO report_jobs (kind, params, data_version, file_name, mime,
+                                 requested_by, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (kind, params, data_version, file_name, mime, requested_by,
+          datetime.now().isoformat()))
+    conn.commit()
+    job_id = cursor.lastrowid
+    conn.close()
+    return job_id
+
+
+def find_reusable_report_job(kind: str, params: str, data_version: str,
+                             requested_by: int = None) -> Optional[ReportJob]:
+    """Travail identique (mêmes paramètres et données) en attente, en cours ou disponible."""
+    conn = get_connection(use_snapshot=False)
+    row = conn.execute('''
+        SELECT * FROM report_jobs
+        WHERE kind = ? AND params = ? AND data_version = ? AND requested_by IS ?
+          AND (status IN ('QUEUED', 'RUNNING') OR (status = 'DONE' AND expires_at > ?))
+        ORDER BY id DESC LIMIT 1
+    ''', (kind, params, data_version, requested_by, datetime.now().isoformat())).fetchone()
+    conn.close()
+    return ReportJob.from_row(row)
+
+
+def claim_report_job() -> Optional[ReportJob]:
+    """Prend le plus ancien travail en attente et le passe en cours (atomique entre processus)."""
+    conn = get_connection(use_snapshot=False)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT * FROM report_jobs WHERE status = 'QUEUED' ORDER BY id LIMIT 1"
+        ).fetchone()
+        if row is None:
+            conn.rollback()
+            return None
+        now = datetime.now().isoformat()
+        conn.execute('''
+            UPDATE report_jobs SET status = 'RUNNING', started_at = ?, heartbeat_at = ?
+            WHERE id = ?
+        ''', (now, now, row['id']))
+        conn.commit()
+    finally:
+        conn.close()
+    job = ReportJob.from_row(row)
+    job.status = 'RUNNING'
+    return job
+
+
+def update_report_job_progress(job_id: int, progress: float, message: str = None):
+    """Met à jour l'avancement (0 à 1) d'un travail en cours."""
+    conn = get_connection(use_snapshot=False)
+    conn.execute('''
+        UPDATE report_jobs SET progress = ?, message = ?, heartbeat_at = ?
+        WHERE id = ? AND status = 'RUNNING'
+    ''', (progress, message, datetime.now().isoformat(), job_id))
+    conn.commit()
+    conn.close()
+
+
+def finish_report_job(job_id: int, artifact_path: str, artifact_size: int, expires_at: str):
+    """Marque un travail terminé avec son fichier produit."""
+    conn = get_connection(use_snapshot=False)
+    conn.execute('''
+        UPDATE report_jobs
+        SET status = 'DONE', progress = 1, message = NULL, artifact_path = ?,
+            artifact_size = ?, finished_at = ?, expires_at = ?
+        WHERE id = ?
+    ''', (artifact_path, artifact_size, datetime.now().isoformat(), expires_at, job_id))
+    conn.commit()
+    conn.close()
+
+
+def fail_report_job(job_id: int, error: str):
+    """Marque un travail en échec."""
+    conn = get_connection(use_snapshot=False)
+    conn.execute('''
+        UPDATE report_jobs SET status = 'FAILED', error = ?, finished_at = ?
+        WHERE id = ?
+    ''', (error, datetime.now().isoformat(), job_id))
+    conn.commit()
+    conn.close()
+
+
+def expire_report_job(job_id: int) -> bool:
+    """Expire un travail terminé dont le fichier n'est plus disponible."""
+    conn = get_connection(use_snapshot=False)
+    cursor = conn.cursor()
+    cursor.execute('''
+        UPDATE report_jobs SET status = 'EXPIRED', artifact_path = NULL
+        WHERE id = ? AND status = 'DONE'
+    ''', (job_id,))
+    expired = cursor.rowcount > 0
+    conn.commit()
+    conn.close()
+    return expired
+
+
+def get_report_job(job_id: int) -> Optional[ReportJob]:
+    """Récupère un travail d'export par son ID."""
+    conn = get_connection(use_snapshot=False)
+    row = conn.execute("SELECT * FROM report_jobs WHERE id = ?", (job_id,)).fetchone()
+    conn.close()
+    return ReportJob.from_row(row)
+
+
+def get_user_report_jobs(user_id: int, limit: int = 10) -> List[ReportJob]:
+    """Derniers travaux d'export demandés par un utilisateur."""
+    conn = get_connection(use_snapshot=False)
+    rows = conn.execute('''
+        SELECT * FROM report_jobs WHERE requested_by = ?
+        ORDER BY id DESC LIMIT ?
+    ''', (user_id, limit)).fetchall()
+    conn.close()
+    return [ReportJob.from_row(row) for row in rows]
+
+
+def expire_report_jobs(now: str, stale_before: str) -> int:
+    """
+    Expire les travaux terminés dont la durée de conservation est dépassée, et
+    abandonne les travaux en cours sans nouvelles depuis stale_before.
     
+    Returns:
+        Nombre de travaux expirés (les fichiers appartiennent au cache d'exports)
+    """
+    conn = get_connection(use_snapshot=False)
+    cursor = conn.cursor()
+    cursor.execute('''
+        UPDATE report_jobs SET status = 'EXPIRED', artifact_path = NULL
+        WHERE status = 'DONE' AND expires_at <= ?
+    ''', (now,))
+    expired = cursor.rowcount
+    cursor.execute('''
+        UPDATE report_jobs SET status = 'FAILED', error = 'Travail interrompu', finished_at = ?
+        WHERE status = 'RUNNING' AND heartbeat_at < ?
+    ''', (now, stale_before))
+    conn.commit()
     conn.close()
-    return stats
+    return expired
+
+
+# ================== NOTIFICATIONS ==================
+
+def enqueue_overdue_notifications() -> int:
+    """Ajoute à la boîte d'envoi les tâches en retard non encore signalées."""
+    conn = get_connection(use_snapshot=False)
+    cursor = conn.cursor()
+    added = notifications.enqueue_overdue(cursor)
+    conn.commit()
+    conn.close()
+    return added
+
+
+def claim_notifications(max_recipients: int, lease_seconds: int) -> Dict[int, List[Notification]]:
+    """
+    Prend les notifications en attente des destinataires dont au moins une
+    notification est due, et les passe en cours d'envoi (atomique entre processus).
+
+    Toutes les notifications en attente d'un destinataire sont prises
+    ensemble, pour partir dans un seul message. Les notifications prises
+    depuis plus de lease_seconds par un processus arrêté sont reprises.
+
+    Returns:
+        Dict user_id -> notifications (dans l'ordre d'ajout)
+    """
+    now = datetime.now()
+    conn = get_connection(use_snapshot=False)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute('''
+            UPDATE notification_outbox SET status = 'PENDING', claimed_at = NULL
+            WHERE status = 'SENDING' AND claimed_at < ?
+        ''', ((now - timedelta(seconds=lease_seconds)).isoformat(),))
+        cursor.execute('''
+            SELECT user_id FROM notification_outbox
+            WHERE status = 'PENDING' AND next_attempt_at <= ?
+            GROUP BY user_id ORDER BY MIN(next_attempt_at) LIMIT ?
+        ''', (now.isoformat(), max_recipients))
+        user_ids = [row[0] for row in cursor.fetchall()]
+        rows = _select_by_ids(cursor, '''
+            SELECT * FROM notification_outbox
+            WHERE status = 'PENDING' AND user_id IN ({}) ORDER BY id
+        ''', user_ids)
+        _select_by_ids(cursor, '''
+            UPDATE notification_outbox SET status = 'SENDING', claimed_at = ?
+            WHERE status = 'PENDING' AND user_id IN ({})
+        ''', user_ids, params=(now.isoformat(),))
+        conn.commit()
+    finally:
+        conn.close()
+
+    claimed: Dict[int, List[Notification]] = {}
+    for row in rows:
+        notification = Notification.from_row(row)
+        notification.status = 'SENDING'
+        claimed.setdefault(notification.user_id, []).append(notification)
+    return claimed
+
+
+def finish_notifications(notification_ids: List[int]):
+    """Marque des notifications envoyées."""
+    conn = get_connection(use_snapshot=False)
+    _select_by_ids(conn.cursor(), '''
+        UPDATE notification_outbox
+        SET status = 'SENT', sent_at = ?, claimed_at = NULL, attempts = attempts + 1, error = NULL
+        WHERE id IN ({})
+    ''', notification_ids, params=(datetime.now().isoformat(),))
+    conn.commit()
+    conn.close()
+
+
+def fail_notifications(notification_ids: List[int], error: str, retry_at: str = None):
+    """
+    Enregistre l'échec de l'envoi de notifications.
+
+    Args:
+        retry_at: prochaine tentative (None: échec définitif)
+    """
+    conn = get_connection(use_snapshot=False)
+    _select_by_ids(conn.cursor(), '''
+        UPDATE notification_outbox
+        SET status = ?, next_attempt_at = COALESCE(?, next_attempt_at), claimed_at = NULL,
+            attempts = attempts + 1, error = ?
+        WHERE id IN ({})
+    ''', notification_ids, params=('PENDING' if retry_at else 'FAILED', retry_at, error))
+    conn.commit()
+    conn.close()
+
+
+def purge_notifications(sent_before: str) -> int:
+    """
+    Supprime les notifications envoyées avant sent_before.
+
+    Une notification de retard est conservée tant que sa clé de
+    déduplication désigne encore une tâche ouverte (même échéance, même
+    responsable): la supprimer ferait renvoyer le rappel au passage suivant
+    de enqueue_overdue.
+    """
+    conn = get_connection(use_snapshot=False)
+    cursor = conn.cursor()
+    cursor.execute('''
+        DELETE FROM notification_outbox
+        WHERE status = 'SENT' AND sent_at < ?
+          AND (dedup_key IS NULL OR NOT EXISTS (
+              SELECT 1 FROM tasks t
+              WHERE t.id = notification_outbox.task_id AND t.status != 'COMPLETED'
+                AND 'overdue:' || t.id || ':' || t.deadline || ':' || t.assigned_to
+                    = notification_outbox.dedup_key
+          ))
+    ''', (sent_before,))
+    deleted = cursor.rowcount
+    conn.commit()
+    conn.close()
+    return deleted
+
+
+def get_notification_counts() -> Dict[str, int]:
+    """Nombre de notifications de la boîte d'envoi par statut."""
+    conn = get_connection(use_snapshot=False)
+    rows = conn.execute(
+        "SELECT status, COUNT(*) FROM notification_outbox GROUP BY status"
+    ).fetchall()
+    conn.close()
+    return {status: count for status, count in rows}
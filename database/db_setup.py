@@ -4,27 +4,110 @@ Configuration et initialisation de la base de données SQLite.
 
 import sqlite3
 import os
+import functools
+import threading
 import bcrypt
+from contextlib import contextmanager
 from datetime import datetime
 
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import DATABASE_PATH, ROLE_ADMIN, ROLE_PROJECT_MANAGER, ROLE_MEMBER
+from utils.cache import cache_bypass
 
 
-def get_connection():
-    """Crée et retourne une connexion à la base de données."""
+_local = threading.local()
+
+
+def get_connection(use_snapshot: bool = True):
+    """
+    Crée et retourne une connexion à la base de données.
+    
+    Dans un bloc read_snapshot(), retourne la connexion partagée du bloc,
+    sauf avec use_snapshot=False (écritures de suivi faites pendant une
+    lecture, comme l'avancement d'un travail d'export).
+    """
+    snapshot = getattr(_local, 'snapshot', None)
+    if snapshot is not None and use_snapshot:
+        return snapshot
     os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
     conn = sqlite3.connect(DATABASE_PATH)
     conn.row_factory = sqlite3.Row
     return conn
 
 
+class _SnapshotConnection:
+    """Connexion d'un read_snapshot(): close(), commit() et rollback() sont sans effet."""
+    
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+    
+    def close(self):
+        pass
+    
+    def commit(self):
+        pass
+    
+    def rollback(self):
+        pass
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+@contextmanager
+def read_snapshot():
+    """
+    Exécute les lectures du bloc sur un instantané cohérent de la base.
+    
+    Toutes les fonctions qui appellent get_connection() dans ce thread
+    utilisent une seule connexion, dans une transaction de lecture ouverte
+    au début du bloc: les comptes et listes d'un même rapport proviennent du
+    même état de la base, même si des écritures sont validées entre-temps,
+    et le coût d'ouverture d'une connexion n'est payé qu'une fois. La
+    connexion est en lecture seule (PRAGMA query_only). Les blocs imbriqués
+    réutilisent l'instantané existant.
+    
+    Le cache de lecture est ignoré dans le bloc: une valeur en cache peut
+    être plus récente que l'instantané, et une valeur calculée sur
+    l'instantané ne doit pas y être stockée.
+    """
+    if getattr(_local, 'snapshot', None) is not None:
+        yield _local.snapshot
+        return
+    conn = get_connection()
+    conn.execute("PRAGMA query_only = 1")
+    conn.execute("BEGIN")
+    # L'instantané de lecture est pris à la première lecture de la transaction
+    conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+    _local.snapshot = _SnapshotConnection(conn)
+    try:
+        with cache_bypass():
+            yield _local.snapshot
+    finally:
+        _local.snapshot = None
+        conn.rollback()
+        conn.close()
+
+
+def in_read_snapshot(func):
+    """Exécute la fonction dans un read_snapshot() (rapports multi-requêtes)."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with read_snapshot():
+            return func(*args, **kwargs)
+    return wrapper
+
+
 def init_database():
     """Initialise la base de données avec toutes les tables nécessaires."""
     conn = get_connection()
     cursor = conn.cursor()
     
+    # Journal WAL: les lectures (instantanés des rapports) ne bloquent pas
+    # les écritures, et inversement
+    cursor.execute("PRAGMA journal_mode = WAL")
+    
     # Table des utilisateurs
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS users (
@@ -137,6 +220,172 @@ def init_database():
         )
     ''')
     
+    # Historique des changements de statut des tâches (ajout uniquement)
+    history_exists = _table_exists(cursor, 'task_status_history')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS task_status_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id INTEGER NOT NULL,
+            project_id INTEGER NOT NULL,
+            from_status TEXT,
+            to_status TEXT NOT NULL,
+            changed_by INTEGER,
+            changed_at TIMESTAMP NOT NULL,
+            FOREIGN KEY (task_id) REFERENCES tasks(id) ON DELETE CASCADE,
+            FOREIGN KEY (changed_by) REFERENCES users(id) ON DELETE SET NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_status_history_project
+        ON task_status_history(project_id, changed_at)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_status_history_task
+        ON task_status_history(task_id, changed_at)
+    ''')
+    if not history_exists:
+        backfill_status_history(cursor)
+
+    # Journal des modifications champ par champ (conservé après suppression des entités)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS change_journal (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entity_type TEXT NOT NULL,
+            entity_id INTEGER NOT NULL,
+            project_id INTEGER,
+            field TEXT NOT NULL,
+            old_value TEXT,
+            new_value TEXT,
+            changed_by INTEGER,
+            changed_at TIMESTAMP NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_journal_project
+        ON change_journal(project_id, entity_type, id)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_journal_entity
+        ON change_journal(entity_type, entity_id, id)
+    ''')
+
+    # Points de reprise de l'état des tâches d'un projet
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS journal_checkpoints (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            project_id INTEGER NOT NULL,
+            journal_id INTEGER NOT NULL,
+            taken_at TIMESTAMP NOT NULL,
+            snapshot BLOB NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_checkpoints_project
+        ON journal_checkpoints(project_id, taken_at)
+    ''')
+
+    # Saisie des temps passés (ajout uniquement) et cumuls incrémentaux
+    time_entries_exist = _table_exists(cursor, 'time_entries')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS time_entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id INTEGER NOT NULL,
+            user_id INTEGER,
+            project_id INTEGER NOT NULL,
+            started_at TIMESTAMP NOT NULL,
+            duration_hours REAL NOT NULL,
+            note TEXT,
+            created_at TIMESTAMP NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_time_entries_task
+        ON time_entries(task_id, started_at)
+    ''')
+    # Cumuls par jour pour chaque tâche, utilisateur et projet (scope, key, day)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS time_rollups (
+            scope TEXT NOT NULL,
+            key INTEGER NOT NULL,
+            day DATE NOT NULL,
+            hours REAL NOT NULL DEFAULT 0,
+            entries INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (scope, key, day)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_time_rollups_day
+        ON time_rollups(scope, day)
+    ''')
+    if not time_entries_exist:
+        backfill_time_entries(cursor)
+    
+    # Compteurs de modifications par table (invalidation des caches entre processus)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS change_counters (
+            tag TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    
+    # Travaux d'export en arrière-plan (file d'attente et artefacts produits)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS report_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            params TEXT NOT NULL DEFAULT '{}',
+            data_version TEXT,
+            status TEXT NOT NULL DEFAULT 'QUEUED',
+            progress REAL NOT NULL DEFAULT 0,
+            message TEXT,
+            file_name TEXT,
+            mime TEXT,
+            artifact_path TEXT,
+            artifact_size INTEGER,
+            error TEXT,
+            requested_by INTEGER,
+            created_at TIMESTAMP NOT NULL,
+            started_at TIMESTAMP,
+            heartbeat_at TIMESTAMP,
+            finished_at TIMESTAMP,
+            expires_at TIMESTAMP,
+            FOREIGN KEY (requested_by) REFERENCES users(id) ON DELETE SET NULL
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_report_jobs_status ON report_jobs(status, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_report_jobs_user ON report_jobs(requested_by, id)")
+    
+    # Boîte d'envoi des notifications par email (une ligne par destinataire et
+    # par évènement, ajoutée dans la transaction de l'écriture qui la provoque)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS notification_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            event TEXT NOT NULL,
+            task_id INTEGER,
+            project_id INTEGER,
+            payload TEXT NOT NULL DEFAULT '{}',
+            dedup_key TEXT UNIQUE,
+            status TEXT NOT NULL DEFAULT 'PENDING',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TIMESTAMP NOT NULL,
+            claimed_at TIMESTAMP,
+            created_at TIMESTAMP NOT NULL,
+            sent_at TIMESTAMP,
+            error TEXT,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_outbox_pending
+        ON notification_outbox(status, next_attempt_at)
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_outbox_user ON notification_outbox(user_id, status)")
+    
+    # Index pour les jointures et agrégations fréquentes
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_project ON tasks(project_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_assigned_to ON tasks(assigned_to)")
+    
     conn.commit()
     
     # Créer les utilisateurs par défaut si la table est vide
@@ -149,6 +398,68 @@ def init_database():
     return True
 
 
+def _table_exists(cursor, name: str) -> bool:
+    """Vérifie si une table existe déjà dans la base."""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,))
+    return cursor.fetchone() is not None
+
+
+def backfill_status_history(cursor):
+    """
+    Reconstitue un historique minimal pour les tâches créées avant
+    l'introduction de task_status_history (création puis statut actuel).
+    """
+    cursor.execute('''
+        INSERT INTO task_status_history (task_id, project_id, from_status, to_status, changed_at)
+        SELECT t.id, t.project_id, NULL, 'TODO', strftime('%Y-%m-%dT%H:%M:%S', t.created_at)
+        FROM tasks t
+    ''')
+    cursor.execute('''
+        INSERT INTO task_status_history (task_id, project_id, from_status, to_status, changed_at)
+        SELECT t.id, t.project_id, 'TODO', t.status,
+               strftime('%Y-%m-%dT%H:%M:%S', COALESCE(t.completed_at, t.updated_at, t.created_at))
+        FROM tasks t
+        WHERE t.status != 'TODO'
+    ''')
+
+
+def backfill_time_entries(cursor):
+    """
+    Convertit les heures réelles saisies à la main avant l'introduction de
+    time_entries en une saisie unique par tâche, puis calcule les cumuls.
+    """
+    cursor.execute('''
+        INSERT INTO time_entries (task_id, user_id, project_id, started_at,
+                                  duration_hours, note, created_at)
+        SELECT t.id, t.assigned_to, t.project_id,
+               strftime('%Y-%m-%dT%H:%M:%S', COALESCE(t.completed_at, t.updated_at, t.created_at)),
+               t.actual_hours, 'Reprise de la saisie manuelle',
+               strftime('%Y-%m-%dT%H:%M:%S', 'now', 'localtime')
+        FROM tasks t
+        WHERE t.actual_hours > 0
+    ''')
+    rebuild_time_rollups(cursor)
+
+
+def rebuild_time_rollups(cursor):
+    """Recalcule entièrement les cumuls de temps et les heures réelles des tâches."""
+    cursor.execute("DELETE FROM time_rollups")
+    for scope, column in (('task', 'task_id'), ('user', 'user_id'), ('project', 'project_id')):
+        cursor.execute(f'''
+            INSERT INTO time_rollups (scope, key, day, hours, entries)
+            SELECT '{scope}', {column}, date(started_at), SUM(duration_hours), COUNT(*)
+            FROM time_entries
+            WHERE {column} IS NOT NULL
+            GROUP BY {column}, date(started_at)
+        ''')
+    cursor.execute('''
+        UPDATE tasks SET actual_hours = (
+            SELECT SUM(r.hours) FROM time_rollups r
+            WHERE r.scope = 'task' AND r.key = tasks.id
+        )
+    ''')
+
+
 def create_default_users(cursor):
     """Crée les utilisateurs par défaut pour les tests."""
     # Mots de passe hashés
@@ -0,0 +1,231 @@
+"""
+Carte d'identité des entités pour une exécution de page (rerun Streamlit).
+
+Dans un contexte request_scope(), chaque utilisateur, projet ou tâche n'est
+lu qu'une fois: les appels suivants de get_user_by_id, get_project_by_id ou
+get_task_by_id retournent la même instance. Les listes déjà chargées
+alimentent la carte (prime), et les identifiants annoncés avec prefetch()
+sont regroupés puis lus en une seule requête WHERE id IN (...) au premier
+chargement, à la manière d'un DataLoader.
+
+Les fonctions de service décorées avec @per_request(*tags) ne sont
+exécutées qu'une fois par exécution pour des arguments donnés: les pages
+qui en ont besoin partagent le même résultat.
+
+Une écriture (invalidated, appelé par les fonctions crud) retire de la carte
+courante les entités et résultats dont les tables ont changé. Hors
+contexte, les lectures interrogent directement la base.
+"""
+
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.cache import add_invalidation_listener
+
+
+# type d'entité -> (lecture groupée ids -> {id: entité}, tags qui l'invalident)
+_LOADERS: Dict[str, tuple] = {}
+
+
+def batch_loader(kind: str, *tags: str):
+    """Enregistre la fonction de lecture groupée d'un type d'entité."""
+    def decorator(func: Callable[[List[int]], Dict[int, Any]]):
+        _LOADERS[kind] = (func, frozenset(tags))
+        return func
+
+    return decorator
+
+
+class EntityLoader:
+    """Entités d'un type déjà lues pendant l'exécution, et identifiants en attente."""
+
+    def __init__(self, kind: str, fetch_many: Callable[[List[int]], Dict[int, Any]]):
+        self.kind = kind
+        self._fetch_many = fetch_many
+        self._entities: Dict[int, Any] = {}   # id -> entité (None si inexistante)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.batches = 0
+
+    def prefetch(self, ids: Iterable[int]):
+        """Annonce des identifiants: ils seront lus avec le prochain chargement."""
+        with self._lock:
+            self._pending.update(i for i in ids if i is not None and i not in self._entities)
+
+    def prime(self, entities: Iterable[Any]):
+        """Ajoute des entités déjà chargées (sans remplacer celles présentes)."""
+        with self._lock:
+            for entity in entities:
+                self._entities.setdefault(entity.id, entity)
+                self._pending.discard(entity.id)
+
+    def load(self, entity_id: int) -> Optional[Any]:
+        """Retourne une entité (une requête groupée si elle n'est pas encore connue)."""
+        return self.load_many([entity_id]).get(entity_id)
+
+    def load_many(self, ids: Iterable[int]) -> Dict[int, Any]:
+        """Retourne les entités demandées par id, en une requête pour les manquantes."""
+        ids = [i for i in ids if i is not None]
+        with self._lock:
+            missing = {i for i in ids if i not in self._entities}
+            self.hits += len(ids) - len(missing)
+            if missing:
+                batch = missing | self._pending
+                self._pending.clear()
+                fetched = self._fetch_many(sorted(batch))
+                self.batches += 1
+                for entity_id in batch:
+                    self._entities[entity_id] = fetched.get(entity_id)
+            return {i: self._entities[i] for i in ids}
+
+    def clear(self):
+        """Oublie les entités chargées."""
+        with self._lock:
+            self._entities.clear()
+            self._pending.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'size': len(self._entities), 'hits': self.hits, 'batches': self.batches}
+
+
+class IdentityMap:
+    """Ensemble des EntityLoader d'une exécution de page."""
+
+    def __init__(self):
+        self._loaders: Dict[str, EntityLoader] = {}
+        self._memo: Dict[Any, tuple] = {}     # clé -> (tags, résultat)
+        self._lock = threading.Lock()
+
+    def loader(self, kind: str) -> EntityLoader:
+        with self._lock:
+            loader = self._loaders.get(kind)
+            if loader is None:
+                loader = self._loaders[kind] = EntityLoader(kind, _LOADERS[kind][0])
+            return loader
+
+    def memo(self, key, tags: frozenset, factory: Callable[[], Any]) -> Any:
+        """Résultat mémorisé pour la clé, calculé par factory au premier appel."""
+        with self._lock:
+            entry = self._memo.get(key)
+        if entry is not None:
+            return entry[1]
+        value = factory()
+        with self._lock:
+            self._memo[key] = (tags, value)
+        return value
+
+    def invalidate(self, tags: Iterable[str]):
+        """Vide les entités et résultats lus dans l'une des tables modifiées."""
+        tags = set(tags)
+        with self._lock:
+            self._memo = {k: e for k, e in self._memo.items() if not e[0] & tags}
+            loaders = list(self._loaders.items())
+        for kind, loader in loaders:
+            if _LOADERS[kind][1] & tags:
+                loader.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Taille, lectures évitées et requêtes groupées par type d'entité."""
+        with self._lock:
+            loaders = list(self._loaders.items())
+        return {kind: loader.stats() for kind, loader in loaders}
+
+
+_local = threading.local()
+
+
+def current_identity_map() -> Optional[IdentityMap]:
+    """Carte d'identité active dans le thread courant."""
+    return getattr(_local, 'identity_map', None)
+
+
+@contextmanager
+def request_scope(identity_map: IdentityMap = None):
+    """
+    Active une carte d'identité pendant le bloc (une exécution de page).
+
+    Sans argument, la carte déjà active est réutilisée (contextes imbriqués);
+    une carte peut être passée explicitement pour la partager avec un thread
+    de travail.
+    """
+    previous = current_identity_map()
+    if identity_map is None:
+        identity_map = previous or IdentityMap()
+    _local.identity_map = identity_map
+    try:
+        yield identity_map
+    finally:
+        _local.identity_map = previous
+
+
+def load(kind: str, entity_id: int) -> Optional[Any]:
+    """Charge une entité via la carte courante, ou directement hors contexte."""
+    identity_map = current_identity_map()
+    if identity_map is None:
+        return _LOADERS[kind][0]([entity_id]).get(entity_id)
+    return identity_map.loader(kind).load(entity_id)
+
+
+def load_many(kind: str, ids: Iterable[int]) -> Dict[int, Any]:
+    """Charge plusieurs entités en une requête (moins celles déjà connues)."""
+    identity_map = current_identity_map()
+    if identity_map is None:
+        ids = [i for i in ids if i is not None]
+        fetched = _LOADERS[kind][0](sorted(set(ids))) if ids else {}
+        return {i: fetched.get(i) for i in ids}
+    return identity_map.loader(kind).load_many(ids)
+
+
+def prefetch(kind: str, ids: Iterable[int]):
+    """Annonce des identifiants qui seront lus ensemble au prochain chargement."""
+    identity_map = current_identity_map()
+    if identity_map is not None:
+        identity_map.loader(kind).prefetch(ids)
+
+
+def prime(kind: str, entities: Iterable[Any]):
+    """Ajoute à la carte courante des entités déjà chargées par une liste."""
+    identity_map = current_identity_map()
+    if identity_map is not None:
+        identity_map.loader(kind).prime(entities)
+
+
+def per_request(*tags: str):
+    """
+    Mémorise le résultat d'une fonction pendant l'exécution courante.
+
+    Args:
+        tags: tables lues par la fonction (une écriture oublie le résultat)
+    """
+    tags = frozenset(tags)
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            identity_map = current_identity_map()
+            if identity_map is None:
+                return func(*args, **kwargs)
+            key = (name, args, tuple(sorted(kwargs.items())))
+            return identity_map.memo(key, tags, lambda: func(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
+
+
+def _on_invalidate(tags):
+    identity_map = current_identity_map()
+    if identity_map is not None:
+        identity_map.invalidate(tags)
+
+
+add_invalidation_listener(_on_invalidate)
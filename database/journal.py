@@ -0,0 +1,227 @@
+"""
+Journal des modifications champ par champ et requêtes "à une date donnée".
+
+Chaque écriture sur une tâche, un projet ou un milestone ajoute une ligne
+par champ modifié dans change_journal, dans la transaction de l'écriture.
+Des points de reprise (checkpoints) compressés de l'état des tâches d'un
+projet sont pris périodiquement: reconstituer un projet à une date donnée
+revient à charger le dernier checkpoint antérieur puis à rejouer les seules
+entrées du journal qui le suivent.
+"""
+
+import json
+import zlib
+from datetime import datetime
+from typing import List, Optional, Dict, Any
+
+from .db_setup import get_connection
+from .models import Task
+
+
+# Nombre d'entrées du journal d'un projet entre deux checkpoints
+JOURNAL_CHECKPOINT_INTERVAL = 200
+
+# Pseudo-champs pour la création et la suppression d'une entité
+FIELD_CREATED = "__created__"
+FIELD_DELETED = "__deleted__"
+
+TRACKED_TABLES = {
+    'task': 'tasks',
+    'project': 'projects',
+    'milestone': 'milestones'
+}
+
+
+def _encode(value) -> Optional[str]:
+    """Encode une valeur de colonne pour le journal (JSON compact)."""
+    if value is None:
+        return None
+    return json.dumps(value, default=str, separators=(',', ':'))
+
+
+def _decode(value: Optional[str]):
+    """Décode une valeur du journal."""
+    return None if value is None else json.loads(value)
+
+
+def record_changes(cursor, entity_type: str, entity_id: int, project_id: Optional[int],
+                   old_row: Optional[Dict[str, Any]], new_values: Dict[str, Any],
+                   user_id: int = None, changed_at: str = None):
+    """
+    Ajoute au journal les champs modifiés d'une entité (transaction de l'appelant).
+
+    Args:
+        old_row: valeurs avant modification (None pour une création)
+        new_values: valeurs écrites (pour une création, la ligne complète)
+    """
+    changed_at = changed_at or datetime.now().isoformat()
+    if old_row is None:
+        entries = [(FIELD_CREATED, None, _encode(new_values))]
+    else:
+        entries = [
+            (field, _encode(old_row[field]), _encode(value))
+            for field, value in new_values.items()
+            if field in old_row.keys() and _encode(old_row[field]) != _encode(value)
+        ]
+    if not entries:
+        return
+
+    if entity_type == 'task':
+        _ensure_checkpoint(cursor, project_id, changed_at, entity_id, old_row)
+
+    cursor.executemany('''
+        INSERT INTO change_journal (entity_type, entity_id, project_id, field,
+                                    old_value, new_value, changed_by, changed_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [(entity_type, entity_id, project_id, field, old, new, user_id, changed_at)
+          for field, old, new in entries])
+
+    if entity_type == 'task':
+        _maybe_checkpoint(cursor, project_id, changed_at)
+
+
+def record_deletion(cursor, entity_type: str, entity_id: int, project_id: Optional[int],
+                    old_row: Dict[str, Any], user_id: int = None):
+    """Ajoute au journal la suppression d'une entité (transaction de l'appelant)."""
+    changed_at = datetime.now().isoformat()
+    if entity_type == 'task':
+        _ensure_checkpoint(cursor, project_id, changed_at, entity_id, old_row)
+    cursor.execute('''
+        INSERT INTO change_journal (entity_type, entity_id, project_id, field,
+                                    old_value, new_value, changed_by, changed_at)
+        VALUES (?, ?, ?, ?, ?, NULL, ?, ?)
+    ''', (entity_type, entity_id, project_id, FIELD_DELETED, _encode(dict(old_row)),
+          user_id, changed_at))
+    if entity_type == 'task':
+        _maybe_checkpoint(cursor, project_id, changed_at)
+
+
+def _ensure_checkpoint(cursor, project_id: int, taken_at: str, entity_id: int,
+                       old_row: Optional[Dict[str, Any]]):
+    """
+    Crée le premier checkpoint d'un projet avant sa première entrée de journal,
+    afin que l'état antérieur au journal soit connu.
+
+    L'écriture en cours a déjà été appliquée à la table: l'entité modifiée
+    est remise dans son état précédent (ou retirée s'il s'agit d'une création).
+    """
+    cursor.execute("SELECT 1 FROM journal_checkpoints WHERE project_id = ? LIMIT 1", (project_id,))
+    if cursor.fetchone() is None:
+        _write_checkpoint(cursor, project_id, taken_at, {str(entity_id): old_row})
+
+
+def _maybe_checkpoint(cursor, project_id: int, taken_at: str):
+    """Prend un checkpoint si assez d'entrées se sont accumulées depuis le dernier."""
+    cursor.execute('''
+        SELECT COUNT(*) FROM change_journal
+        WHERE project_id = ? AND entity_type = 'task'
+        AND id > (SELECT MAX(journal_id) FROM journal_checkpoints WHERE project_id = ?)
+    ''', (project_id, project_id))
+    if cursor.fetchone()[0] >= JOURNAL_CHECKPOINT_INTERVAL:
+        _write_checkpoint(cursor, project_id, taken_at)
+
+
+def _write_checkpoint(cursor, project_id: int, taken_at: str,
+                      overrides: Dict[str, Optional[Dict[str, Any]]] = None):
+    """Enregistre l'état courant des tâches d'un projet, compressé."""
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM change_journal")
+    journal_id = cursor.fetchone()[0]
+    cursor.execute("SELECT * FROM tasks WHERE project_id = ?", (project_id,))
+    tasks = {str(row['id']): dict(row) for row in cursor.fetchall()}
+    for key, row in (overrides or {}).items():
+        if row is None:
+            tasks.pop(key, None)
+        else:
+            tasks[key] = dict(row)
+    snapshot = zlib.compress(json.dumps(tasks, default=str, separators=(',', ':')).encode('utf-8'))
+    cursor.execute('''
+        INSERT INTO journal_checkpoints (project_id, journal_id, taken_at, snapshot)
+        VALUES (?, ?, ?, ?)
+    ''', (project_id, journal_id, taken_at, snapshot))
+
+
+def get_project_tasks_as_of(project_id: int, as_of: datetime) -> List[Task]:
+    """
+    Reconstitue les tâches d'un projet telles qu'elles étaient à une date donnée.
+
+    Seules les entrées postérieures au dernier checkpoint antérieur à as_of
+    sont rejouées. Avant le premier checkpoint, seules les créations de
+    tâches sont connues: l'état du premier checkpoint est alors filtré sur
+    la date de création.
+    """
+    as_of_str = as_of.isoformat() if isinstance(as_of, datetime) else str(as_of)
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        SELECT journal_id, snapshot FROM journal_checkpoints
+        WHERE project_id = ? AND taken_at <= ?
+        ORDER BY journal_id DESC LIMIT 1
+    ''', (project_id, as_of_str))
+    checkpoint = cursor.fetchone()
+
+    if checkpoint is None:
+        cursor.execute('''
+            SELECT journal_id, snapshot FROM journal_checkpoints
+            WHERE project_id = ? ORDER BY journal_id LIMIT 1
+        ''', (project_id,))
+        first = cursor.fetchone()
+        if first is None:
+            # Aucun journal: l'état courant est le seul connu
+            cursor.execute("SELECT * FROM tasks WHERE project_id = ?", (project_id,))
+            state = {str(row['id']): dict(row) for row in cursor.fetchall()}
+        else:
+            state = _load_snapshot(first['snapshot'])
+        conn.close()
+        return _to_tasks(state, created_before=as_of_str)
+
+    state = _load_snapshot(checkpoint['snapshot'])
+    cursor.execute('''
+        SELECT entity_id, field, new_value FROM change_journal
+        WHERE project_id = ? AND entity_type = 'task' AND id > ? AND changed_at <= ?
+        ORDER BY id
+    ''', (project_id, checkpoint['journal_id'], as_of_str))
+    for row in cursor.fetchall():
+        key = str(row['entity_id'])
+        if row['field'] == FIELD_CREATED:
+            state[key] = _decode(row['new_value'])
+        elif row['field'] == FIELD_DELETED:
+            state.pop(key, None)
+        elif key in state:
+            state[key][row['field']] = _decode(row['new_value'])
+    conn.close()
+    return _to_tasks(state)
+
+
+def _load_snapshot(blob: bytes) -> Dict[str, Dict[str, Any]]:
+    """Décompresse un checkpoint."""
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+def _to_tasks(state: Dict[str, Dict[str, Any]], created_before: str = None) -> List[Task]:
+    """Convertit un état reconstitué en liste de Task triée par id."""
+    tasks = []
+    for row in sorted(state.values(), key=lambda r: r['id']):
+        if created_before and row.get('created_at') and str(row['created_at']).replace(' ', 'T') > created_before:
+            continue
+        tasks.append(Task.from_row(row))
+    return tasks
+
+
+def get_entity_changes(entity_type: str, entity_id: int, limit: int = 100) -> List[Dict[str, Any]]:
+    """Récupère les dernières modifications d'une entité, champ par champ."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT j.*, u.full_name as user_name
+        FROM change_journal j
+        LEFT JOIN users u ON j.changed_by = u.id
+        WHERE j.entity_type = ? AND j.entity_id = ?
+        ORDER BY j.id DESC LIMIT ?
+    ''', (entity_type, entity_id, limit))
+    rows = cursor.fetchall()
+    conn.close()
+    return [
+        {**dict(row), 'old_value': _decode(row['old_value']), 'new_value': _decode(row['new_value'])}
+        for row in rows
+    ]
@@ -3,6 +3,7 @@ Modèles de données pour l'application de gestion de projets.
 Utilise des dataclasses Python pour représenter les entités.
 """
 
+import json
 from dataclasses import dataclass, field
 from datetime import datetime, date
 from typing import Optional, List
@@ -155,7 +156,7 @@ class Task:
         )
         # Vérifier si la tâche est en retard
         if task.deadline and task.status != "COMPLETED":
-            deadline_date = datetime.strptime(task.deadline, "%Y-%m-%d").date() if isinstance(task.deadline, str) else task.deadline
+            deadline_date = date.fromisoformat(task.deadline) if isinstance(task.deadline, str) else task.deadline
             task.is_overdue = deadline_date < date.today()
         return task
 
@@ -265,3 +266,148 @@ class MemberPerformance:
     overdue_tasks: int = 0
     completion_rate: float = 0.0
     average_progress: float = 0.0
+
+
+@dataclass
+class EarnedValue:
+    """Indicateurs de valeur acquise (EVM) d'un projet, d'un milestone ou du portefeuille."""
+    entity_type: str
+    entity_id: Optional[int]
+    name: str
+    project_id: Optional[int] = None
+    budget_at_completion: float = 0.0
+    planned_value: float = 0.0
+    earned_value: float = 0.0
+    actual_cost: float = 0.0
+    cpi: Optional[float] = None
+    spi: Optional[float] = None
+    estimate_at_completion: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """Instantané immuable des données du tableau de bord administrateur."""
+    stats: DashboardStats
+    projects: tuple
+    velocity: dict
+    performances: tuple
+    overdue_tasks: tuple
+    built_at: datetime
+    build_seconds: float
+    token: Optional[tuple] = None
+    timings: Optional[dict] = None
+
+    @property
+    def age_seconds(self) -> float:
+        """Âge de l'instantané en secondes."""
+        return (datetime.now() - self.built_at).total_seconds()
+
+
+@dataclass
+class ProjectBundle:
+    """Données d'un projet chargées en une transaction (parties non demandées: None)."""
+    project: Project
+    stats: Optional[dict] = None
+    milestones: Optional[List[Milestone]] = None
+    members: Optional[List[ProjectMember]] = None
+    tasks: Optional[List[Task]] = None
+    logged_hours: Optional[float] = None
+
+
+@dataclass
+class MemberHome:
+    """Données des pages membre d'un utilisateur, lues en une transaction."""
+    user_id: int
+    performance: Optional[MemberPerformance]
+    workload: dict
+    tasks: List[Task]
+    projects: List[Project]
+    project_stats: dict          # project_id -> statistiques (format get_project_stats)
+    recent_completions: List[Task]
+
+
+@dataclass
+class ReportJob:
+    """Travail d'export exécuté en arrière-plan (rapport PDF, CSV, sauvegarde)."""
+    id: int
+    kind: str
+    params: dict
+    status: str = "QUEUED"
+    progress: float = 0.0
+    message: Optional[str] = None
+    data_version: Optional[str] = None
+    file_name: Optional[str] = None
+    mime: Optional[str] = None
+    artifact_path: Optional[str] = None
+    artifact_size: Optional[int] = None
+    error: Optional[str] = None
+    requested_by: Optional[int] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+
+    @classmethod
+    def from_row(cls, row):
+        """Crée un ReportJob à partir d'une ligne de base de données."""
+        if row is None:
+            return None
+        return cls(
+            id=row['id'],
+            kind=row['kind'],
+            params=json.loads(row['params'] or '{}'),
+            status=row['status'],
+            progress=row['progress'] or 0.0,
+            message=row['message'],
+            data_version=row['data_version'],
+            file_name=row['file_name'],
+            mime=row['mime'],
+            artifact_path=row['artifact_path'],
+            artifact_size=row['artifact_size'],
+            error=row['error'],
+            requested_by=row['requested_by'],
+            created_at=row['created_at'],
+            started_at=row['started_at'],
+            finished_at=row['finished_at'],
+            expires_at=row['expires_at']
+        )
+
+    @property
+    def is_active(self) -> bool:
+        """Travail en attente ou en cours."""
+        return self.status in ('QUEUED', 'RUNNING')
+
+
+@dataclass
+class Notification:
+    """Notification par email de la boîte d'envoi (un destinataire, un évènement)."""
+    id: int
+    user_id: int
+    event: str
+    task_id: Optional[int] = None
+    project_id: Optional[int] = None
+    payload: dict = field(default_factory=dict)
+    status: str = "PENDING"
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    sent_at: Optional[datetime] = None
+
+    @classmethod
+    def from_row(cls, row):
+        """Crée une Notification à partir d'une ligne de base de données."""
+        if row is None:
+            return None
+        return cls(
+            id=row['id'],
+            user_id=row['user_id'],
+            event=row['event'],
+            task_id=row['task_id'],
+            project_id=row['project_id'],
+            payload=json.loads(row['payload'] or '{}'),
+            status=row['status'],
+            attempts=row['attempts'],
+            error=row['error'],
+            created_at=row['created_at'],
+            sent_at=row['sent_at']
+        )
@@ -0,0 +1,117 @@
+"""
+Boîte d'envoi des notifications par email (table notification_outbox).
+
+Les écritures qui concernent un utilisateur (tâche assignée, changement de
+statut, commentaire) ajoutent une ligne par destinataire dans la
+transaction de l'écriture: une notification existe si et seulement si
+l'écriture a été validée, et aucune requête n'attend un serveur de
+messagerie. Les tâches en retard sont ajoutées par enqueue_overdue, une
+seule fois par tâche, échéance et destinataire.
+
+L'auteur d'une modification n'est pas notifié de sa propre action.
+L'envoi est fait par services/notification_service.
+"""
+
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from config import NOTIFY_COALESCE_SECONDS
+
+
+EVENT_ASSIGNED = "TASK_ASSIGNED"
+EVENT_STATUS = "TASK_STATUS"
+EVENT_COMMENT = "TASK_COMMENT"
+EVENT_OVERDUE = "TASK_OVERDUE"
+
+# Longueur maximale d'un commentaire recopié dans une notification
+COMMENT_EXCERPT_LENGTH = 500
+
+
+def _project(cursor, project_id: int) -> Tuple[Optional[str], Optional[int]]:
+    """Nom et créateur (chef de projet) d'un projet."""
+    cursor.execute("SELECT name, created_by FROM projects WHERE id = ?", (project_id,))
+    row = cursor.fetchone()
+    return (row[0], row[1]) if row else (None, None)
+
+
+def _enqueue(cursor, events: Iterable[Tuple[Optional[int], str, Dict[str, Any]]],
+             task_id: int, project_id: int, actor_id: Optional[int], created_at: str):
+    """Ajoute les notifications (destinataire, évènement, données), sans doublon ni auteur."""
+    due_at = (datetime.fromisoformat(created_at) + timedelta(seconds=NOTIFY_COALESCE_SECONDS)).isoformat()
+    rows, seen = [], set()
+    for user_id, event, payload in events:
+        if user_id is None or user_id == actor_id or (user_id, event) in seen:
+            continue
+        seen.add((user_id, event))
+        payload = dict(payload, actor=actor_id)
+        rows.append((user_id, event, task_id, project_id,
+                     json.dumps(payload, default=str, separators=(',', ':')), due_at, created_at))
+    if rows:
+        cursor.executemany('''
+            INSERT INTO notification_outbox (user_id, event, task_id, project_id, payload,
+                                             next_attempt_at, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+
+
+def record_task_events(cursor, previous: Optional[Dict[str, Any]], current: Dict[str, Any],
+                       actor_id: int = None, created_at: str = None):
+    """
+    Notifications d'une création ou d'une mise à jour de tâche (transaction de l'appelant).
+
+    Args:
+        previous: ligne avant modification (None pour une création)
+        current: ligne après modification
+    """
+    created_at = created_at or datetime.now().isoformat()
+    project_name, manager_id = _project(cursor, current['project_id'])
+    task = {'title': current['title'], 'project': project_name}
+    assignee = current['assigned_to']
+    events = []
+    if assignee and (previous is None or previous['assigned_to'] != assignee):
+        events.append((assignee, EVENT_ASSIGNED,
+                       dict(task, deadline=current['deadline'], priority=current['priority'])))
+    if previous is not None and previous['status'] != current['status']:
+        change = dict(task, old_status=previous['status'], new_status=current['status'])
+        events += [(assignee, EVENT_STATUS, change), (manager_id, EVENT_STATUS, change)]
+    _enqueue(cursor, events, current['id'], current['project_id'], actor_id, created_at)
+
+
+def record_comment(cursor, task_id: int, actor_id: int, comment: str, created_at: str = None):
+    """Notifications d'un commentaire sur une tâche (transaction de l'appelant)."""
+    cursor.execute('''
+        SELECT t.title, t.assigned_to, t.project_id, p.name, p.created_by
+        FROM tasks t LEFT JOIN projects p ON t.project_id = p.id
+        WHERE t.id = ?
+    ''', (task_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return
+    title, assignee, project_id, project_name, manager_id = row
+    payload = {'title': title, 'project': project_name, 'comment': comment[:COMMENT_EXCERPT_LENGTH]}
+    _enqueue(cursor, [(assignee, EVENT_COMMENT, payload), (manager_id, EVENT_COMMENT, payload)],
+             task_id, project_id, actor_id, created_at or datetime.now().isoformat())
+
+
+def enqueue_overdue(cursor, today: str = None) -> int:
+    """
+    Ajoute une notification pour chaque tâche en retard non encore signalée
+    à son responsable (une fois par échéance: reporter l'échéance rouvre le suivi).
+
+    Returns:
+        Nombre de notifications ajoutées
+    """
+    now = datetime.now().isoformat()
+    cursor.execute('''
+        INSERT OR IGNORE INTO notification_outbox (user_id, event, task_id, project_id, payload,
+                                                   dedup_key, next_attempt_at, created_at)
+        SELECT t.assigned_to, ?, t.id, t.project_id,
+               json_object('title', t.title, 'project', p.name, 'deadline', t.deadline),
+               'overdue:' || t.id || ':' || t.deadline || ':' || t.assigned_to, ?, ?
+        FROM tasks t
+        JOIN projects p ON t.project_id = p.id
+        JOIN users u ON t.assigned_to = u.id AND u.is_active = 1
+        WHERE t.deadline < ? AND t.status != 'COMPLETED'
+    ''', (EVENT_OVERDUE, now, now, today or datetime.now().date().isoformat()))
+    return cursor.rowcount
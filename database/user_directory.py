@@ -0,0 +1,141 @@
+"""
+Annuaire des utilisateurs en mémoire (un par processus).
+
+La table users est petite, lue en permanence et rarement modifiée: elle est
+chargée en une requête puis indexée par id, email, nom d'utilisateur et
+rôle. Les listes d'options des sélecteurs de membres sont préconstruites.
+
+L'annuaire est rechargé après create_user/update_user/delete_user (tag
+'users' passé à invalidated), y compris quand l'écriture vient d'un autre
+processus (compteur de version du tag, vérifié au plus toutes les
+USER_DIRECTORY_CHECK_SECONDS). Les objets User retournés sont partagés:
+ils doivent être traités en lecture seule.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.db_setup import get_connection
+from database.models import User
+from utils.cache import add_invalidation_listener, change_token
+from config import USER_DIRECTORY_CHECK_SECONDS
+
+
+@dataclass(frozen=True)
+class _DirectoryState:
+    """Contenu immuable de l'annuaire à une version donnée."""
+    version: Optional[tuple]
+    by_id: Dict[int, User]
+    by_email: Dict[str, User]
+    by_username: Dict[str, User]
+    # (rôle ou None, actifs seulement) -> utilisateurs triés comme
+    # ORDER BY full_name, username, et leurs ids (options des sélecteurs)
+    lists: Dict[tuple, Tuple[User, ...]]
+    options: Dict[tuple, Tuple[int, ...]]
+    labels: Dict[int, str]
+
+
+def user_label(user: User) -> str:
+    """Nom affiché d'un utilisateur."""
+    return user.full_name or user.username
+
+
+def _sort_key(user: User):
+    # Même ordre que ORDER BY full_name, username (NULL en premier)
+    return (user.full_name is not None, user.full_name or '', user.username)
+
+
+class UserDirectory:
+    """Index en mémoire de la table users, rechargé à chaque changement."""
+
+    def __init__(self):
+        self._state: Optional[_DirectoryState] = None
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self.loads = 0
+
+    def _current(self) -> _DirectoryState:
+        state = self._state
+        now = time.monotonic()
+        if state is not None and now - self._checked_at < USER_DIRECTORY_CHECK_SECONDS:
+            return state
+        version = change_token('users')
+        if state is None or version is None or state.version != version:
+            with self._lock:
+                state = self._state
+                if state is None or version is None or state.version != version:
+                    state = self._state = self._load(version)
+        self._checked_at = now
+        return state
+
+    def _load(self, version) -> _DirectoryState:
+        conn = get_connection()
+        rows = conn.execute("SELECT * FROM users").fetchall()
+        conn.close()
+        self.loads += 1
+        ordered = sorted((User.from_row(row) for row in rows), key=_sort_key)
+        lists = {}
+        for user in ordered:
+            for role in (None, user.role):
+                lists.setdefault((role, False), []).append(user)
+                if user.is_active:
+                    lists.setdefault((role, True), []).append(user)
+        return _DirectoryState(
+            version=version,
+            by_id={u.id: u for u in ordered},
+            by_email={u.email: u for u in ordered},
+            by_username={u.username: u for u in ordered},
+            lists={key: tuple(users) for key, users in lists.items()},
+            options={key: tuple(u.id for u in users) for key, users in lists.items()},
+            labels={u.id: user_label(u) for u in ordered}
+        )
+
+    def invalidate(self):
+        """Force le rechargement au prochain accès."""
+        self._state = None
+
+    def get(self, user_id: int) -> Optional[User]:
+        return self._current().by_id.get(user_id)
+
+    def get_many(self, user_ids) -> Dict[int, User]:
+        by_id = self._current().by_id
+        return {i: by_id[i] for i in user_ids if i in by_id}
+
+    def by_email(self, email: str) -> Optional[User]:
+        return self._current().by_email.get(email)
+
+    def by_username(self, username: str) -> Optional[User]:
+        return self._current().by_username.get(username)
+
+    def users(self, role: str = None, active_only: bool = True) -> List[User]:
+        """Utilisateurs triés par nom, filtrés par rôle et activité."""
+        return list(self._current().lists.get((role, active_only), ()))
+
+    def label(self, user_id: int) -> str:
+        """Nom affiché d'un utilisateur par son id (format_func des sélecteurs)."""
+        return self._current().labels.get(user_id, f"Utilisateur #{user_id}")
+
+    def options(self, role: str = None, active_only: bool = True,
+                exclude_ids=()) -> List[int]:
+        """Ids des utilisateurs proposés dans un sélecteur, dans l'ordre d'affichage."""
+        options = self._current().options.get((role, active_only), ())
+        if not exclude_ids:
+            return list(options)
+        exclude_ids = set(exclude_ids)
+        return [user_id for user_id in options if user_id not in exclude_ids]
+
+
+directory = UserDirectory()
+
+
+def _on_invalidate(tags):
+    if 'users' in tags:
+        directory.invalidate()
+
+
+add_invalidation_listener(_on_invalidate)
@@ -8,13 +8,7 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from services.auth_service import require_admin, get_current_user
-from services.progress_service import (
-    get_dashboard_statistics, 
-    get_all_members_performance,
-    get_team_velocity,
-    get_workload_distribution
-)
-from database.crud import get_all_projects, get_overdue_tasks, get_recent_activities
+from services.dashboard_service import get_dashboard_snapshot, SNAPSHOT_TAGS
 from components.charts import (
     create_progress_gauge,
     create_tasks_by_status_chart,
@@ -24,6 +18,9 @@ from components.charts import (
     create_projects_overview_chart,
     create_completion_rate_chart
 )
+from components.live import live_section
+from utils.cache import get_cache_stats, clear_cache
+from utils.artifact_cache import artifact_cache
 from config import PROJECT_STATUS, TASK_STATUS
 
 
@@ -39,8 +36,23 @@ def render_dashboard():
         ">📊 Tableau de bord</h1>
     """, unsafe_allow_html=True)
     
-    # Récupérer les statistiques
-    stats = get_dashboard_statistics()
+    # Les sections lisent l'instantané partagé, reconstruit en arrière-plan;
+    # elles ne se redessinent avec de nouvelles données que s'il a changé
+    def snapshot_version():
+        return get_dashboard_snapshot().built_at
+    
+    for key, render in (('admin_overview', render_overview),
+                        ('admin_projects', render_projects_overview),
+                        ('admin_team', render_team_performance),
+                        ('admin_overdue', render_overdue_tasks)):
+        live_section(key, SNAPSHOT_TAGS, get_dashboard_snapshot, render, token=snapshot_version)
+    
+    render_cache_metrics()
+
+
+def render_overview(snapshot):
+    """Métriques principales et répartition des tâches."""
+    stats = snapshot.stats
     
     # Métriques principales
     st.markdown("### 📈 Vue d'ensemble")
@@ -124,23 +136,32 @@ def render_dashboard():
         fig = create_tasks_pie_chart(tasks_data, "Répartition des tâches")
         st.plotly_chart(fig, use_container_width=True)
     
-    # Section des projets
+    st.caption(
+        f"📸 Instantané calculé il y a {snapshot.age_seconds:.0f} s "
+        f"(en {snapshot.build_seconds * 1000:.0f} ms), partagé entre les sessions"
+    )
+
+
+def render_projects_overview(snapshot):
+    """Aperçu des projets."""
+    projects = snapshot.projects
     st.markdown("### 📁 Aperçu des projets")
     
-    projects = get_all_projects()
     if projects:
         fig = create_projects_overview_chart(projects)
         st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("Aucun projet créé pour le moment.")
-    
-    # Vélocité et performance
+
+
+def render_team_performance(snapshot):
+    """Vélocité et performance de l'équipe."""
+    velocity, performances = snapshot.velocity, snapshot.performances
     st.markdown("### 🚀 Performance de l'équipe")
     
     col1, col2 = st.columns(2)
     
     with col1:
-        velocity = get_team_velocity()
         if velocity['weekly_data']:
             fig = create_velocity_chart(velocity['weekly_data'])
             st.plotly_chart(fig, use_container_width=True)
@@ -154,7 +175,6 @@ def render_dashboard():
             )
     
     with col2:
-        performances = get_all_members_performance()
         if performances:
             perf_data = [
                 {'name': p.user_name, 'completion_rate': p.completion_rate}
@@ -162,9 +182,11 @@ def render_dashboard():
             ]
             fig = create_completion_rate_chart(perf_data)
             st.plotly_chart(fig, use_container_width=True)
-    
-    # Tâches en retard
-    overdue_tasks = get_overdue_tasks()
+
+
+def render_overdue_tasks(snapshot):
+    """Tâches en retard."""
+    overdue_tasks = snapshot.overdue_tasks
     if overdue_tasks:
         st.markdown("### ⚠️ Tâches en retard")
         
@@ -179,5 +201,40 @@ def render_dashboard():
                 with col3:
                     st.markdown(f"👤 {task.assigned_to_name or 'Non assigné'}")
                 st.markdown("---")
-    
-   
+
+
+def render_cache_metrics():
+    """Compteurs du cache de lecture des services."""
+    with st.expander("🗄️ Cache de lecture"):
+        cache_stats = get_cache_stats()
+        col1, col2, col3, col4, col5 = st.columns(5)
+        with col1:
+            st.metric("Entrées", cache_stats['size'])
+        with col2:
+            st.metric("Taux de succès", f"{cache_stats['hit_rate']}%")
+        with col3:
+            st.metric("Succès / échecs", f"{cache_stats['hits']} / {cache_stats['misses']}")
+        with col4:
+            st.metric("Évictions", cache_stats['evictions'] + cache_stats['expirations'])
+        with col5:
+            st.metric("Invalidations", cache_stats['invalidations'] + cache_stats['stale'])
+        
+        shared = cache_stats['shared']
+        if shared:
+            st.caption(
+                f"Cache partagé entre processus: {shared['size']} entrées "
+                f"({shared['bytes'] / 1024:,.0f} Ko), {shared['hits']} succès, "
+                f"{shared['misses']} échecs, {shared['evictions']} évictions"
+            )
+        
+        artifacts = artifact_cache.stats()
+        st.caption(
+            f"Cache des exports: {artifacts['keys']} exports, {artifacts['files']} fichiers "
+            f"({artifacts['bytes'] / 1024:,.0f} Ko), taux de succès {artifacts['hit_rate']}% "
+            f"({artifacts['hits']} succès, {artifacts['builds']} constructions, "
+            f"{artifacts['deduplicated']} dédupliqués, {artifacts['evictions']} évictions)"
+        )
+        
+        if st.button("🧹 Vider le cache"):
+            clear_cache()
+            st.rerun()
@@ -10,16 +10,15 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from services.auth_service import require_admin, get_current_user_id
 from services.project_service import (
-    create_new_project, get_all_projects_with_stats, get_project_details,
+    create_new_project, get_all_projects_with_stats, get_project_summary,
     update_project_info, delete_project_and_related,
-    create_project_milestone, get_project_milestones_list, delete_milestone
+    create_project_milestone, delete_milestone
 )
 from services.member_service import (
-    get_all_members_list, get_project_members_list, 
+    get_all_members_list,
     assign_member_to_project, remove_member_from_project,
-    get_members_not_in_project
+    get_members_not_in_project, get_user_label
 )
-from database.crud import get_project_stats
 from components.forms import render_project_form, render_milestone_form
 from components.charts import create_progress_gauge, create_tasks_by_status_chart
 from config import PROJECT_STATUS
@@ -144,12 +143,12 @@ def render_project_card(project):
 
 def render_project_detail(project_id: int):
     """Affiche le détail d'un projet."""
-    project = get_project_details(project_id)
-    if not project:
+    summary = get_project_summary(project_id)
+    if not summary:
         st.error("Projet non trouvé")
         return
     
-    stats = get_project_stats(project_id)
+    project, stats = summary['project'], summary['stats']
     
     with st.expander(f"📋 Détails de {project.name}", expanded=True):
         # Bouton fermer
@@ -187,10 +186,10 @@ def render_project_detail(project_id: int):
             render_edit_project_form(project)
         
         with tab3:
-            render_milestones_section(project_id)
+            render_milestones_section(project_id, summary['milestones'])
         
         with tab4:
-            render_project_members_section(project_id)
+            render_project_members_section(project_id, summary['members'])
 
 
 def render_create_project_form():
@@ -266,9 +265,8 @@ def render_edit_project_form(project):
                 st.rerun()
 
 
-def render_milestones_section(project_id: int):
+def render_milestones_section(project_id: int, milestones):
     """Affiche la section des milestones."""
-    milestones = get_project_milestones_list(project_id)
     
     st.markdown("**Milestones existants**")
     
@@ -308,9 +306,8 @@ def render_milestones_section(project_id: int):
                 st.rerun()
 
 
-def render_project_members_section(project_id: int):
+def render_project_members_section(project_id: int, members):
     """Affiche la section des membres du projet."""
-    members = get_project_members_list(project_id)
     available_members = get_members_not_in_project(project_id)
     
     st.markdown("**Membres actuels**")
@@ -333,7 +330,7 @@ def render_project_members_section(project_id: int):
         selected_member = st.selectbox(
             "Sélectionner un membre",
             options=[m.id for m in available_members],
-            format_func=lambda x: next(m.full_name or m.username for m in available_members if m.id == x),
+            format_func=get_user_label,
             key=f"add_member_{project_id}"
         )
         
@@ -3,24 +3,30 @@ Rapports et statistiques - Interface administrateur.
 """
 
 import streamlit as st
+from datetime import date
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from services.auth_service import require_admin
+from services.auth_service import require_admin, get_current_user_id
 from services.report_service import (
-    generate_project_report, generate_team_performance_report,
-    export_project_to_csv, export_all_projects_to_csv,
-    export_team_performance_to_csv, generate_pdf_report
+    generate_project_report, generate_team_performance_report
 )
+from services.export_service import BUNDLE_COMPRESSIONS
+from services.job_service import build_artifact
 from services.progress_service import (
     get_dashboard_statistics, get_all_members_performance,
     get_progress_over_time, get_workload_distribution
 )
+from services.evm_service import get_portfolio_evm, get_project_evm, format_evm_index
+from services.time_service import get_time_summary
 from database.crud import get_all_projects
+from utils.section_loader import load_sections, format_timings
+from components.exports import render_job_download, render_job_list
 from components.charts import (
     create_progress_timeline, create_member_performance_chart,
-    create_workload_distribution_chart, create_completion_rate_chart
+    create_workload_distribution_chart, create_completion_rate_chart,
+    create_evm_chart, create_time_logged_chart
 )
 
 
@@ -70,6 +76,8 @@ def render_reports_section():
             with col4:
                 st.metric("En retard", report['stats']['overdue_tasks'])
             
+            st.metric("Temps saisi", f"{report['logged_hours']:,.1f} h")
+            
             st.markdown("### 🎯 Milestones")
             for ms in report['milestones']:
                 st.markdown(f"- **{ms.name}**: {ms.progress:.0f}%")
@@ -77,32 +85,80 @@ def render_reports_section():
             for m in report['members']:
                 st.markdown(f"- {m.user_name}")
             
-            # Bouton de téléchargement du rapport PDF complet
-            st.markdown("---")
-            pdf_data = generate_pdf_report(selected)
-            if pdf_data:
-                st.download_button(
-                    label=f"📥 Télécharger le rapport complet pour {report['project'].name}",
-                    data=pdf_data,
-                    file_name=f"rapport_projet_{report['project'].id}.pdf",
-                    mime="application/pdf"
-                )
-            else:
-                st.error("Impossible de générer le PDF. Vérifiez l'installation de ReportLab.")
+            evm = get_project_evm(selected)
+            if evm:
+                st.markdown("### 💶 Valeur acquise")
+                render_evm_metrics(evm['project'])
+                if evm['milestones']:
+                    render_evm_table(evm['milestones'])
+    
+    # Rapport PDF complet, construit en arrière-plan à la demande
+    st.markdown("---")
+    project_name = next(p.name for p in projects if p.id == selected)
+    render_job_download(
+        key=f"project_pdf_{selected}",
+        kind='pdf_report',
+        params={'project_id': selected},
+        label=f"📥 Télécharger le rapport complet pour {project_name}",
+        file_name=f"rapport_projet_{selected}.pdf",
+        prepare_label="📄 Préparer le rapport PDF"
+    )
+    # Même contenu en HTML: généré au clic, bien plus rapide que le PDF
+    st.download_button(
+        "🌐 Télécharger le rapport HTML",
+        data=lambda: build_artifact('html_report', {'project_id': selected}),
+        file_name=f"rapport_projet_{selected}.html",
+        mime="text/html",
+        key=f"project_html_{selected}"
+    )
 
 
 def render_analysis_section():
-    """Section d'analyse."""
+    """Section d'analyse (données chargées en parallèle, affichées dès réception)."""
+    renderers = {
+        'progress': render_progress_section,
+        'performance': render_performance_section,
+        'evm': render_evm_section,
+        'time': render_time_section,
+        'workload': render_workload_section
+    }
+    # Réserver l'emplacement de chaque section pour conserver l'ordre d'affichage
+    placeholders = {name: st.container() for name in renderers}
+    timings = st.empty()
+    
+    results = []
+    for result in load_sections({
+        'progress': lambda: get_progress_over_time(days=30),
+        'performance': get_all_members_performance,
+        'evm': get_portfolio_evm,
+        'time': lambda: get_time_summary(days=30),
+        'workload': get_workload_distribution
+    }):
+        results.append(result)
+        with placeholders[result.name]:
+            if result.ok:
+                renderers[result.name](result.value)
+            elif result.timed_out:
+                st.warning(f"⏱️ La section « {result.name} » a dépassé le délai de chargement.")
+            else:
+                st.error(f"Erreur lors du chargement de la section « {result.name} »: {result.error}")
+    
+    timings.caption(f"⏱️ Chargement: {format_timings(results)}")
+
+
+def render_progress_section(progress_data):
+    """Évolution de la progression."""
     st.markdown("### 📈 Évolution de la progression")
     
-    progress_data = get_progress_over_time(days=30)
     if progress_data:
         fig = create_progress_timeline(progress_data)
         st.plotly_chart(fig, use_container_width=True)
-    
+
+
+def render_performance_section(performances):
+    """Performance de l'équipe."""
     st.markdown("### 👥 Performance de l'équipe")
     
-    performances = get_all_members_performance()
     if performances:
         perf_data = [
             {'name': p.user_name, 'tasks': p.total_tasks, 
@@ -117,10 +173,12 @@ def render_analysis_section():
         with col2:
             fig = create_completion_rate_chart(perf_data)
             st.plotly_chart(fig, use_container_width=True)
-    
+
+
+def render_workload_section(workload):
+    """Distribution de la charge."""
     st.markdown("### ⚖️ Distribution de la charge")
     
-    workload = get_workload_distribution()
     if workload['distribution']:
         fig = create_workload_distribution_chart(workload['distribution'])
         st.plotly_chart(fig, use_container_width=True)
@@ -131,6 +189,97 @@ def render_analysis_section():
             st.warning("⚠️ La charge de travail est déséquilibrée")
 
 
+def render_evm_section(evm):
+    """Section de la valeur acquise (EVM) du portefeuille."""
+    st.markdown("### 💶 Valeur acquise (EVM)")
+    
+    if not evm['projects']:
+        st.info("Aucun projet disponible.")
+        return
+    
+    render_evm_metrics(evm['portfolio'])
+    
+    budgeted = [p for p in evm['projects'] if p.budget_at_completion > 0]
+    if budgeted:
+        chart_data = [
+            {'name': p.name, 'planned_value': p.planned_value,
+             'earned_value': p.earned_value, 'actual_cost': p.actual_cost}
+            for p in sorted(budgeted, key=lambda p: p.budget_at_completion, reverse=True)[:20]
+        ]
+        fig = create_evm_chart(chart_data)
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("Aucun projet n'a de budget défini.")
+    
+    render_evm_table(evm['projects'])
+
+
+def render_time_section(summary):
+    """Section des temps saisis (lue depuis les cumuls)."""
+    st.markdown("### ⏱️ Temps saisi (30 derniers jours)")
+    
+    if not summary['total_hours']:
+        st.info("Aucun temps saisi sur la période.")
+        return
+    
+    st.metric("Total saisi", f"{summary['total_hours']:,.1f} h")
+    fig = create_time_logged_chart(summary['daily'])
+    st.plotly_chart(fig, use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.dataframe(
+            [{'Projet': p['name'], 'Heures': p['hours']} for p in summary['by_project']],
+            use_container_width=True,
+            hide_index=True
+        )
+    with col2:
+        st.dataframe(
+            [{'Membre': u['name'], 'Heures': u['hours']} for u in summary['by_user']],
+            use_container_width=True,
+            hide_index=True
+        )
+
+
+def render_evm_metrics(ev):
+    """Affiche les indicateurs EVM d'un projet ou du portefeuille."""
+    col1, col2, col3, col4, col5, col6 = st.columns(6)
+    with col1:
+        st.metric("PV", f"{ev.planned_value:,.0f} €")
+    with col2:
+        st.metric("EV", f"{ev.earned_value:,.0f} €")
+    with col3:
+        st.metric("AC", f"{ev.actual_cost:,.0f} €")
+    with col4:
+        st.metric("CPI", format_evm_index(ev.cpi))
+    with col5:
+        st.metric("SPI", format_evm_index(ev.spi))
+    with col6:
+        eac = f"{ev.estimate_at_completion:,.0f} €" if ev.estimate_at_completion is not None else "N/A"
+        st.metric("EAC", eac)
+
+
+def render_evm_table(values):
+    """Affiche un tableau d'indicateurs EVM."""
+    st.dataframe(
+        [
+            {
+                'Nom': v.name,
+                'BAC (€)': v.budget_at_completion,
+                'PV (€)': v.planned_value,
+                'EV (€)': v.earned_value,
+                'AC (€)': v.actual_cost,
+                'CPI': v.cpi,
+                'SPI': v.spi,
+                'EAC (€)': v.estimate_at_completion
+            }
+            for v in values
+        ],
+        use_container_width=True,
+        hide_index=True
+    )
+
+
 def render_export_section():
     """Section d'export."""
     st.markdown("### 📥 Exporter les données")
@@ -139,35 +288,82 @@ def render_export_section():
     
     with col1:
         st.markdown("**Projets**")
-        csv_data = export_all_projects_to_csv()
+        # Export généré au clic, relu depuis le cache si les données n'ont pas changé
         st.download_button(
             "📥 Télécharger CSV",
-            data=csv_data,
+            data=lambda: build_artifact('projects_csv'),
             file_name="projets.csv",
             mime="text/csv"
         )
     
     with col2:
         st.markdown("**Performance équipe**")
-        csv_perf = export_team_performance_to_csv()
         st.download_button(
             "📥 Télécharger CSV",
-            data=csv_perf,
+            data=lambda: build_artifact('team_performance_csv'),
             file_name="performance.csv",
             mime="text/csv"
         )
     
+    st.markdown("---")
+    st.markdown("**Sauvegarde complète**")
+    st.caption("Projets, tâches, jalons, membres, commentaires et activité "
+               "dans une seule archive compressée, avec un manifeste.")
+    
+    bundle_options = {
+        "ZIP (CSV)": ('csv', 'zip'),
+        "ZIP (NDJSON)": ('ndjson', 'zip'),
+        "GZIP (NDJSON)": ('ndjson', 'gzip')
+    }
+    choice = st.selectbox("Format", list(bundle_options.keys()), key="bundle_format")
+    fmt, compression = bundle_options[choice]
+    render_job_download(
+        key=f"bundle_{fmt}_{compression}",
+        kind='export_bundle',
+        params={'format': fmt, 'compression': compression},
+        label="📦 Télécharger la sauvegarde",
+        file_name=f"sauvegarde_{date.today():%Y%m%d}{BUNDLE_COMPRESSIONS[compression]}",
+        prepare_label="📦 Préparer la sauvegarde"
+    )
+    
     st.markdown("---")
     st.markdown("**Rapport PDF**")
     
-    if st.button("📄 Générer PDF Global"):
-        pdf_data = generate_pdf_report()
-        if pdf_data:
-            st.download_button(
-                "📥 Télécharger PDF",
-                data=pdf_data,
-                file_name="rapport_global.pdf",
-                mime="application/pdf"
-            )
-        else:
-            st.warning("ReportLab non installé pour la génération PDF")
+    render_job_download(
+        key="global_pdf",
+        kind='pdf_report',
+        params={},
+        label="📥 Télécharger PDF",
+        file_name="rapport_global.pdf",
+        prepare_label="📄 Générer PDF Global"
+    )
+    st.download_button(
+        "🌐 Télécharger le rapport HTML",
+        data=lambda: build_artifact('html_report'),
+        file_name="rapport_global.html",
+        mime="text/html",
+        key="global_html"
+    )
+    
+    st.markdown("**Rapports PDF par projet**")
+    st.caption("Un PDF par projet, générés en parallèle et réunis dans une archive zip avec un index.")
+    projects = get_all_projects()
+    selected_ids = st.multiselect(
+        "Projets (tous si vide)",
+        options=[p.id for p in projects],
+        format_func=lambda x: next(p.name for p in projects if p.id == x),
+        key="batch_pdf_projects"
+    )
+    project_ids = sorted(selected_ids)
+    render_job_download(
+        key=f"batch_pdf_{'_'.join(map(str, project_ids)) or 'all'}",
+        kind='project_reports_zip',
+        params={'project_ids': project_ids} if project_ids else {},
+        label="📥 Télécharger les rapports",
+        file_name=f"rapports_projets_{date.today():%Y%m%d}.zip",
+        prepare_label="🗂️ Générer les rapports"
+    )
+    
+    st.markdown("---")
+    st.markdown("**Mes exports**")
+    render_job_list(get_current_user_id())
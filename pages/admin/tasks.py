@@ -8,7 +8,7 @@ import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from services.auth_service import require_admin
+from services.auth_service import require_admin, get_current_user_id
 from services.task_service import (
     create_new_task, get_all_tasks_list, get_task_details,
     update_task_info, delete_task_by_id, get_overdue_tasks_list,
@@ -277,7 +277,8 @@ def render_create_task_form():
                     assigned_to=data['assigned_to'],
                     deadline=data['deadline'],
                     milestone_id=data['milestone_id'],
-                    estimated_hours=data['estimated_hours']
+                    estimated_hours=data['estimated_hours'],
+                    user_id=get_current_user_id()
                 )
                 if task_id:
                     st.success(f"✅ Tâche '{data['title']}' créée avec succès!")
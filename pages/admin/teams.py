@@ -12,10 +12,13 @@ from services.project_service import get_all_projects_with_stats
 from services.member_service import (
     get_project_members_list, get_members_not_in_project,
     assign_member_to_project, remove_member_from_project,
-    get_all_members_list
+    get_all_members_list, get_user_label
+)
+from services.progress_service import get_all_members_performance, get_capacity_heatmap
+from components.charts import (
+    create_workload_distribution_chart, create_completion_rate_chart,
+    create_capacity_heatmap
 )
-from services.progress_service import get_all_members_performance
-from components.charts import create_workload_distribution_chart, create_completion_rate_chart
 
 
 def render_teams_page():
@@ -24,13 +27,16 @@ def render_teams_page():
     
     st.markdown("<h1>👥 Gestion des équipes</h1>", unsafe_allow_html=True)
     
-    tab1, tab2 = st.tabs(["📋 Équipes par projet", "📊 Performance globale"])
+    tab1, tab2, tab3 = st.tabs(["📋 Équipes par projet", "📊 Performance globale", "🗓️ Capacité"])
     
     with tab1:
         render_teams_by_project()
     
     with tab2:
         render_global_performance()
+    
+    with tab3:
+        render_capacity_heatmap()
 
 
 def render_teams_by_project():
@@ -82,7 +88,7 @@ def render_project_team(project_id):
             selected = st.selectbox(
                 "Membre",
                 options=[m.id for m in available],
-                format_func=lambda x: next(m.full_name or m.username for m in available if m.id == x),
+                format_func=get_user_label,
                 key=f"add_team_{project_id}"
             )
             
@@ -143,3 +149,23 @@ def render_global_performance():
             st.markdown(f"<span style='color:{color}'>{perf.completion_rate:.0f}%</span>", unsafe_allow_html=True)
         
         st.progress(perf.completion_rate / 100)
+
+
+def render_capacity_heatmap():
+    """Heatmap de la charge planifiée des membres par semaine."""
+    st.markdown("### 🗓️ Charge planifiée vs capacité")
+    
+    weeks = st.slider("Nombre de semaines", min_value=4, max_value=52, value=12, step=4)
+    heatmap = get_capacity_heatmap(weeks=weeks)
+    
+    if not heatmap['members']:
+        st.info("Aucun membre actif.")
+        return
+    
+    if heatmap['overloaded_cells']:
+        st.warning(f"⚠️ {heatmap['overloaded_cells']} semaine(s)-membre dépassent la capacité")
+    else:
+        st.success("✅ Aucune surcharge planifiée")
+    
+    fig = create_capacity_heatmap(heatmap)
+    st.plotly_chart(fig, use_container_width=True)
@@ -8,9 +8,7 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from services.auth_service import require_auth, get_current_user_id, get_current_user
-from services.progress_service import get_member_individual_performance
-from services.member_service import get_member_workload
-from database.crud import get_user_tasks, get_user_projects
+from services.member_service import member_home
 from components.charts import create_progress_gauge, create_tasks_pie_chart
 from config import TASK_STATUS
 
@@ -25,8 +23,9 @@ def render_my_progress():
     st.markdown(f"Bonjour **{user.full_name or user.username}**!")
     
     # Performance
-    performance = get_member_individual_performance(user_id)
-    workload = get_member_workload(user_id)
+    home = member_home(user_id)
+    performance = home.performance
+    workload = home.workload
     
     # Métriques principales
     col1, col2, col3, col4 = st.columns(4)
@@ -66,7 +65,7 @@ def render_my_progress():
     
     # Projets
     st.markdown("### 📁 Mes projets")
-    projects = get_user_projects(user_id)
+    projects = home.projects
     
     if projects:
         for proj in projects:
@@ -81,9 +80,7 @@ def render_my_progress():
     
     # Tâches récentes
     st.markdown("### ✅ Tâches récentes")
-    tasks = get_user_tasks(user_id)
-    
-    completed_tasks = [t for t in tasks if t.status == 'COMPLETED'][:5]
+    completed_tasks = home.recent_completions
     
     if completed_tasks:
         for task in completed_tasks:
@@ -8,8 +8,7 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from services.auth_service import require_auth, get_current_user_id
-from services.project_service import get_user_projects_list
-from database.crud import get_project_stats
+from services.member_service import member_home
 from components.charts import create_progress_gauge
 from config import PROJECT_STATUS
 
@@ -21,7 +20,8 @@ def render_my_projects():
     
     st.markdown("<h1>📁 Mes projets</h1>", unsafe_allow_html=True)
     
-    projects = get_user_projects_list(user_id)
+    home = member_home(user_id)
+    projects = home.projects
     
     if not projects:
         st.info("Vous n'êtes assigné à aucun projet pour le moment.")
@@ -30,12 +30,11 @@ def render_my_projects():
     st.markdown(f"**{len(projects)} projet(s)**")
     
     for project in projects:
-        render_project_card(project)
+        render_project_card(project, home.project_stats[project.id])
 
 
-def render_project_card(project):
+def render_project_card(project, stats):
     """Affiche une carte de projet."""
-    stats = get_project_stats(project.id)
     
     with st.container():
         col1, col2 = st.columns([3, 1])
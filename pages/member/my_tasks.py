@@ -8,7 +8,8 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from services.auth_service import require_auth, get_current_user_id
-from services.task_service import get_user_assigned_tasks, get_priority_color, get_status_color
+from services.task_service import get_priority_color, get_status_color
+from services.member_service import member_home
 from config import TASK_STATUS, TASK_PRIORITY
 
 
@@ -30,7 +31,9 @@ def render_my_tasks():
     with col2:
         show_completed = st.checkbox("Afficher terminées", value=False)
     
-    tasks = get_user_assigned_tasks(user_id, status=status_filter)
+    tasks = member_home(user_id).tasks
+    if status_filter:
+        tasks = [t for t in tasks if t.status == status_filter]
     
     if not show_completed:
         tasks = [t for t in tasks if t.status != 'COMPLETED']
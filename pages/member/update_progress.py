@@ -9,9 +9,10 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from services.auth_service import require_auth, get_current_user_id
 from services.task_service import (
-    get_user_assigned_tasks, update_task_progress_value,
-    get_task_details, add_comment_to_task
+    update_task_progress_value, get_task_details, add_comment_to_task
 )
+from services.member_service import member_home
+from services.time_service import get_task_time
 from config import TASK_STATUS, TASK_PRIORITY
 
 
@@ -23,8 +24,7 @@ def render_update_progress():
     st.markdown("<h1>🔄 Mise à jour de l'avancement</h1>", unsafe_allow_html=True)
     
     # Récupérer les tâches non terminées
-    tasks = get_user_assigned_tasks(user_id)
-    tasks = [t for t in tasks if t.status != 'COMPLETED']
+    tasks = [t for t in member_home(user_id).tasks if t.status != 'COMPLETED']
     
     if not tasks:
         st.success("🎉 Toutes vos tâches sont terminées!")
@@ -65,6 +65,10 @@ def render_progress_form(task, user_id):
     if task.is_overdue:
         st.error("⚠️ Cette tâche est en retard!")
     
+    logged = get_task_time(task.id)['total_hours']
+    estimate = f" / {task.estimated_hours:g} h estimées" if task.estimated_hours else ""
+    st.markdown(f"**Temps saisi:** {logged:g} h{estimate}")
+    
     st.markdown("---")
     
     # Formulaire
@@ -87,6 +91,14 @@ def render_progress_form(task, user_id):
         
         st.info(f"Nouveau statut: **{new_status}**")
         
+        hours = st.number_input(
+            "Temps passé depuis la dernière mise à jour (heures)",
+            min_value=0.0,
+            max_value=24.0,
+            value=0.0,
+            step=0.25
+        )
+        
         comment = st.text_area(
             "Ajouter un commentaire (optionnel)",
             placeholder="Décrivez ce qui a été fait..."
@@ -96,7 +108,8 @@ def render_progress_form(task, user_id):
         
         if submitted:
             success = update_task_progress_value(
-                task.id, new_progress, user_id, comment if comment else None
+                task.id, new_progress, user_id, comment if comment else None,
+                hours=hours if hours > 0 else None
             )
             
             if success:
@@ -14,6 +14,7 @@ from components.charts import (
     create_progress_gauge, create_tasks_pie_chart,
     create_projects_overview_chart
 )
+from components.live import live_section, render_refresh_caption
 from config import TASK_STATUS
 
 
@@ -31,24 +32,54 @@ def render_pm_dashboard():
         st.info("Vous n'avez pas encore de projets. Créez votre premier projet!")
         return
     
-    # Statistiques globales des projets du chef
-    total_tasks = 0
-    completed_tasks = 0
-    in_progress_tasks = 0
-    overdue_tasks = 0
+    # Sections rafraîchies indépendamment quand leurs tables changent
+    live_section(f'pm_overview_{user_id}', ('projects', 'tasks', 'members'),
+                 lambda: load_pm_overview(user_id), render_pm_overview)
+    live_section(f'pm_projects_{user_id}', ('projects', 'tasks', 'members'),
+                 lambda: get_user_projects_list(user_id), render_pm_projects_overview)
+    live_section(f'pm_actions_{user_id}', ('projects', 'tasks', 'members', 'users'),
+                 lambda: load_pm_overdue_tasks(user_id), render_pm_actions)
+
+
+def load_pm_overview(user_id):
+    """Statistiques globales des projets du chef."""
+    projects = get_user_projects_list(user_id)
+    totals = {
+        'projects': len(projects),
+        'total_tasks': 0,
+        'completed_tasks': 0,
+        'in_progress_tasks': 0,
+        'overdue_tasks': 0
+    }
     
     for project in projects:
         stats = get_project_stats(project.id)
-        total_tasks += stats['total_tasks']
-        completed_tasks += stats['completed_tasks']
-        in_progress_tasks += stats['in_progress_tasks']
-        overdue_tasks += stats['overdue_tasks']
+        totals['total_tasks'] += stats['total_tasks']
+        totals['completed_tasks'] += stats['completed_tasks']
+        totals['in_progress_tasks'] += stats['in_progress_tasks']
+        totals['overdue_tasks'] += stats['overdue_tasks']
+    
+    return totals
+
+
+def load_pm_overdue_tasks(user_id):
+    """Tâches en retard des projets du chef."""
+    project_ids = {p.id for p in get_user_projects_list(user_id)}
+    return [task for task in get_overdue_tasks() if task.project_id in project_ids]
+
+
+def render_pm_overview(totals):
+    """Métriques principales et graphiques de progression."""
+    total_tasks = totals['total_tasks']
+    completed_tasks = totals['completed_tasks']
+    in_progress_tasks = totals['in_progress_tasks']
+    overdue_tasks = totals['overdue_tasks']
     
     # Métriques principales
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("📁 Mes projets", len(projects))
+        st.metric("📁 Mes projets", totals['projects'])
     with col2:
         st.metric("✅ Tâches terminées", completed_tasks)
     with col3:
@@ -83,23 +114,22 @@ def render_pm_dashboard():
             fig = create_tasks_pie_chart(tasks_data, "Répartition des tâches")
             st.plotly_chart(fig, use_container_width=True)
     
-    # Aperçu des projets
+    render_refresh_caption(f'pm_overview_{get_current_user_id()}')
+
+
+def render_pm_projects_overview(projects):
+    """Aperçu des projets."""
     st.markdown("### 📁 Mes projets")
     
     if projects:
         fig = create_projects_overview_chart(projects)
         st.plotly_chart(fig, use_container_width=True)
-    
-    # Tâches en retard
+
+
+def render_pm_actions(all_overdue):
+    """Tâches en retard."""
     st.markdown("### ⚠️ Actions requises")
     
-    all_overdue = []
-    for project in projects:
-        tasks = get_overdue_tasks()
-        for task in tasks:
-            if task.project_id == project.id:
-                all_overdue.append(task)
-    
     if all_overdue:
         for task in all_overdue[:5]:
             col1, col2, col3 = st.columns([3, 1, 1])
@@ -10,8 +10,8 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from services.auth_service import require_auth, get_current_user_id
 from services.project_service import (
-    create_new_project, get_user_projects_list, get_project_details,
-    update_project_info, create_project_milestone, get_project_milestones_list
+    create_new_project, get_user_projects_list, get_project_summary,
+    update_project_info, create_project_milestone
 )
 from database.crud import get_project_stats
 from components.forms import render_project_form, render_milestone_form
@@ -81,7 +81,8 @@ def render_project_card(project):
 
 def render_project_management(project_id):
     """Gestion détaillée d'un projet."""
-    project = get_project_details(project_id)
+    summary = get_project_summary(project_id)
+    project = summary['project']
     
     with st.expander(f"⚙️ Gestion de {project.name}", expanded=True):
         if st.button("❌ Fermer"):
@@ -98,8 +99,7 @@ def render_project_management(project_id):
                 st.rerun()
         
         with tab2:
-            milestones = get_project_milestones_list(project_id)
-            for ms in milestones:
+            for ms in summary['milestones']:
                 st.markdown(f"🎯 **{ms.name}** - {ms.progress:.0f}%")
             
             st.markdown("---")
@@ -9,7 +9,8 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from services.auth_service import require_auth, get_current_user_id
 from services.project_service import get_user_projects_list
-from services.report_service import generate_project_report, export_project_to_csv
+from services.report_service import generate_project_report
+from services.job_service import build_artifact
 from services.member_service import get_project_members_list
 from components.charts import create_member_performance_chart
 
@@ -88,10 +89,16 @@ def render_project_report(project_id):
     st.markdown("---")
     st.markdown("### 📥 Exporter")
     
-    csv_data = export_project_to_csv(project_id)
+    # Export généré au clic, relu depuis le cache si les données n'ont pas changé
     st.download_button(
         "📥 Télécharger les tâches (CSV)",
-        data=csv_data,
+        data=lambda: build_artifact('project_tasks_csv', {'project_id': project_id}),
         file_name=f"projet_{project_id}_taches.csv",
         mime="text/csv"
     )
+    st.download_button(
+        "🌐 Télécharger le rapport (HTML)",
+        data=lambda: build_artifact('html_report', {'project_id': project_id}),
+        file_name=f"rapport_projet_{project_id}.html",
+        mime="text/html"
+    )
@@ -115,7 +115,8 @@ def render_create_task(projects):
             priority=data['priority'],
             assigned_to=data['assigned_to'],
             deadline=data['deadline'],
-            milestone_id=data['milestone_id']
+            milestone_id=data['milestone_id'],
+            user_id=get_current_user_id()
         )
         if task_id:
             st.success("Tâche créée!")
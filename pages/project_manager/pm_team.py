@@ -12,7 +12,7 @@ from services.project_service import get_user_projects_list
 from services.member_service import (
     get_project_members_list, get_members_not_in_project,
     assign_member_to_project, remove_member_from_project,
-    get_member_workload
+    get_member_workload, get_user_label
 )
 from services.progress_service import get_member_individual_performance
 from database.crud import get_all_tasks
@@ -74,7 +74,7 @@ def render_team_management(project_id):
             selected_member = st.selectbox(
                 "Sélectionner un membre",
                 options=[m.id for m in available],
-                format_func=lambda x: next(m.full_name or m.username for m in available if m.id == x)
+                format_func=get_user_label
             )
             
             if st.button("➕ Ajouter au projet"):
@@ -10,8 +10,13 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 from services.auth_service import require_auth, get_current_user_id
 from services.project_service import get_user_projects_list
 from services.progress_service import calculate_project_health, get_progress_over_time
+from services.flow_service import get_flow_metrics
 from database.crud import get_project_stats, get_all_tasks
-from components.charts import create_progress_gauge, create_progress_timeline, create_tasks_by_status_chart
+from components.charts import (
+    create_progress_gauge, create_progress_timeline, create_tasks_by_status_chart,
+    create_cumulative_flow_chart
+)
+from components.live import live_section, render_refresh_caption
 from config import TASK_STATUS
 
 
@@ -40,12 +45,20 @@ def render_pm_tracking():
 
 
 def render_project_tracking(project_id):
-    """Affiche le suivi d'un projet."""
+    """Affiche le suivi d'un projet (sections rafraîchies automatiquement)."""
     st.markdown("---")
     
-    stats = get_project_stats(project_id)
-    health = calculate_project_health(project_id)
-    
+    live_section(f'tracking_status_{project_id}', ('projects', 'tasks', 'members'),
+                 lambda: (get_project_stats(project_id), calculate_project_health(project_id)),
+                 lambda data: render_tracking_status(project_id, *data))
+    live_section(f'tracking_progress_{project_id}', ('tasks',),
+                 lambda: get_progress_over_time(project_id, days=14), render_tracking_progress)
+    live_section(f'tracking_flow_{project_id}', ('tasks',),
+                 lambda: get_flow_metrics(project_id, days=30), render_flow_analytics)
+
+
+def render_tracking_status(project_id, stats, health):
+    """Métriques, graphiques et santé du projet."""
     # Métriques
     col1, col2, col3, col4 = st.columns(4)
     
@@ -94,9 +107,41 @@ def render_project_tracking(project_id):
         </div>
     """, unsafe_allow_html=True)
     
-    # Timeline
+    render_refresh_caption(f'tracking_status_{project_id}')
+
+
+def render_tracking_progress(progress_data):
+    """Évolution de la progression."""
     st.markdown("### 📅 Évolution")
-    progress_data = get_progress_over_time(project_id, days=14)
     if progress_data:
         fig = create_progress_timeline(progress_data)
         st.plotly_chart(fig, use_container_width=True)
+
+
+def render_flow_analytics(flow):
+    """Affiche les indicateurs de flux (cycle time, lead time, flux cumulé)."""
+    st.markdown("### 🔁 Flux des tâches")
+    
+    def fmt(value):
+        return f"{value:.1f} j" if value is not None else "N/A"
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Cycle time (médiane)", fmt(flow['cycle_time']['p50']))
+    with col2:
+        st.metric("Cycle time (P85)", fmt(flow['cycle_time']['p85']))
+    with col3:
+        st.metric("Lead time (médiane)", fmt(flow['lead_time']['p50']))
+    with col4:
+        st.metric("Lead time (P85)", fmt(flow['lead_time']['p85']))
+    
+    st.caption(f"Basé sur {flow['completed_count']} tâche(s) terminée(s)")
+    
+    fig = create_cumulative_flow_chart(flow['cumulative_flow'])
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("**Temps moyen par statut**")
+    cols = st.columns(len(flow['time_in_status']))
+    for col, (status, days) in zip(cols, flow['time_in_status'].items()):
+        with col:
+            st.metric(TASK_STATUS.get(status, status), f"{days:.1f} j")
@@ -1,5 +1,10 @@
 """
 Module des services pour la logique métier.
+
+Les services ajoutés depuis (evm_service, job_service, notification_service,
+...) s'importent par leur module, comme dans les pages: plusieurs sont aussi
+des commandes (python -m services.<module>), qui ne doivent pas être
+chargées par le paquet avant leur exécution.
 """
 
 from .auth_service import *
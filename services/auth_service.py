@@ -11,6 +11,17 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database.crud import verify_password, get_user_by_id, log_activity
 from database.models import User
 from config import ROLE_ADMIN, ROLE_PROJECT_MANAGER, ROLE_MEMBER, ROLE_LABELS
+from utils.cache import set_scope_provider
+
+
+def _cache_scope() -> Optional[str]:
+    """Rôle de l'utilisateur connecté, inclus dans les clés du cache de lecture."""
+    if not st.runtime.exists():
+        return None
+    return st.session_state.get('role')
+
+
+set_scope_provider(_cache_scope)
 
 
 def init_session():
@@ -0,0 +1,183 @@
+"""
+Rapports PDF par lots: un PDF par projet, réunis dans une archive zip.
+
+Les données sont chargées dans le processus principal par requêtes
+groupées (crud.load_project_bundles, BATCH_REPORT_PREFETCH projets à la
+fois, indicateurs EVM calculés une fois pour tout le portefeuille), dans un
+seul instantané de lecture. La mise en page des PDF, qui domine le temps de
+génération, est répartie sur BATCH_REPORT_WORKERS processus qui n'accèdent
+pas à la base. Le chargement du paquet suivant se fait pendant la mise en
+page du paquet courant.
+
+L'archive contient un fichier index.csv (un projet par ligne: fichier,
+statut, nombre de tâches, taille, erreur éventuelle).
+
+Usage en ligne de commande:
+    python -m services.batch_report_service [-o rapports.zip] [--projects 1 2 3] [--workers 4]
+"""
+
+import argparse
+import csv
+import io
+import multiprocessing
+import re
+import unicodedata
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import crud
+from database.db_setup import read_snapshot
+from database.models import Project
+from services.evm_service import get_portfolio_evm
+from services.report_service import render_project_pdf
+from config import BATCH_REPORT_WORKERS, BATCH_REPORT_PREFETCH
+
+
+BATCH_INDEX_HEADER = ['ID', 'Projet', 'Statut', 'Progression', 'Tâches', 'Fichier', 'Octets', 'Erreur']
+
+
+def report_file_name(project: Project) -> str:
+    """Nom du PDF d'un projet dans l'archive (ID et nom sans accents)."""
+    name = unicodedata.normalize('NFKD', project.name).encode('ascii', 'ignore').decode()
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_').lower()[:40]
+    return f"projets/{project.id:04d}_{slug or 'projet'}.pdf"
+
+
+def _evm_by_project() -> Dict[int, Dict[str, Any]]:
+    """Indicateurs EVM de chaque projet au format de get_project_evm, en un seul calcul."""
+    evm = get_portfolio_evm()
+    by_project = {ev.project_id: {'project': ev, 'milestones': []} for ev in evm['projects']}
+    for ev in evm['milestones']:
+        if ev.project_id in by_project:
+            by_project[ev.project_id]['milestones'].append(ev)
+    return by_project
+
+
+class _InlineExecutor:
+    """Exécution dans le processus courant (workers <= 1), même interface que le pool."""
+
+    def submit(self, func, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def write_project_reports_zip(out: BinaryIO, project_ids: Optional[List[int]] = None,
+                              workers: int = BATCH_REPORT_WORKERS,
+                              progress: Callable[[int, int], None] = None) -> Dict[str, Any]:
+    """
+    Écrit dans out une archive zip avec le rapport PDF de chaque projet et un index.
+
+    Un projet dont la mise en page échoue est signalé dans l'index sans
+    interrompre les autres.
+
+    Args:
+        out: fichier binaire ouvert en écriture
+        project_ids: projets à inclure (None: tous les projets)
+        workers: processus de mise en page (1: dans le processus courant)
+        progress: appelée avec (rapports terminés, nombre de rapports)
+
+    Returns:
+        Dict avec 'reports' (lignes de l'index), 'missing' (IDs inconnus) et 'generated_at'
+    """
+    index = []
+    with read_snapshot():
+        ids = list(dict.fromkeys(project_ids)) if project_ids else \
+            [project.id for project in crud.get_all_projects()]
+        ids.sort()
+        evm = _evm_by_project()
+        found = set()
+
+        if workers > 1:
+            # spawn: les processus ne sont pas des copies (fork) d'un processus
+            # qui exécute d'autres threads (serveur, travaux d'export)
+            executor = ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        else:
+            executor = _InlineExecutor()
+
+        with executor, zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as archive:
+            def collect(pending):
+                for bundle, future in pending:
+                    project = bundle.project
+                    entry = [project.id, project.name, project.status, f"{project.progress}%",
+                             project.task_count, '', 0, '']
+                    try:
+                        data = future.result()
+                    except Exception as e:
+                        entry[7] = str(e) or type(e).__name__
+                    else:
+                        entry[5] = report_file_name(project)
+                        entry[6] = len(data)
+                        # Les PDF sont déjà compressés
+                        archive.writestr(entry[5], data, compress_type=zipfile.ZIP_STORED)
+                    index.append(entry)
+                    if progress:
+                        progress(len(index), len(ids))
+
+            pending = []
+            for start in range(0, len(ids), BATCH_REPORT_PREFETCH):
+                bundles = crud.load_project_bundles(ids[start:start + BATCH_REPORT_PREFETCH])
+                found.update(bundles)
+                submitted = [
+                    (bundle, executor.submit(render_project_pdf, bundle, evm.get(project_id)))
+                    for project_id, bundle in sorted(bundles.items())
+                ]
+                # Paquet précédent écrit pendant la mise en page de celui-ci
+                collect(pending)
+                pending = submitted
+            collect(pending)
+
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(BATCH_INDEX_HEADER)
+            writer.writerows(index)
+            archive.writestr('index.csv', buffer.getvalue().encode('utf-8'))
+
+    return {
+        'reports': index,
+        'missing': [project_id for project_id in ids if project_id not in found],
+        'generated_at': datetime.now().isoformat()
+    }
+
+
+def main(argv: List[str] = None):
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Rapports PDF de tous les projets dans une archive zip.")
+    parser.add_argument('-o', '--output', default=f"rapports_{datetime.now():%Y%m%d}.zip",
+                        help="archive à écrire")
+    parser.add_argument('--projects', type=int, nargs='+', help="IDs des projets (défaut: tous)")
+    parser.add_argument('--workers', type=int, default=BATCH_REPORT_WORKERS,
+                        help="processus de mise en page")
+    args = parser.parse_args(argv)
+
+    def show(done, total):
+        print(f"\r{done}/{total} rapports", end='', flush=True)
+
+    with open(args.output, 'wb') as out:
+        result = write_project_reports_zip(out, args.projects, args.workers, show)
+    failed = [entry for entry in result['reports'] if entry[7]]
+    print(f"\n{len(result['reports']) - len(failed)} rapports écrits dans {args.output}")
+    for entry in failed:
+        print(f"Échec du projet {entry[0]}: {entry[7]}")
+    if result['missing']:
+        print(f"Projets introuvables: {', '.join(map(str, result['missing']))}")
+
+
+if __name__ == "__main__":
+    main()
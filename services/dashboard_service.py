@@ -0,0 +1,133 @@
+"""
+Instantané partagé du tableau de bord administrateur.
+
+Un thread d'arrière-plan (un par processus) reconstruit un instantané
+immuable toutes les DASHBOARD_SNAPSHOT_INTERVAL secondes, ou dès que le
+jeton de modification des tables concernées change. Toutes les sessions
+lisent le même instantané: l'affichage du tableau de bord se réduit à une
+lecture de référence suivie du dessin.
+"""
+
+import threading
+import time
+import traceback
+from datetime import datetime
+from typing import Optional
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import crud
+from database.models import DashboardSnapshot
+from services.progress_service import (
+    get_dashboard_statistics, get_all_members_performance, get_team_velocity
+)
+from utils.cache import change_token
+from utils.section_loader import load_all_sections
+from config import DASHBOARD_SNAPSHOT_INTERVAL, DASHBOARD_SNAPSHOT_POLL_SECONDS
+
+
+# Tables lues pour construire l'instantané
+SNAPSHOT_TAGS = ('projects', 'tasks', 'members', 'users', 'milestones')
+
+
+def build_dashboard_snapshot() -> DashboardSnapshot:
+    """Calcule un nouvel instantané du tableau de bord (sections chargées en parallèle)."""
+    token = change_token(*SNAPSHOT_TAGS)
+    started = time.perf_counter()
+    results = load_all_sections({
+        'stats': get_dashboard_statistics,
+        'projects': crud.get_all_projects,
+        'velocity': get_team_velocity,
+        'performances': get_all_members_performance,
+        'overdue_tasks': crud.get_overdue_tasks
+    })
+    for result in results.values():
+        if result.timed_out:
+            raise TimeoutError(f"Section '{result.name}' trop longue à charger")
+        if result.error:
+            raise result.error
+    return DashboardSnapshot(
+        stats=results['stats'].value,
+        projects=tuple(results['projects'].value),
+        velocity=results['velocity'].value,
+        performances=tuple(results['performances'].value),
+        overdue_tasks=tuple(results['overdue_tasks'].value),
+        built_at=datetime.now(),
+        build_seconds=time.perf_counter() - started,
+        token=token,
+        timings={name: round(r.seconds, 4) for name, r in results.items()}
+    )
+
+
+class DashboardSnapshotRefresher:
+    """Thread de rafraîchissement de l'instantané (remplacement atomique de la référence)."""
+
+    def __init__(self, interval: float = DASHBOARD_SNAPSHOT_INTERVAL,
+                 poll: float = DASHBOARD_SNAPSHOT_POLL_SECONDS):
+        self.interval = interval
+        self.poll = poll
+        self.snapshot: Optional[DashboardSnapshot] = None
+        self.last_error: Optional[str] = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Démarre le thread s'il ne tourne pas déjà."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="dashboard-snapshot", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Arrête le thread."""
+        self._stop.set()
+
+    def refresh(self) -> DashboardSnapshot:
+        """Reconstruit l'instantané; en cas d'erreur, l'ancien est conservé."""
+        try:
+            self.snapshot = build_dashboard_snapshot()
+            self.last_error = None
+        except Exception:
+            self.last_error = traceback.format_exc(limit=3)
+            if self.snapshot is None:
+                raise
+        return self.snapshot
+
+    def is_stale(self) -> bool:
+        """Indique si l'instantané doit être reconstruit."""
+        snapshot = self.snapshot
+        if snapshot is None or snapshot.age_seconds >= self.interval:
+            return True
+        return change_token(*SNAPSHOT_TAGS) != snapshot.token
+
+    def _run(self):
+        while not self._stop.wait(self.poll):
+            try:
+                if self.is_stale():
+                    self.refresh()
+            except Exception:
+                self.last_error = traceback.format_exc(limit=3)
+
+
+refresher = DashboardSnapshotRefresher()
+
+
+def get_dashboard_snapshot() -> DashboardSnapshot:
+    """
+    Retourne l'instantané courant du tableau de bord.
+
+    Le premier appel du processus construit l'instantané et démarre le
+    thread de rafraîchissement.
+    """
+    refresher.start()
+    snapshot = refresher.snapshot
+    if snapshot is None:
+        with refresher._lock:
+            snapshot = refresher.snapshot or refresher.refresh()
+    return snapshot
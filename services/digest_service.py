@@ -0,0 +1,298 @@
+"""
+Résumés hebdomadaires des chefs de projet, générés par lots.
+
+Chaque chef de projet actif reçoit un résumé de ses projets (créés par lui
+ou dont il est membre): statistiques, santé, vélocité des dernières
+semaines et tâches en retard les plus anciennes.
+
+Les résumés sont générés en une passe: les projets suivis par les chefs de
+projet sont chargés une seule fois par requêtes groupées
+(crud.load_project_digests), dans un seul instantané de lecture, et la
+santé de chaque projet est calculée une fois, quel que soit le nombre de
+chefs de projet qui le suivent. Les résumés sont ensuite composés et écrits
+un par un: la mémoire utilisée ne dépend pas du nombre de destinataires.
+
+Chaque résumé est un message (texte et HTML) écrit dans la boîte d'envoi
+locale DIGEST_OUTBOX_DIR, sous <semaine ISO>/<id>_<utilisateur>.eml. Une
+nouvelle génération pour la même semaine remplace les fichiers existants.
+
+Usage en ligne de commande:
+    python -m services.digest_service [--outbox DIR] [--managers 1 2 3]
+"""
+
+import argparse
+import html
+import os
+import re
+import sys
+import unicodedata
+from datetime import date, datetime
+from functools import lru_cache
+from email.header import Header
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import format_datetime, make_msgid
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import crud
+from database.db_setup import read_snapshot
+from database.models import User
+from services.progress_service import compute_project_health, calculate_trend
+from config import (
+    DIGEST_OUTBOX_DIR, DIGEST_SENDER, DIGEST_OVERDUE_LIMIT, DIGEST_VELOCITY_WEEKS,
+    PROJECT_STATUS, THEME_COLORS
+)
+
+
+_HEALTH_LABELS = {
+    'good': 'Bonne',
+    'warning': 'À surveiller',
+    'danger': 'Critique',
+    'unknown': 'Inconnue'
+}
+
+_TREND_LABELS = {'up': 'en hausse', 'down': 'en baisse', 'stable': 'stable'}
+
+
+def digest_week(day: date = None) -> str:
+    """Semaine ISO d'un jour (aujourd'hui par défaut), au format AAAA-Wss."""
+    year, week, _ = (day or date.today()).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def digest_file_name(user: User) -> str:
+    """Nom du fichier d'un résumé dans la boîte d'envoi (ID et nom d'utilisateur sans accents)."""
+    name = unicodedata.normalize('NFKD', user.username).encode('ascii', 'ignore').decode()
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_').lower()[:40]
+    return f"{user.id:05d}_{slug or 'utilisateur'}.eml"
+
+
+def build_manager_digest(user: User, project_ids: List[int],
+                         projects: Dict[int, Dict[str, Any]],
+                         overdue_limit: int = DIGEST_OVERDUE_LIMIT) -> Dict[str, Any]:
+    """
+    Compose le résumé d'un chef de projet à partir des données déjà chargées.
+
+    Args:
+        user: le chef de projet
+        project_ids: ses projets
+        projects: données des projets (crud.load_project_digests), avec 'health'
+        overdue_limit: tâches en retard listées (les plus anciennes, tous projets confondus)
+
+    Returns:
+        Dict avec 'user', 'projects', 'totals' et 'overdue'
+    """
+    entries = [projects[project_id] for project_id in project_ids if project_id in projects]
+    velocity = [sum(week) for week in zip(*(entry['velocity'] for entry in entries))]
+    overdue = sorted(
+        (task for entry in entries for task in entry['overdue']),
+        key=lambda task: (str(task.deadline), task.id)
+    )[:overdue_limit]
+
+    return {
+        'user': user,
+        'projects': entries,
+        'overdue': overdue,
+        'totals': {
+            'projects': len(entries),
+            'total_tasks': sum(entry['stats']['total_tasks'] for entry in entries),
+            'completed_tasks': sum(entry['stats']['completed_tasks'] for entry in entries),
+            'overdue_tasks': sum(entry['stats']['overdue_tasks'] for entry in entries),
+            'blocked_tasks': sum(entry['blocked_tasks'] for entry in entries),
+            'at_risk': sum(entry['health']['status'] == 'danger' for entry in entries),
+            'velocity': velocity,
+            'trend': _trend(velocity)
+        }
+    }
+
+
+def _trend(velocity: List[int]) -> str:
+    """Tendance d'une vélocité (de la plus ancienne à la semaine en cours)."""
+    return calculate_trend([{'tasks_completed': count} for count in reversed(velocity)])
+
+
+def _digest_text(digest: Dict[str, Any], week: str) -> str:
+    """Version texte du résumé."""
+    user, totals = digest['user'], digest['totals']
+    lines = [
+        f"Bonjour {user.full_name or user.username},",
+        "",
+        f"Voici le résumé de vos projets pour la semaine {week}.",
+        "",
+        f"Projets suivis: {totals['projects']} (dont {totals['at_risk']} en situation critique)",
+        f"Tâches: {totals['completed_tasks']}/{totals['total_tasks']} terminées, "
+        f"{totals['overdue_tasks']} en retard, {totals['blocked_tasks']} bloquée(s)",
+        f"Tâches terminées par semaine: {' / '.join(map(str, totals['velocity']))} "
+        f"({_TREND_LABELS[totals['trend']]})",
+        "",
+        "PROJETS",
+    ]
+    for entry in digest['projects']:
+        project, health = entry['project'], entry['health']
+        lines.append(
+            f"- {project.name} [{PROJECT_STATUS.get(project.status, project.status)}] "
+            f"{entry['stats']['progress']}% - santé {_HEALTH_LABELS[health['status']]} "
+            f"({health['score']}/100): {health['message']}"
+        )
+    if digest['overdue']:
+        lines += ["", "TÂCHES EN RETARD"]
+        for task in digest['overdue']:
+            lines.append(
+                f"- {task.deadline} {task.title} ({task.project_name}, "
+                f"{task.assigned_to_name or 'non assignée'})"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def _digest_html(digest: Dict[str, Any], week: str) -> str:
+    """Version HTML du résumé (styles en ligne, pour les clients de messagerie)."""
+    e = lambda value: html.escape(str(value))
+    user, totals = digest['user'], digest['totals']
+    cell = 'style="border:1px solid #cbd5e0;padding:4px 8px"'
+    head = 'style="border:1px solid #cbd5e0;padding:4px 8px;background:#718096;color:#fff"'
+
+    rows = []
+    for entry in digest['projects']:
+        project, health = entry['project'], entry['health']
+        color = health.get('color', '#718096')
+        rows.append(
+            f"<tr><td {cell}>{e(project.name)}</td>"
+            f"<td {cell}>{e(PROJECT_STATUS.get(project.status, project.status))}</td>"
+            f"<td {cell}>{entry['stats']['progress']}%</td>"
+            f'<td {cell}><b style="color:{color}">{health["score"]}</b> {e(health["message"])}</td>'
+            f"<td {cell}>{' / '.join(map(str, entry['velocity']))}</td></tr>"
+        )
+    parts = [
+        '<html><body style="font-family:Helvetica,Arial,sans-serif;color:#2d3748">',
+        f'<h2 style="color:{THEME_COLORS["primary"]}">Résumé de la semaine {e(week)}</h2>',
+        f"<p>Bonjour {e(user.full_name or user.username)},</p>",
+        f"<p><b>{totals['projects']}</b> projets suivis (dont <b>{totals['at_risk']}</b> en situation "
+        f"critique) &middot; <b>{totals['completed_tasks']}/{totals['total_tasks']}</b> tâches terminées "
+        f"&middot; <b>{totals['overdue_tasks']}</b> en retard &middot; <b>{totals['blocked_tasks']}</b> "
+        f"bloquée(s)<br>Tâches terminées par semaine: {' / '.join(map(str, totals['velocity']))} "
+        f"({_TREND_LABELS[totals['trend']]})</p>",
+        '<table style="border-collapse:collapse;font-size:13px"><tr>'
+        + "".join(f"<th {head}>{label}</th>" for label in
+                  ("Projet", "Statut", "Progression", "Santé", "Vélocité"))
+        + "</tr>" + "".join(rows) + "</table>",
+    ]
+    if digest['overdue']:
+        parts.append("<h3>Tâches en retard</h3><ul>")
+        parts += [
+            f"<li>{e(task.deadline)} <b>{e(task.title)}</b> ({e(task.project_name)}, "
+            f"{e(task.assigned_to_name or 'non assignée')})</li>"
+            for task in digest['overdue']
+        ]
+        parts.append("</ul>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+@lru_cache(maxsize=8)
+def _encoded_subject(week: str) -> str:
+    """Objet des résumés d'une semaine, encodé une fois (RFC 2047) pour tous les messages."""
+    return Header(f"Résumé hebdomadaire - semaine {week}", 'utf-8').encode()
+
+
+def render_digest_message(digest: Dict[str, Any], week: str) -> MIMEMultipart:
+    """
+    Message (texte et HTML) d'un résumé hebdomadaire.
+
+    Construit avec les classes email.mime (politique compat32), nettement
+    moins coûteuses que EmailMessage pour des milliers de messages.
+    """
+    user = digest['user']
+    message = MIMEMultipart('alternative')
+    message['Subject'] = _encoded_subject(week)
+    message['From'] = DIGEST_SENDER
+    message['To'] = user.email
+    message['Date'] = format_datetime(datetime.now().astimezone())
+    # Domaine explicite: sans lui, make_msgid résout le nom de la machine à chaque appel
+    message['Message-ID'] = make_msgid(domain=DIGEST_SENDER.rpartition('@')[2])
+    message['X-Digest-Week'] = week
+    message.attach(MIMEText(_digest_text(digest, week), 'plain', 'utf-8'))
+    message.attach(MIMEText(_digest_html(digest, week), 'html', 'utf-8'))
+    return message
+
+
+def _write_atomic(path: str, data: bytes):
+    """Écrit un fichier en entier ou pas du tout (fichier temporaire renommé)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as out:
+        out.write(data)
+    os.replace(tmp_path, path)
+
+
+def build_weekly_digests(outbox_dir: str = DIGEST_OUTBOX_DIR, user_ids: Optional[List[int]] = None,
+                         week: str = None,
+                         progress: Callable[[int, int], None] = None) -> Dict[str, Any]:
+    """
+    Génère le résumé hebdomadaire de chaque chef de projet dans la boîte d'envoi.
+
+    Un chef de projet sans projet ou sans adresse email ne reçoit pas de résumé.
+
+    Args:
+        outbox_dir: répertoire de la boîte d'envoi
+        user_ids: chefs de projet à inclure (None: tous les chefs de projet actifs)
+        week: semaine du résumé (défaut: semaine en cours, voir digest_week)
+        progress: appelée avec (résumés écrits, nombre de résumés)
+
+    Returns:
+        Dict avec 'week', 'directory', 'written' (chemins), 'skipped' (IDs) et 'projects'
+    """
+    week = week or digest_week()
+    directory = os.path.join(outbox_dir, week)
+    os.makedirs(directory, exist_ok=True)
+
+    with read_snapshot():
+        manager_projects = crud.get_manager_projects(user_ids)
+        project_ids = sorted({pid for ids in manager_projects.values() for pid in ids})
+        projects = crud.load_project_digests(project_ids, DIGEST_OVERDUE_LIMIT, DIGEST_VELOCITY_WEEKS)
+    for entry in projects.values():
+        entry['health'] = compute_project_health(entry['project'], entry['stats'], entry['blocked_tasks'])
+    users = crud.get_users_by_ids(list(manager_projects))
+
+    written, skipped = [], []
+    for user_id in sorted(manager_projects):
+        user = users.get(user_id)
+        if user is None or not user.email:
+            skipped.append(user_id)
+        else:
+            digest = build_manager_digest(user, manager_projects[user_id], projects)
+            path = os.path.join(directory, digest_file_name(user))
+            _write_atomic(path, render_digest_message(digest, week).as_bytes())
+            written.append(path)
+        if progress:
+            progress(len(written) + len(skipped), len(manager_projects))
+
+    return {
+        'week': week,
+        'directory': directory,
+        'written': written,
+        'skipped': skipped,
+        'projects': len(projects)
+    }
+
+
+def main(argv: List[str] = None):
+    """Point d'entrée en ligne de commande."""
+    parser = argparse.ArgumentParser(description="Résumés hebdomadaires des chefs de projet.")
+    parser.add_argument('--outbox', default=DIGEST_OUTBOX_DIR, help="répertoire de la boîte d'envoi")
+    parser.add_argument('--managers', type=int, nargs='+',
+                        help="IDs des chefs de projet (défaut: tous)")
+    parser.add_argument('--week', help="semaine ISO du résumé, ex. 2024-W07 (défaut: semaine en cours)")
+    args = parser.parse_args(argv)
+
+    def show(done, total):
+        print(f"\r{done}/{total} résumés", end='', flush=True)
+
+    result = build_weekly_digests(args.outbox, args.managers, args.week, show)
+    print(f"\n{len(result['written'])} résumés ({result['projects']} projets) "
+          f"écrits dans {result['directory']}")
+    if result['skipped']:
+        print(f"Sans adresse email: {', '.join(map(str, result['skipped']))}")
+
+
+if __name__ == "__main__":
+    main()
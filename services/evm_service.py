@@ -0,0 +1,276 @@
+"""
+Service de gestion de la valeur acquise (Earned Value Management).
+
+Les colonnes nécessaires sont chargées une seule fois en tableaux NumPy,
+puis tous les indicateurs (PV, EV, AC, CPI, SPI, EAC) sont calculés de
+manière vectorisée pour l'ensemble du portefeuille.
+
+Conventions utilisées:
+    - BAC (budget à l'achèvement) = budget du projet.
+    - Le travail d'une tâche est pondéré par ses heures estimées; une tâche
+      sans estimation reçoit l'estimation moyenne de son projet (ou 1h).
+    - Le taux horaire d'un projet vaut BAC / heures planifiées, ce qui
+      permet de convertir les heures (prévues, acquises, réelles) en euros.
+    - La valeur planifiée d'une tâche croît linéairement entre le début du
+      projet et la deadline de la tâche (à défaut celle du milestone, puis
+      la fin du projet).
+"""
+
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional
+import sys
+import os
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import crud
+from utils.cache import cached
+from database.models import EarnedValue
+
+
+# Décalage entre un ordinal Python (date.toordinal) et un jour julien SQLite
+_JULIAN_OFFSET = 1721424.5
+
+
+def load_evm_columns(project_id: int = None) -> Dict[str, Any]:
+    """
+    Charge en une passe les colonnes utiles au calcul EVM.
+
+    Les dates sont converties en jours juliens par SQLite afin d'obtenir
+    directement des tableaux de flottants (NaN pour les valeurs absentes).
+    """
+    conn = crud.get_connection()
+    conn.row_factory = None
+    cursor = conn.cursor()
+
+    where = " WHERE id = ?" if project_id else ""
+    child_where = " WHERE project_id = ?" if project_id else ""
+    params = (project_id,) if project_id else ()
+
+    cursor.execute(f'''
+        SELECT id, name, COALESCE(budget, 0), julianday(start_date),
+               julianday(end_date), julianday(created_at)
+        FROM projects{where} ORDER BY id
+    ''', params)
+    projects = cursor.fetchall()
+
+    cursor.execute(f'''
+        SELECT id, project_id, name, julianday(due_date)
+        FROM milestones{child_where} ORDER BY id
+    ''', params)
+    milestones = cursor.fetchall()
+
+    cursor.execute(f'''
+        SELECT project_id, COALESCE(milestone_id, 0), estimated_hours,
+               COALESCE(actual_hours, 0), COALESCE(progress, 0),
+               CASE WHEN status = 'COMPLETED' THEN 1 ELSE 0 END,
+               julianday(deadline)
+        FROM tasks{child_where}
+    ''', params)
+    tasks = cursor.fetchall()
+    conn.close()
+
+    def columns(rows, count):
+        if not rows:
+            return [()] * count
+        return list(zip(*rows))
+
+    p_id, p_name, p_budget, p_start, p_end, p_created = columns(projects, 6)
+    m_id, m_project, m_name, m_due = columns(milestones, 4)
+    t_project, t_milestone, t_est, t_actual, t_progress, t_done, t_deadline = columns(tasks, 7)
+
+    return {
+        'project_id': np.array(p_id, dtype=np.int64),
+        'project_name': list(p_name),
+        'budget': np.array(p_budget, dtype=float),
+        'start': np.array(p_start, dtype=float),
+        'end': np.array(p_end, dtype=float),
+        'created': np.array(p_created, dtype=float),
+        'milestone_id': np.array(m_id, dtype=np.int64),
+        'milestone_project': np.array(m_project, dtype=np.int64),
+        'milestone_name': list(m_name),
+        'milestone_due': np.array(m_due, dtype=float),
+        'task_project': np.array(t_project, dtype=np.int64),
+        'task_milestone': np.array(t_milestone, dtype=np.int64),
+        'task_estimated': np.array(t_est, dtype=float),
+        'task_actual': np.array(t_actual, dtype=float),
+        'task_progress': np.array(t_progress, dtype=float),
+        'task_done': np.array(t_done, dtype=bool),
+        'task_deadline': np.array(t_deadline, dtype=float),
+    }
+
+
+def compute_evm(columns: Dict[str, Any], as_of: date = None) -> Dict[str, Any]:
+    """
+    Calcule les indicateurs EVM par projet, par milestone et pour le portefeuille.
+
+    Returns:
+        Dict de tableaux NumPy alignés sur les projets ('project_*'),
+        sur les milestones ('milestone_*') et totaux du portefeuille.
+    """
+    today = (as_of or date.today()).toordinal() + _JULIAN_OFFSET
+    n_projects = len(columns['project_id'])
+    n_milestones = len(columns['milestone_id'])
+
+    # Rattacher chaque tâche à l'index de son projet (ids triés)
+    pidx = _index_of(columns['project_id'], columns['task_project'])
+    keep = pidx >= 0
+    pidx = pidx[keep]
+    est = columns['task_estimated'][keep]
+    actual = columns['task_actual'][keep]
+    progress = np.where(columns['task_done'][keep], 100.0, columns['task_progress'][keep])
+    progress = np.clip(progress, 0, 100) / 100.0
+    deadline = columns['task_deadline'][keep]
+    midx = _index_of(columns['milestone_id'], columns['task_milestone'][keep])
+
+    # Pondération des tâches par les heures estimées
+    has_est = ~np.isnan(est) & (est > 0)
+    est_sum = np.bincount(pidx, weights=np.where(has_est, est, 0.0), minlength=n_projects)
+    est_count = np.bincount(pidx, weights=has_est.astype(float), minlength=n_projects)
+    mean_est = np.divide(est_sum, est_count, out=np.ones(n_projects), where=est_count > 0)
+    weight = np.where(has_est, est, mean_est[pidx])
+
+    bac = columns['budget']
+    planned_hours = np.bincount(pidx, weights=weight, minlength=n_projects)
+    rate = np.divide(bac, planned_hours, out=np.zeros(n_projects), where=planned_hours > 0)
+
+    # Fraction planifiée de chaque tâche à la date du jour
+    start = np.where(np.isnan(columns['start']), columns['created'], columns['start'])[pidx]
+    due = deadline
+    if n_milestones:
+        ms_due = np.where(midx >= 0, columns['milestone_due'][np.maximum(midx, 0)], np.nan)
+        due = np.where(np.isnan(due), ms_due, due)
+    due = np.where(np.isnan(due), columns['end'][pidx], due)
+    span = due - start
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fraction = np.where(span > 0, (today - start) / span, (today >= due).astype(float))
+    fraction = np.nan_to_num(np.clip(fraction, 0.0, 1.0), nan=0.0)
+
+    task_rate = rate[pidx]
+    task_pv = task_rate * weight * fraction
+    task_ev = task_rate * weight * progress
+    task_ac = task_rate * actual
+
+    result = {
+        'project_bac': bac,
+        'project_pv': np.bincount(pidx, weights=task_pv, minlength=n_projects),
+        'project_ev': np.bincount(pidx, weights=task_ev, minlength=n_projects),
+        'project_ac': np.bincount(pidx, weights=task_ac, minlength=n_projects),
+    }
+
+    in_ms = midx >= 0
+    ms = midx[in_ms]
+    result['milestone_bac'] = np.bincount(ms, weights=(task_rate * weight)[in_ms], minlength=n_milestones)
+    result['milestone_pv'] = np.bincount(ms, weights=task_pv[in_ms], minlength=n_milestones)
+    result['milestone_ev'] = np.bincount(ms, weights=task_ev[in_ms], minlength=n_milestones)
+    result['milestone_ac'] = np.bincount(ms, weights=task_ac[in_ms], minlength=n_milestones)
+
+    for prefix in ('project', 'milestone'):
+        _add_indices(result, prefix)
+
+    result['portfolio_bac'] = np.array([bac.sum()])
+    result['portfolio_pv'] = np.array([result['project_pv'].sum()])
+    result['portfolio_ev'] = np.array([result['project_ev'].sum()])
+    result['portfolio_ac'] = np.array([result['project_ac'].sum()])
+    _add_indices(result, 'portfolio')
+
+    return result
+
+
+def _index_of(sorted_ids: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Retourne la position de chaque valeur dans sorted_ids, ou -1 si absente."""
+    if len(sorted_ids) == 0:
+        return np.full(len(values), -1, dtype=np.int64)
+    pos = np.searchsorted(sorted_ids, values)
+    pos = np.minimum(pos, len(sorted_ids) - 1)
+    return np.where(sorted_ids[pos] == values, pos, -1)
+
+
+def _add_indices(result: Dict[str, np.ndarray], prefix: str):
+    """Ajoute CPI, SPI et EAC calculés à partir de BAC, PV, EV et AC."""
+    for key in ('bac', 'pv', 'ev', 'ac'):
+        result[f'{prefix}_{key}'] = np.asarray(result[f'{prefix}_{key}'], dtype=float)
+    bac = result[f'{prefix}_bac']
+    pv = result[f'{prefix}_pv']
+    ev = result[f'{prefix}_ev']
+    ac = result[f'{prefix}_ac']
+    cpi = np.divide(ev, ac, out=np.full(len(ev), np.nan), where=ac > 0)
+    spi = np.divide(ev, pv, out=np.full(len(ev), np.nan), where=pv > 0)
+    # EAC = BAC / CPI; sans coût réel, on conserve le budget initial
+    eac = np.divide(bac, cpi, out=bac.copy(), where=cpi > 0)
+    result[f'{prefix}_cpi'] = cpi
+    result[f'{prefix}_spi'] = spi
+    result[f'{prefix}_eac'] = eac
+
+
+def _to_earned_value(result, prefix, i, entity_type, entity_id, name, project_id=None) -> EarnedValue:
+    """Convertit une ligne des tableaux de résultats en EarnedValue."""
+    def value(key):
+        v = float(result[f'{prefix}_{key}'][i])
+        return None if np.isnan(v) else round(v, 2)
+
+    return EarnedValue(
+        entity_type=entity_type,
+        entity_id=entity_id,
+        name=name,
+        project_id=project_id,
+        budget_at_completion=value('bac') or 0.0,
+        planned_value=value('pv') or 0.0,
+        earned_value=value('ev') or 0.0,
+        actual_cost=value('ac') or 0.0,
+        cpi=value('cpi'),
+        spi=value('spi'),
+        estimate_at_completion=value('eac')
+    )
+
+
+@cached('projects', 'milestones', 'tasks', 'time', shared=True)
+def get_portfolio_evm(as_of: date = None, project_id: int = None) -> Dict[str, Any]:
+    """
+    Calcule les indicateurs EVM de tous les projets et milestones.
+
+    Returns:
+        Dict avec 'projects', 'milestones' (listes d'EarnedValue),
+        'portfolio' (EarnedValue agrégé) et 'computed_at'.
+    """
+    columns = load_evm_columns(project_id)
+    result = compute_evm(columns, as_of)
+
+    projects = [
+        _to_earned_value(result, 'project', i, 'project', int(pid), columns['project_name'][i], int(pid))
+        for i, pid in enumerate(columns['project_id'])
+    ]
+    milestones = [
+        _to_earned_value(result, 'milestone', i, 'milestone', int(mid),
+                         columns['milestone_name'][i], int(columns['milestone_project'][i]))
+        for i, mid in enumerate(columns['milestone_id'])
+    ]
+
+    return {
+        'projects': projects,
+        'milestones': milestones,
+        'portfolio': _to_earned_value(result, 'portfolio', 0, 'portfolio', None, "Portefeuille"),
+        'computed_at': datetime.now().isoformat()
+    }
+
+
+def get_project_evm(project_id: int, as_of: date = None) -> Optional[Dict[str, Any]]:
+    """
+    Récupère les indicateurs EVM d'un projet et de ses milestones.
+
+    Returns:
+        Dict avec 'project' (EarnedValue) et 'milestones', ou None si le projet n'existe pas.
+    """
+    evm = get_portfolio_evm(as_of, project_id=project_id)
+    if not evm['projects']:
+        return None
+    return {
+        'project': evm['projects'][0],
+        'milestones': evm['milestones']
+    }
+
+
+def format_evm_index(value: Optional[float]) -> str:
+    """Formate un indice CPI/SPI pour l'affichage."""
+    return f"{value:.2f}" if value is not None else "N/A"
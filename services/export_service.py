@@ -0,0 +1,243 @@
+"""
+Service d'export en flux (CSV, NDJSON, sauvegardes compressées).
+
+Les lignes sont lues par paquets (fetchmany) et encodées par blocs de
+EXPORT_CHUNK_BYTES: la mémoire utilisée ne dépend pas du nombre de lignes
+exportées. Les générateurs iter_*_csv produisent des blocs d'octets UTF-8,
+écrits dans un fichier par les travaux d'export (services/job_service).
+
+Une sauvegarde complète (write_export_bundle) regroupe projets, tâches,
+jalons, membres, commentaires et activité dans une seule archive zip ou
+gzip, compressée au fil de la lecture, avec un manifeste (lignes, taille et
+empreinte SHA-256 de chaque jeu de données).
+"""
+
+import io
+import csv
+import gzip
+import hashlib
+import json
+import zipfile
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, BinaryIO, Sequence
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import crud
+from database.db_setup import read_snapshot
+from config import EXPORT_CHUNK_BYTES, EXPORT_COMPRESSION_LEVEL
+
+
+# Formats et compressions des sauvegardes complètes
+BUNDLE_FORMATS = {'csv': '.csv', 'ndjson': '.ndjson'}
+BUNDLE_COMPRESSIONS = {'zip': '.zip', 'gzip': '.ndjson.gz'}
+BUNDLE_DATASETS = tuple(crud.EXPORT_DATASETS)
+
+
+PROJECT_TASKS_HEADER = [
+    'ID', 'Titre', 'Description', 'Statut', 'Priorité',
+    'Progression (%)', 'Assigné à', 'Deadline', 'Créé le'
+]
+PROJECTS_HEADER = [
+    'ID', 'Nom', 'Description', 'Statut', 'Date début',
+    'Date fin', 'Progression (%)', 'Nombre tâches', 'Nombre membres'
+]
+TEAM_PERFORMANCE_HEADER = [
+    'ID', 'Nom', 'Total tâches', 'Complétées', 'En cours',
+    'En retard', 'Taux de complétion (%)', 'Progression moyenne (%)'
+]
+
+
+def encode_csv(header: Sequence, rows: Iterable[Sequence],
+               chunk_bytes: int = EXPORT_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Encode des lignes en CSV UTF-8 par blocs d'environ chunk_bytes.
+
+    Args:
+        header: ligne d'en-tête
+        rows: lignes à écrire (itérable consommé au fur et à mesure)
+        chunk_bytes: taille approximative des blocs produits
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def encode_ndjson(columns: Sequence[str], rows: Iterable[Sequence], dataset: str = None,
+                  chunk_bytes: int = EXPORT_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Encode des lignes en NDJSON UTF-8 (un objet par ligne) par blocs.
+
+    Args:
+        columns: noms des colonnes (clés des objets)
+        rows: lignes à écrire (itérable consommé au fur et à mesure)
+        dataset: si renseigné, chaque objet est {"dataset": ..., "row": {...}}
+        chunk_bytes: taille approximative des blocs produits
+    """
+    buffer = io.StringIO()
+    for row in rows:
+        record = dict(zip(columns, row))
+        if dataset:
+            record = {'dataset': dataset, 'row': record}
+        buffer.write(json.dumps(record, ensure_ascii=False, default=str))
+        buffer.write('\n')
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def iter_project_tasks_csv(project_id: int) -> Iterator[bytes]:
+    """Tâches d'un projet en CSV (blocs d'octets)."""
+    rows = (
+        (
+            task.id,
+            task.title,
+            task.description or '',
+            task.status,
+            task.priority,
+            task.progress,
+            task.assigned_to_name or 'Non assigné',
+            task.deadline or '',
+            task.created_at or ''
+        )
+        for task in crud.iter_tasks(project_id=project_id)
+    )
+    return encode_csv(PROJECT_TASKS_HEADER, rows)
+
+
+def iter_all_projects_csv() -> Iterator[bytes]:
+    """Tous les projets en CSV (blocs d'octets)."""
+    rows = (
+        (
+            project.id,
+            project.name,
+            project.description or '',
+            project.status,
+            project.start_date or '',
+            project.end_date or '',
+            project.progress,
+            project.task_count,
+            project.member_count
+        )
+        for project in crud.iter_projects()
+    )
+    return encode_csv(PROJECTS_HEADER, rows)
+
+
+def iter_team_performance_csv() -> Iterator[bytes]:
+    """Performances de l'équipe en CSV (blocs d'octets)."""
+    rows = (
+        (
+            perf.user_id,
+            perf.user_name,
+            perf.total_tasks,
+            perf.completed_tasks,
+            perf.in_progress_tasks,
+            perf.overdue_tasks,
+            perf.completion_rate,
+            perf.average_progress
+        )
+        for perf in crud.iter_member_performance()
+    )
+    return encode_csv(TEAM_PERFORMANCE_HEADER, rows)
+
+
+# ================== SAUVEGARDES COMPLÈTES ==================
+
+def _write_dataset(out, name: str, fmt: str, tagged: bool = False) -> Dict[str, Any]:
+    """Écrit un jeu de données dans out et retourne son entrée de manifeste."""
+    columns, rows = crud.iter_dataset(name)
+    count = [0]
+
+    def counted():
+        for row in rows:
+            count[0] += 1
+            yield row
+
+    if fmt == 'csv':
+        chunks = encode_csv(columns, counted())
+    else:
+        chunks = encode_ndjson(columns, counted(), dataset=name if tagged else None)
+
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in chunks:
+        out.write(chunk)
+        digest.update(chunk)
+        size += len(chunk)
+    return {'columns': columns, 'rows': count[0], 'bytes': size, 'sha256': digest.hexdigest()}
+
+
+def write_export_bundle(fileobj: BinaryIO, fmt: str = 'csv', compression: str = 'zip',
+                        datasets: Sequence[str] = BUNDLE_DATASETS,
+                        on_dataset: Callable[[str, Dict[str, Any]], None] = None) -> Dict[str, Any]:
+    """
+    Écrit une sauvegarde complète compressée dans fileobj.
+
+    Tous les jeux de données sont lus dans le même instantané de lecture.
+    - zip: un fichier par jeu de données (CSV ou NDJSON) et manifest.json;
+    - gzip: un seul flux NDJSON dont chaque ligne porte son jeu de données
+      ({"dataset": ..., "row": {...}}), terminé par {"manifest": {...}}.
+
+    Les empreintes SHA-256 portent sur le contenu non compressé de chaque jeu
+    de données, tel qu'écrit dans l'archive.
+
+    Args:
+        fileobj: fichier binaire ouvert en écriture
+        fmt: 'csv' ou 'ndjson' (gzip n'accepte que 'ndjson')
+        compression: 'zip' ou 'gzip'
+        datasets: jeux de données à inclure (clés de crud.EXPORT_DATASETS)
+        on_dataset: appelée avec le nom et l'entrée de manifeste de chaque
+            jeu de données écrit (suivi de l'avancement)
+
+    Returns:
+        Le manifeste
+    """
+    if fmt not in BUNDLE_FORMATS:
+        raise ValueError(f"Format d'export inconnu: {fmt}")
+    if compression not in BUNDLE_COMPRESSIONS:
+        raise ValueError(f"Compression inconnue: {compression}")
+    if compression == 'gzip' and fmt != 'ndjson':
+        raise ValueError("Une sauvegarde gzip est un flux NDJSON unique: utiliser le format 'ndjson'.")
+
+    manifest = {
+        'generated_at': datetime.now().isoformat(),
+        'format': fmt,
+        'compression': compression,
+        'datasets': {}
+    }
+    with read_snapshot():
+        if compression == 'zip':
+            with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED,
+                                 compresslevel=EXPORT_COMPRESSION_LEVEL) as bundle:
+                for name in datasets:
+                    file_name = name + BUNDLE_FORMATS[fmt]
+                    with bundle.open(file_name, 'w', force_zip64=True) as member:
+                        entry = _write_dataset(member, name, fmt)
+                    manifest['datasets'][name] = {'file': file_name, **entry}
+                    if on_dataset:
+                        on_dataset(name, entry)
+                bundle.writestr('manifest.json',
+                                json.dumps(manifest, ensure_ascii=False, indent=2))
+        else:
+            with gzip.GzipFile(fileobj=fileobj, mode='wb',
+                               compresslevel=EXPORT_COMPRESSION_LEVEL) as bundle:
+                for name in datasets:
+                    entry = manifest['datasets'][name] = _write_dataset(bundle, name, fmt, tagged=True)
+                    if on_dataset:
+                        on_dataset(name, entry)
+                bundle.write(json.dumps({'manifest': manifest}, ensure_ascii=False).encode('utf-8'))
+                bundle.write(b'\n')
+    return manifest
@@ -0,0 +1,192 @@
+"""
+Service d'analyse du flux des tâches (cycle time, lead time, flux cumulé).
+
+Les analyses s'appuient sur la table task_status_history: chaque ligne
+ouvre un intervalle [changed_at, transition suivante) pendant lequel la
+tâche est restée dans le statut to_status. Les intervalles sont calculés
+de manière vectorisée avec NumPy.
+
+Définitions:
+    - Lead time: de la création de la tâche à sa complétion.
+    - Cycle time: de la première sortie du statut TODO à la complétion.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any
+import sys
+import os
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import crud
+from utils.cache import cached
+from config import TASK_STATUS
+
+
+STATUS_CODES = list(TASK_STATUS.keys())
+FLOW_PERCENTILES = (50, 85, 95)
+
+# Décalage entre un ordinal Python (date.toordinal) et un jour julien SQLite
+_JULIAN_OFFSET = 1721424.5
+
+
+def load_status_intervals(project_id: int = None) -> Dict[str, np.ndarray]:
+    """
+    Charge l'historique des statuts sous forme d'intervalles.
+
+    Returns:
+        Dict de tableaux alignés: 'task', 'status' (index dans STATUS_CODES),
+        'start' et 'end' (jours juliens, la fin du dernier intervalle vaut maintenant)
+        et 'is_open' (statut courant de la tâche).
+    """
+    conn = crud.get_connection()
+    conn.row_factory = None
+    cursor = conn.cursor()
+    query = '''
+        SELECT task_id, to_status, julianday(changed_at)
+        FROM task_status_history
+    '''
+    params = []
+    if project_id:
+        query += " WHERE project_id = ?"
+        params.append(project_id)
+    query += " ORDER BY task_id, changed_at, id"
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    conn.close()
+
+    now = _julian(datetime.now())
+    if not rows:
+        empty = np.array([], dtype=float)
+        return {'task': np.array([], dtype=np.int64), 'status': np.array([], dtype=np.int64),
+                'start': empty, 'end': empty, 'is_open': np.array([], dtype=bool), 'now': now}
+
+    task, status, start = zip(*rows)
+    task = np.array(task, dtype=np.int64)
+    start = np.array(start, dtype=float)
+    lookup = {code: i for i, code in enumerate(STATUS_CODES)}
+    status = np.array([lookup.get(s, -1) for s in status], dtype=np.int64)
+
+    # La fin d'un intervalle est le début du suivant pour la même tâche
+    same_task_next = np.r_[task[1:] == task[:-1], False]
+    end = np.where(same_task_next, np.r_[start[1:], now], now)
+
+    return {'task': task, 'status': status, 'start': start, 'end': end,
+            'is_open': ~same_task_next, 'now': now}
+
+
+def _julian(moment: datetime) -> float:
+    """Convertit une datetime en jour julien (comme julianday() de SQLite)."""
+    seconds = moment.hour * 3600 + moment.minute * 60 + moment.second + moment.microsecond / 1e6
+    return moment.toordinal() + _JULIAN_OFFSET + seconds / 86400
+
+
+def compute_flow_times(intervals: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Calcule lead time et cycle time (en jours) des tâches terminées.
+
+    Returns:
+        Dict avec 'task', 'lead_time' et 'cycle_time' pour chaque tâche terminée.
+    """
+    task = intervals['task']
+    if len(task) == 0:
+        empty = np.array([], dtype=float)
+        return {'task': np.array([], dtype=np.int64), 'lead_time': empty, 'cycle_time': empty}
+
+    status = intervals['status']
+    start = intervals['start']
+    group_starts = np.flatnonzero(np.r_[True, task[1:] != task[:-1]])
+    group_ends = np.r_[group_starts[1:], len(task)] - 1
+
+    created = start[group_starts]
+    todo = STATUS_CODES.index('TODO')
+    work_start = np.minimum.reduceat(np.where(status != todo, start, np.inf), group_starts)
+
+    # Une tâche est terminée si son dernier statut est COMPLETED
+    completed = status[group_ends] == STATUS_CODES.index('COMPLETED')
+    done_at = start[group_ends]
+
+    lead = (done_at - created)[completed]
+    cycle = (done_at - work_start)[completed]
+    return {
+        'task': task[group_starts][completed],
+        'lead_time': np.maximum(lead, 0),
+        'cycle_time': np.maximum(cycle, 0)
+    }
+
+
+def compute_time_in_status(intervals: Dict[str, np.ndarray]) -> Dict[str, float]:
+    """Calcule la durée moyenne (jours) passée par tâche dans chaque statut non terminal."""
+    result = {}
+    durations = intervals['end'] - intervals['start']
+    for i, code in enumerate(STATUS_CODES):
+        if code == 'COMPLETED':
+            continue
+        mask = intervals['status'] == i
+        if not mask.any():
+            result[code] = 0.0
+            continue
+        per_task = np.bincount(np.unique(intervals['task'][mask], return_inverse=True)[1],
+                               weights=durations[mask])
+        result[code] = round(float(per_task.mean()), 2)
+    return result
+
+
+def compute_cumulative_flow(intervals: Dict[str, np.ndarray], days: int = 30) -> Dict[str, Any]:
+    """
+    Calcule le diagramme de flux cumulé: nombre de tâches par statut en fin de journée.
+
+    Pour chaque statut, le nombre d'intervalles couvrant un instant t vaut
+    #(début <= t) - #(fin <= t), obtenu par recherche dichotomique sur les
+    bornes triées.
+    """
+    today = date.today()
+    day_list = [today - timedelta(days=i) for i in range(days - 1, -1, -1)]
+    # Instant de mesure: fin de chaque journée (plafonné à maintenant)
+    checkpoints = np.array([d.toordinal() + 1 + _JULIAN_OFFSET for d in day_list])
+    checkpoints = np.minimum(checkpoints, intervals['now'])
+
+    series = {}
+    for i, code in enumerate(STATUS_CODES):
+        mask = intervals['status'] == i
+        starts = np.sort(intervals['start'][mask])
+        # Le statut courant d'une tâche reste ouvert: pas de borne de fin
+        ends = np.sort(np.where(intervals['is_open'][mask], np.inf, intervals['end'][mask]))
+        opened = np.searchsorted(starts, checkpoints, side='right')
+        closed = np.searchsorted(ends, checkpoints, side='right')
+        series[code] = (opened - closed).tolist()
+
+    return {
+        'dates': [d.isoformat() for d in day_list],
+        'series': series
+    }
+
+
+@cached('tasks', shared=True)
+def get_flow_metrics(project_id: int = None, days: int = 30) -> Dict[str, Any]:
+    """
+    Calcule les indicateurs de flux d'un projet (ou de toutes les tâches).
+
+    Returns:
+        Dict avec percentiles de 'cycle_time' et 'lead_time' (jours),
+        'time_in_status', 'cumulative_flow' et 'completed_count'.
+    """
+    intervals = load_status_intervals(project_id)
+    times = compute_flow_times(intervals)
+
+    def percentiles(values):
+        if len(values) == 0:
+            return {f"p{p}": None for p in FLOW_PERCENTILES}
+        return {
+            f"p{p}": round(float(v), 1)
+            for p, v in zip(FLOW_PERCENTILES, np.percentile(values, FLOW_PERCENTILES))
+        }
+
+    return {
+        'completed_count': int(len(times['task'])),
+        'cycle_time': percentiles(times['cycle_time']),
+        'lead_time': percentiles(times['lead_time']),
+        'time_in_status': compute_time_in_status(intervals),
+        'cumulative_flow': compute_cumulative_flow(intervals, days)
+    }
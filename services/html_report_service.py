@@ -0,0 +1,297 @@
+"""
+Rapports HTML autonomes, alternative légère aux rapports PDF.
+
+Un rapport HTML reprend le contenu du rapport PDF (informations du projet,
+équipe, statistiques, valeur acquise, détail des tâches) avec des
+graphiques SVG intégrés: un seul fichier, sans script ni ressource
+externe, lisible dans n'importe quel navigateur et imprimable (l'en-tête
+du tableau des tâches est répété à chaque page).
+
+Les données sont chargées par les mêmes fonctions que le PDF
+(report_service.load_project_report_data / load_global_report_data) et
+les lignes du tableau sont écrites en flux, par blocs de
+EXPORT_CHUNK_BYTES: aucune mise en page n'est calculée côté serveur.
+"""
+
+import html
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import crud
+from database.db_setup import in_read_snapshot
+from database.models import Project, Task
+from services.report_service import (
+    load_project_report_data, load_global_report_data, evm_table_data
+)
+from config import (
+    EXPORT_CHUNK_BYTES, THEME_COLORS, PROJECT_STATUS, TASK_STATUS, TASK_PRIORITY
+)
+
+
+_STATUS_COLORS = {
+    'TODO': '#718096',
+    'IN_PROGRESS': THEME_COLORS['info'],
+    'REVIEW': '#9f7aea',
+    'COMPLETED': THEME_COLORS['success'],
+    'BLOCKED': THEME_COLORS['danger']
+}
+
+_PRIORITY_COLORS = {
+    'LOW': THEME_COLORS['success'],
+    'MEDIUM': THEME_COLORS['info'],
+    'HIGH': THEME_COLORS['warning'],
+    'CRITICAL': THEME_COLORS['danger']
+}
+
+_CSS = """
+body { font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif; color: #2d3748;
+       max-width: 1100px; margin: 2rem auto; padding: 0 1rem; }
+h1 { color: %(primary)s; font-size: 1.8rem; }
+h2 { border-bottom: 2px solid %(primary)s; padding-bottom: .25rem; margin-top: 2rem; font-size: 1.25rem; }
+table { border-collapse: collapse; margin: .5rem 0 1rem; font-size: .85rem; }
+th, td { border: 1px solid #cbd5e0; padding: .3rem .6rem; text-align: left; }
+thead th { background: #718096; color: #fff; position: sticky; top: 0; }
+table.info th { background: #edf2f7; color: #2d3748; width: 12rem; }
+table.stats td, td.num { text-align: right; }
+tr.total td { background: #edf2f7; font-weight: bold; }
+.charts { display: flex; flex-wrap: wrap; gap: 2rem; }
+footer { margin-top: 2rem; color: #718096; font-style: italic; font-size: .85rem; }
+@media print { thead { display: table-header-group; } thead th { position: static; }
+               tr { page-break-inside: avoid; } }
+""" % THEME_COLORS
+
+
+def _e(value: Any) -> str:
+    return html.escape(str(value)) if value is not None else ""
+
+
+def _table(header: Sequence[str], rows: Iterable[Sequence[Any]], css_class: str = "",
+           total_last: bool = False) -> str:
+    rows = list(rows)
+    body = []
+    for i, row in enumerate(rows):
+        cls = ' class="total"' if total_last and i == len(rows) - 1 else ""
+        body.append(f"<tr{cls}>" + "".join(f"<td>{_e(v)}</td>" for v in row) + "</tr>")
+    head = "".join(f"<th>{_e(h)}</th>" for h in header)
+    cls = f' class="{css_class}"' if css_class else ""
+    return f"<table{cls}><thead><tr>{head}</tr></thead><tbody>{''.join(body)}</tbody></table>"
+
+
+def _info_table(items: Sequence[Tuple[str, Any]]) -> str:
+    rows = "".join(f"<tr><th>{_e(k)}</th><td>{_e(v)}</td></tr>" for k, v in items)
+    return f'<table class="info"><tbody>{rows}</tbody></table>'
+
+
+def svg_bar_chart(title: str, items: Sequence[Tuple[str, int, str]], width: int = 360) -> str:
+    """
+    Graphique en barres horizontales en SVG intégré.
+
+    Args:
+        title: titre du graphique
+        items: (libellé, valeur, couleur) de chaque barre
+    """
+    row_height, label_width, top = 26, 110, 28
+    bar_space = width - label_width - 50
+    height = top + row_height * max(len(items), 1) + 6
+    peak = max((value for _, value, _ in items), default=0) or 1
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" role="img" aria-label="{_e(title)}">',
+        f'<text x="0" y="16" font-size="14" font-weight="bold" fill="#2d3748">{_e(title)}</text>'
+    ]
+    for i, (label, value, color) in enumerate(items):
+        y = top + i * row_height
+        bar = round(bar_space * value / peak, 1)
+        parts.append(
+            f'<text x="{label_width - 6}" y="{y + 16}" font-size="12" text-anchor="end" '
+            f'fill="#4a5568">{_e(label)}</text>'
+            f'<rect x="{label_width}" y="{y + 4}" width="{bar}" height="{row_height - 8}" '
+            f'rx="3" fill="{color}"><title>{_e(label)}: {value}</title></rect>'
+            f'<text x="{label_width + bar + 6}" y="{y + 16}" font-size="12" '
+            f'fill="#2d3748">{value}</text>'
+        )
+    parts.append('</svg>')
+    return "".join(parts)
+
+
+def _distribution_charts(distribution: Dict[str, Dict[str, int]]) -> str:
+    status = [(TASK_STATUS[k], distribution['status'].get(k, 0), _STATUS_COLORS[k])
+              for k in TASK_STATUS]
+    priority = [(TASK_PRIORITY[k], distribution['priority'].get(k, 0), _PRIORITY_COLORS[k])
+                for k in TASK_PRIORITY]
+    return ('<div class="charts">' + svg_bar_chart("Tâches par statut", status) +
+            svg_bar_chart("Tâches par priorité", priority) + '</div>')
+
+
+# Libellés échappés une fois: seules les valeurs saisies le sont à chaque ligne
+_STATUS_CELLS = {k: f"<td>{html.escape(v)}</td>" for k, v in TASK_STATUS.items()}
+_PRIORITY_CELLS = {k: f"<td>{html.escape(v)}</td>" for k, v in TASK_PRIORITY.items()}
+_PROJECT_STATUS_CELLS = {k: f"<td>{html.escape(v)}</td>" for k, v in PROJECT_STATUS.items()}
+
+
+def _task_row(task: Task) -> str:
+    return (
+        f"<tr><td>{html.escape(task.title)}</td>"
+        f"<td>{html.escape(task.assigned_to_name or 'Non assigné')}</td>"
+        f"{_STATUS_CELLS.get(task.status) or f'<td>{_e(task.status)}</td>'}"
+        f"{_PRIORITY_CELLS.get(task.priority) or f'<td>{_e(task.priority)}</td>'}"
+        f'<td class="num">{task.progress}%</td>'
+        f"<td>{task.deadline or '-'}</td></tr>"
+    )
+
+
+def _project_row(proj: Project) -> str:
+    return (
+        f"<tr><td>{html.escape(proj.name)}</td>"
+        f"{_PROJECT_STATUS_CELLS.get(proj.status) or f'<td>{_e(proj.status)}</td>'}"
+        f'<td class="num">{proj.progress}%</td>'
+        f'<td class="num">{proj.task_count}</td></tr>'
+    )
+
+
+def _streamed_table(header: Sequence[str], rows: Iterable[str],
+                    progress: Callable[[int], None] = None) -> Iterator[str]:
+    """Tableau dont les lignes (déjà en HTML) sont produites au fil de l'itérable."""
+    head = "".join(f"<th>{_e(h)}</th>" for h in header)
+    yield f"<table><thead><tr>{head}</tr></thead><tbody>"
+    count = 0
+    for row in rows:
+        yield row
+        count += 1
+        if progress and count % 1000 == 0:
+            progress(count)
+    if progress:
+        progress(count)
+    yield "</tbody></table>"
+
+
+def _document(title: str, sections: Iterable[str]) -> Iterator[str]:
+    yield (f'<!DOCTYPE html>\n<html lang="fr"><head><meta charset="utf-8">'
+           f'<meta name="viewport" content="width=device-width, initial-scale=1">'
+           f'<title>{_e(title)}</title><style>{_CSS}</style></head><body>')
+    yield from sections
+    yield ('<footer>Rapport généré automatiquement par le système de Gestion de Projets, '
+           f'le {datetime.now().strftime("%d/%m/%Y %H:%M")}</footer></body></html>\n')
+
+
+def _project_sections(data: Dict[str, Any], distribution: Dict[str, Dict[str, int]],
+                      progress=None) -> Iterator[str]:
+    bundle, evm = data['bundle'], data['evm']
+    project, stats = bundle.project, bundle.stats
+    yield f"<h1>Rapport du projet: {_e(project.name)}</h1>"
+
+    yield "<h2>Informations générales</h2>"
+    yield _info_table([
+        ("Statut", PROJECT_STATUS.get(project.status, project.status)),
+        ("Date de début", project.start_date or "Non définie"),
+        ("Date de fin", project.end_date or "Non définie"),
+        ("Budget", f"{project.budget:,.2f} €" if project.budget else "Non défini"),
+        ("Progression", f"{project.progress}%"),
+        ("Temps saisi", f"{bundle.logged_hours:,.1f} h")
+    ])
+
+    if bundle.members:
+        yield "<h2>Équipe du projet</h2>"
+        yield _table(["Nom", "Rôle", "Email", "Date d'assignation"], (
+            [m.user_name, m.role_in_project, m.user_email, str(m.assigned_at)[:10] if m.assigned_at else "-"]
+            for m in bundle.members
+        ))
+
+    yield "<h2>Statistiques des tâches</h2>"
+    yield _table(["Total", "Complétées", "En cours", "À faire", "En retard"], [[
+        stats['total_tasks'], stats['completed_tasks'], stats['in_progress_tasks'],
+        stats['todo_tasks'], stats['overdue_tasks']
+    ]], "stats")
+    yield _distribution_charts(distribution)
+
+    if evm:
+        yield "<h2>Valeur acquise</h2>"
+        rows = evm_table_data([evm['project']] + evm['milestones'])
+        yield _table(rows[0], rows[1:], "stats")
+
+    if stats['total_tasks']:
+        yield "<h2>Détail des tâches</h2>"
+        yield from _streamed_table(
+            ["Titre", "Assigné à", "Statut", "Priorité", "Avancement", "Deadline"],
+            (_task_row(task) for task in data['tasks']), progress
+        )
+
+
+def _global_sections(data: Dict[str, Any], distribution: Dict[str, Dict[str, int]],
+                     progress=None) -> Iterator[str]:
+    dashboard_stats, evm = data['dashboard_stats'], data['evm']
+    yield "<h1>Rapport Global - Gestion de Projets</h1>"
+
+    yield "<h2>Vue d'ensemble</h2>"
+    yield _info_table([
+        ("Projets actifs", dashboard_stats.active_projects),
+        ("Total projets", dashboard_stats.total_projects),
+        ("Tâches totales", dashboard_stats.total_tasks),
+        ("Tâches complétées", dashboard_stats.completed_tasks),
+        ("Tâches en retard", dashboard_stats.overdue_tasks),
+        ("Membres actifs", dashboard_stats.total_members),
+    ])
+    yield _distribution_charts(distribution)
+
+    if evm['projects']:
+        yield "<h2>Valeur acquise du portefeuille</h2>"
+        rows = evm_table_data(evm['projects'] + [evm['portfolio']])
+        yield _table(rows[0], rows[1:], "stats", total_last=True)
+
+    if dashboard_stats.total_projects:
+        yield "<h2>Liste des projets</h2>"
+        yield from _streamed_table(
+            ["Nom", "Statut", "Progression", "Tâches"],
+            (_project_row(proj) for proj in data['projects']), progress
+        )
+
+
+def iter_html_report(project_id: int = None, progress: Callable[[int], None] = None,
+                     chunk_bytes: int = EXPORT_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Produit le rapport HTML d'un projet (ou le rapport global) en blocs UTF-8.
+
+    À consommer dans un read_snapshot() (voir write_html_report).
+
+    Args:
+        project_id: projet du rapport (None: rapport global)
+        progress: appelée avec le nombre de lignes écrites
+        chunk_bytes: taille approximative des blocs produits
+    """
+    if project_id:
+        data = load_project_report_data(project_id)
+        if data is None:
+            raise ValueError(f"Projet introuvable: {project_id}")
+        title = f"Rapport du projet: {data['bundle'].project.name}"
+        sections = _project_sections(data, crud.get_task_distribution(project_id), progress)
+    else:
+        title = "Rapport Global - Gestion de Projets"
+        sections = _global_sections(load_global_report_data(), crud.get_task_distribution(), progress)
+
+    buffer: List[str] = []
+    size = 0
+    for part in _document(title, sections):
+        buffer.append(part)
+        size += len(part)
+        if size >= chunk_bytes:
+            yield "".join(buffer).encode('utf-8')
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode('utf-8')
+
+
+@in_read_snapshot
+def write_html_report(out: BinaryIO, project_id: int = None, progress=None):
+    """
+    Écrit le rapport HTML d'un projet (ou le rapport global) dans un fichier binaire.
+
+    Args:
+        out: fichier binaire ouvert en écriture
+        project_id: projet du rapport (None: rapport global)
+        progress: appelée avec le nombre de lignes écrites
+    """
+    for chunk in iter_html_report(project_id, progress):
+        out.write(chunk)
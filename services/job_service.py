@@ -0,0 +1,344 @@
+"""
+File d'attente des travaux d'export (rapports PDF, CSV, sauvegardes).
+
+Les travaux sont enregistrés dans la table report_jobs et exécutés par
+JOB_WORKERS threads d'arrière-plan (un groupe par processus; la prise d'un
+travail est atomique entre processus). Chaque travail publie son avancement:
+les pages consultent l'état du travail au lieu d'attendre, et l'utilisateur
+peut revenir télécharger le fichier pendant JOB_ARTIFACT_TTL_SECONDS.
+
+Les fichiers produits sont stockés dans le cache d'exports
+(utils/artifact_cache): un export déjà construit sur les mêmes données, par
+n'importe quel utilisateur, est relu au lieu d'être reconstruit.
+
+Un travail identique du même utilisateur (mêmes paramètres, mêmes données:
+jeton de modification des tables lues) en attente, en cours ou disponible
+est réutilisé au lieu d'être relancé.
+"""
+
+import json
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import crud
+from database.models import ReportJob
+from services.report_service import write_pdf_report, PDF_REPORT_TAGS
+from services.batch_report_service import write_project_reports_zip
+from services.html_report_service import write_html_report
+from services.export_service import (
+    iter_all_projects_csv, iter_team_performance_csv, iter_project_tasks_csv,
+    write_export_bundle, BUNDLE_DATASETS, BUNDLE_COMPRESSIONS
+)
+from utils.cache import change_token
+from utils.artifact_cache import artifact_cache, Artifact
+from config import (
+    JOB_WORKERS, JOB_POLL_SECONDS, JOB_ARTIFACT_TTL_SECONDS,
+    JOB_CLEANUP_INTERVAL, JOB_STALE_SECONDS
+)
+
+
+# Intervalle minimal entre deux écritures de l'avancement d'un travail (secondes)
+PROGRESS_WRITE_INTERVAL = 0.5
+
+
+@dataclass(frozen=True)
+class JobKind:
+    """Type de travail: fonction d'écriture du fichier et tables lues."""
+    name: str
+    label: str
+    handler: Callable
+    tags: Tuple[str, ...]
+    mime: str
+    suffix: str
+
+
+JOB_KINDS: Dict[str, JobKind] = {}
+
+
+def job_handler(name: str, label: str, tags: Tuple[str, ...], mime: str, suffix: str):
+    """
+    Enregistre un type de travail.
+
+    La fonction décorée reçoit (fichier binaire ouvert en écriture, paramètres,
+    progress(fraction, message)) et écrit le fichier produit.
+    """
+    def decorator(func):
+        JOB_KINDS[name] = JobKind(name, label, func, tuple(tags), mime, suffix)
+        return func
+
+    return decorator
+
+
+@job_handler('pdf_report', "Rapport PDF", PDF_REPORT_TAGS, 'application/pdf', '.pdf')
+def _run_pdf_report(out: BinaryIO, params: Dict[str, Any], progress):
+    progress(0.1, "Génération du PDF")
+    write_pdf_report(out, params.get('project_id'),
+                     lambda rows: progress(None, f"{rows:,} lignes mises en page"))
+
+
+@job_handler('html_report', "Rapport HTML", PDF_REPORT_TAGS, 'text/html', '.html')
+def _run_html_report(out: BinaryIO, params: Dict[str, Any], progress):
+    write_html_report(out, params.get('project_id'),
+                      lambda rows: progress(None, f"{rows:,} lignes écrites"))
+
+
+@job_handler('project_reports_zip', "Rapports PDF des projets (ZIP)", PDF_REPORT_TAGS,
+             'application/zip', '.zip')
+def _run_project_reports_zip(out: BinaryIO, params: Dict[str, Any], progress):
+    progress(0.0, "Chargement des projets")
+    write_project_reports_zip(
+        out, params.get('project_ids'),
+        progress=lambda done, total: progress(done / total, f"{done}/{total} rapports")
+    )
+
+
+def _write_chunks(out: BinaryIO, chunks, progress):
+    written = 0
+    for chunk in chunks:
+        out.write(chunk)
+        written += len(chunk)
+        progress(None, f"{written / 1024:,.0f} Ko écrits")
+
+
+@job_handler('projects_csv', "Projets (CSV)", ('projects', 'tasks', 'members'), 'text/csv', '.csv')
+def _run_projects_csv(out: BinaryIO, params: Dict[str, Any], progress):
+    _write_chunks(out, iter_all_projects_csv(), progress)
+
+
+@job_handler('team_performance_csv', "Performance équipe (CSV)", ('tasks', 'users'), 'text/csv', '.csv')
+def _run_team_performance_csv(out: BinaryIO, params: Dict[str, Any], progress):
+    _write_chunks(out, iter_team_performance_csv(), progress)
+
+
+@job_handler('project_tasks_csv', "Tâches du projet (CSV)", ('tasks', 'users', 'projects'), 'text/csv', '.csv')
+def _run_project_tasks_csv(out: BinaryIO, params: Dict[str, Any], progress):
+    _write_chunks(out, iter_project_tasks_csv(params['project_id']), progress)
+
+
+@job_handler('export_bundle', "Sauvegarde complète",
+             ('projects', 'tasks', 'milestones', 'members', 'users', 'comments', 'activity'),
+             'application/zip', '.zip')
+def _run_export_bundle(out: BinaryIO, params: Dict[str, Any], progress):
+    done = []
+
+    def on_dataset(name, entry):
+        done.append(name)
+        progress(len(done) / len(BUNDLE_DATASETS), f"{name}: {entry['rows']:,} lignes")
+
+    write_export_bundle(out, params.get('format', 'csv'), params.get('compression', 'zip'),
+                        on_dataset=on_dataset)
+
+
+def _artifact_suffix(kind: JobKind, params: Dict[str, Any]) -> str:
+    if kind.name == 'export_bundle':
+        return BUNDLE_COMPRESSIONS[params.get('compression', 'zip')]
+    return kind.suffix
+
+
+def _get_or_build(kind: JobKind, params: Dict[str, Any], progress) -> Artifact:
+    """Fichier de l'export depuis le cache, ou construit puis mis en cache."""
+    return artifact_cache.get_or_build(
+        kind.name, params, kind.tags,
+        lambda out: kind.handler(out, params, progress),
+        _artifact_suffix(kind, params)
+    )
+
+
+class JobRunner:
+    """Threads d'exécution des travaux en attente, et nettoyage des fichiers expirés."""
+
+    def __init__(self, workers: int = JOB_WORKERS, poll: float = JOB_POLL_SECONDS):
+        self.workers = workers
+        self.poll = poll
+        self.last_error: Optional[str] = None
+        self._threads: List[threading.Thread] = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._cleaned_at = 0.0
+
+    def start(self):
+        """Démarre les threads manquants."""
+        with self._lock:
+            self._stop.clear()
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._run, name=f"report-jobs-{len(self._threads)}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self):
+        """Arrête les threads après leur travail en cours."""
+        self._stop.set()
+        self._wake.set()
+
+    def wake(self):
+        """Signale qu'un travail vient d'être ajouté."""
+        self._wake.set()
+
+    def run_pending(self) -> int:
+        """Exécute les travaux en attente dans le thread appelant (scripts, tests)."""
+        count = 0
+        while True:
+            job = crud.claim_report_job()
+            if job is None:
+                return count
+            self.execute(job)
+            count += 1
+
+    def execute(self, job: ReportJob):
+        """Exécute un travail pris dans la file et enregistre son résultat."""
+        kind = JOB_KINDS.get(job.kind)
+        if kind is None:
+            crud.fail_report_job(job.id, f"Type de travail inconnu: {job.kind}")
+            return
+        last_write = [0.0, 0.0]   # instant et fraction de la dernière écriture
+
+        def progress(fraction: Optional[float], message: str = None):
+            now = time.monotonic()
+            if fraction is None:
+                fraction = last_write[1]
+            if now - last_write[0] >= PROGRESS_WRITE_INTERVAL:
+                crud.update_report_job_progress(job.id, min(fraction, 0.99), message)
+                last_write[0] = now
+            last_write[1] = fraction
+
+        try:
+            artifact = _get_or_build(kind, job.params, progress)
+        except Exception as e:
+            self.last_error = traceback.format_exc(limit=3)
+            crud.fail_report_job(job.id, str(e) or type(e).__name__)
+            return
+        expires_at = datetime.now() + timedelta(seconds=JOB_ARTIFACT_TTL_SECONDS)
+        crud.finish_report_job(job.id, artifact.path, artifact.size, expires_at.isoformat())
+
+    def cleanup(self) -> int:
+        """Expire les travaux anciens et abandonne les travaux sans nouvelles."""
+        now = datetime.now()
+        stale_before = now - timedelta(seconds=JOB_STALE_SECONDS)
+        expired = crud.expire_report_jobs(now.isoformat(), stale_before.isoformat())
+        self._cleaned_at = time.monotonic()
+        return expired
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() - self._cleaned_at >= JOB_CLEANUP_INTERVAL:
+                    self.cleanup()
+                job = crud.claim_report_job()
+                if job is not None:
+                    self.execute(job)
+                    continue
+            except Exception:
+                self.last_error = traceback.format_exc(limit=3)
+            self._wake.wait(self.poll)
+            self._wake.clear()
+
+
+runner = JobRunner()
+
+
+def submit_report_job(kind: str, params: Dict[str, Any] = None, user_id: int = None,
+                      file_name: str = None) -> int:
+    """
+    Ajoute un travail d'export à la file et retourne son ID.
+
+    Un travail identique du même utilisateur sur les mêmes données (en
+    attente, en cours ou encore disponible) est réutilisé.
+    """
+    job_kind = JOB_KINDS.get(kind)
+    if job_kind is None:
+        raise ValueError(f"Type de travail inconnu: {kind}")
+    params_json = json.dumps(params or {}, sort_keys=True)
+    token = change_token(*job_kind.tags)
+    data_version = repr(token) if token is not None else None
+    runner.start()
+    if data_version is not None:
+        existing = _check_artifact(
+            crud.find_reusable_report_job(kind, params_json, data_version, user_id)
+        )
+        if existing is not None and existing.status != 'EXPIRED':
+            return existing.id
+    mime = job_kind.mime
+    if kind == 'export_bundle' and (params or {}).get('compression') == 'gzip':
+        mime = 'application/gzip'
+    job_id = crud.create_report_job(kind, params_json, data_version, file_name, mime, user_id)
+    runner.wake()
+    return job_id
+
+
+def _check_artifact(job: Optional[ReportJob]) -> Optional[ReportJob]:
+    """
+    Expire un travail terminé dont le fichier a été évincé du cache
+    d'exports: il est alors proposé à nouveau à la préparation.
+    """
+    if job is not None and job.status == 'DONE' and \
+            not (job.artifact_path and os.path.exists(job.artifact_path)):
+        crud.expire_report_job(job.id)
+        job.status = 'EXPIRED'
+        job.artifact_path = None
+    return job
+
+
+def get_report_job(job_id: int) -> Optional[ReportJob]:
+    """Récupère l'état d'un travail d'export."""
+    return _check_artifact(crud.get_report_job(job_id))
+
+
+def get_user_report_jobs(user_id: int, limit: int = 10) -> List[ReportJob]:
+    """Derniers travaux d'export d'un utilisateur."""
+    return [_check_artifact(job) for job in crud.get_user_report_jobs(user_id, limit)]
+
+
+def is_job_outdated(job: ReportJob) -> bool:
+    """Indique si les données ont changé depuis la demande du travail."""
+    job_kind = JOB_KINDS.get(job.kind)
+    if job_kind is None or job.data_version is None:
+        return False
+    token = change_token(*job_kind.tags)
+    return token is not None and repr(token) != job.data_version
+
+
+def read_job_artifact(job_id: int) -> Optional[bytes]:
+    """Contenu du fichier produit par un travail terminé (None s'il n'est plus disponible)."""
+    job = crud.get_report_job(job_id)
+    if job is None or job.status != 'DONE' or not job.artifact_path:
+        return None
+    data = artifact_cache.read_bytes(job.artifact_path)
+    if data is None:
+        crud.expire_report_job(job.id)
+    return data
+
+
+def build_artifact(kind: str, params: Dict[str, Any] = None) -> bytes:
+    """
+    Construit un export dans le thread appelant (exports légers), ou le relit
+    depuis le cache si les données n'ont pas changé.
+    """
+    job_kind = JOB_KINDS.get(kind)
+    if job_kind is None:
+        raise ValueError(f"Type de travail inconnu: {kind}")
+    params = params or {}
+    # Le fichier peut être évincé par un autre processus entre sa construction
+    # et sa lecture: il est alors reconstruit une fois
+    for _ in range(2):
+        artifact = _get_or_build(job_kind, params, lambda fraction, message=None: None)
+        data = artifact_cache.read_bytes(artifact.path)
+        if data is not None:
+            return data
+    raise FileNotFoundError(f"Export indisponible: {artifact.path}")
+
+
+def get_job_label(job: ReportJob) -> str:
+    """Libellé affiché d'un travail."""
+    job_kind = JOB_KINDS.get(job.kind)
+    return job_kind.label if job_kind else job.kind
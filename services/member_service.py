@@ -9,7 +9,10 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database import crud
-from database.models import User, ProjectMember
+from database.user_directory import directory
+from database.identity_map import per_request
+from utils.cache import cached
+from database.models import User, ProjectMember, MemberHome, Task
 from config import ROLE_ADMIN, ROLE_PROJECT_MANAGER, ROLE_MEMBER
 
 
@@ -38,11 +41,13 @@ def create_new_member(username: str, email: str, password: str,
     )
 
 
+@cached('users')
 def get_member_details(user_id: int) -> Optional[User]:
     """Récupère les détails d'un membre."""
     return crud.get_user_by_id(user_id)
 
 
+@cached('users')
 def get_all_members_list(include_admins: bool = False) -> List[User]:
     """Récupère tous les membres."""
     if include_admins:
@@ -50,6 +55,11 @@ def get_all_members_list(include_admins: bool = False) -> List[User]:
     return crud.get_members()
 
 
+def get_user_label(user_id: int) -> str:
+    """Nom affiché d'un utilisateur (format_func des sélecteurs de membres)."""
+    return directory.label(user_id)
+
+
 def update_member_info(user_id: int, **kwargs) -> bool:
     """Met à jour les informations d'un membre."""
     if 'username' in kwargs and len(kwargs['username'].strip()) < 3:
@@ -85,28 +95,35 @@ def remove_member_from_project(project_id: int, user_id: int) -> bool:
     return crud.remove_project_member(project_id, user_id)
 
 
+@cached('members', 'users')
 def get_project_members_list(project_id: int) -> List[ProjectMember]:
     """Récupère les membres d'un projet."""
     return crud.get_project_members(project_id)
 
 
+@cached('members')
 def is_member_in_project(project_id: int, user_id: int) -> bool:
     """Vérifie si un membre fait partie d'un projet."""
     return crud.is_project_member(project_id, user_id)
 
 
+@cached('tasks', 'projects', 'members')
 def get_member_workload(user_id: int) -> Dict[str, Any]:
     """Calcule la charge de travail d'un membre."""
     tasks = crud.get_user_tasks(user_id)
     projects = crud.get_user_projects(user_id)
-    
+    return _compute_workload(tasks, len(projects))
+
+
+def _compute_workload(tasks: List[Task], project_count: int) -> Dict[str, Any]:
+    """Charge de travail à partir des tâches assignées."""
     workload = {
         'total_tasks': len(tasks),
         'in_progress': 0,
         'todo': 0,
         'completed': 0,
         'overdue': 0,
-        'total_projects': len(projects),
+        'total_projects': project_count,
         'tasks_by_priority': {
             'LOW': 0,
             'MEDIUM': 0,
@@ -132,19 +149,43 @@ def get_member_workload(user_id: int) -> Dict[str, Any]:
     return workload
 
 
+@per_request('users', 'projects', 'tasks', 'members')
+@cached('users', 'projects', 'tasks', 'members')
+def member_home(user_id: int, recent_limit: int = 5) -> MemberHome:
+    """
+    Données des pages membre (performance, charge, tâches, projets), lues en
+    une transaction et partagées par toutes les pages pendant l'exécution.
+    """
+    data = crud.load_member_data(user_id)
+    tasks = data['tasks']
+    completed = sorted((t for t in tasks if t.status == 'COMPLETED'),
+                       key=lambda t: t.completed_at or '', reverse=True)
+    return MemberHome(
+        user_id=user_id,
+        performance=data['performance'],
+        workload=_compute_workload(tasks, len(data['projects'])),
+        tasks=tasks,
+        projects=data['projects'],
+        project_stats=data['project_stats'],
+        recent_completions=completed[:recent_limit]
+    )
+
+
+@cached('members', 'users')
 def get_members_not_in_project(project_id: int) -> List[User]:
     """Récupère les membres qui ne font pas partie d'un projet."""
     all_members = crud.get_members()
-    project_member_ids = [m.user_id for m in crud.get_project_members(project_id)]
+    project_member_ids = {m.user_id for m in crud.get_project_members(project_id)}
     
     return [m for m in all_members if m.id not in project_member_ids]
 
 
+@cached('members', 'users')
 def get_members_for_task_assignment(project_id: int) -> List[User]:
     """Récupère les membres disponibles pour l'assignation de tâches d'un projet."""
     # Retourne les membres du projet + les admins
     project_members = crud.get_project_members(project_id)
-    member_ids = [m.user_id for m in project_members]
+    member_ids = {m.user_id for m in project_members}
     
     # Ajouter les admins qui peuvent aussi être assignés
     all_users = crud.get_all_users()
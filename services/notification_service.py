@@ -0,0 +1,375 @@
+"""
+Envoi des notifications par email, hors des requêtes.
+
+Les notifications sont ajoutées à la boîte d'envoi (table
+notification_outbox, voir database/notifications) par les écritures
+elles-mêmes; les pages n'envoient jamais rien. Un thread d'arrière-plan
+(un par processus, la prise d'un lot est atomique entre processus):
+
+- regroupe les notifications d'un même destinataire en un seul message
+  (celles survenues pendant NOTIFY_COALESCE_SECONDS partent ensemble);
+- envoie les messages par lots de NOTIFY_BATCH_SIZE destinataires sur une
+  seule connexion SMTP, réutilisée pour tous les lots d'un passage;
+- replanifie un envoi en échec temporaire (serveur injoignable, code 4xx)
+  avec un délai croissant, et abandonne après NOTIFY_MAX_ATTEMPTS
+  tentatives ou sur un refus définitif (code 5xx);
+- ajoute périodiquement les tâches en retard à la boîte d'envoi.
+
+Sans SMTP_HOST, le thread n'est pas démarré et les notifications restent
+en attente. Pour essayer l'envoi avec un serveur local qui affiche les
+messages reçus:
+
+    python -m aiosmtpd -n -l localhost:8025
+    SMTP_HOST=localhost SMTP_PORT=8025 python -m services.notification_service --once
+"""
+
+import argparse
+import smtplib
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from email.header import Header
+from email.mime.text import MIMEText
+from email.utils import format_datetime, make_msgid
+from typing import Callable, Dict, List, Optional
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import crud
+from database.models import Notification, User
+from database.notifications import EVENT_ASSIGNED, EVENT_STATUS, EVENT_COMMENT, EVENT_OVERDUE
+from config import (
+    SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, SMTP_STARTTLS, SMTP_TIMEOUT,
+    NOTIFY_SENDER, NOTIFY_BATCH_SIZE, NOTIFY_POLL_SECONDS, NOTIFY_MAX_ATTEMPTS,
+    NOTIFY_RETRY_BASE_SECONDS, NOTIFY_RETRY_MAX_SECONDS, NOTIFY_LEASE_SECONDS,
+    NOTIFY_OVERDUE_INTERVAL, NOTIFY_RETENTION_DAYS, TASK_STATUS, TASK_PRIORITY, APP_TITLE
+)
+
+
+# Rubriques d'un message, dans l'ordre d'affichage
+EVENT_SECTIONS = {
+    EVENT_ASSIGNED: "Tâches qui vous sont assignées",
+    EVENT_STATUS: "Changements de statut",
+    EVENT_COMMENT: "Nouveaux commentaires",
+    EVENT_OVERDUE: "Tâches en retard"
+}
+
+# Objet d'un message qui ne contient qu'une notification
+EVENT_SUBJECTS = {
+    EVENT_ASSIGNED: "Nouvelle tâche assignée",
+    EVENT_STATUS: "Changement de statut",
+    EVENT_COMMENT: "Nouveau commentaire",
+    EVENT_OVERDUE: "Tâche en retard"
+}
+
+
+class DeliveryError(Exception):
+    """
+    Échec de l'envoi d'un message.
+
+    temporary: une nouvelle tentative plus tard peut réussir;
+    unreachable: le serveur n'est pas utilisable (inutile d'envoyer les messages suivants).
+    """
+
+    def __init__(self, message: str, temporary: bool = True, unreachable: bool = False):
+        super().__init__(message)
+        self.temporary = temporary
+        self.unreachable = unreachable
+
+
+class SmtpSession:
+    """Connexion SMTP ouverte à la première utilisation et réutilisée pour les messages suivants."""
+
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT, user: str = SMTP_USER,
+                 password: str = SMTP_PASSWORD, starttls: bool = SMTP_STARTTLS,
+                 timeout: float = SMTP_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.connections = 0
+        self._smtp: Optional[smtplib.SMTP] = None
+
+    def _connect(self) -> smtplib.SMTP:
+        try:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                smtp.starttls()
+            if self.user:
+                smtp.login(self.user, self.password or '')
+        except (smtplib.SMTPException, OSError) as e:
+            raise DeliveryError(f"Serveur SMTP injoignable: {e or type(e).__name__}", unreachable=True)
+        self.connections += 1
+        return smtp
+
+    def send(self, message: MIMEText, recipient: str):
+        """
+        Envoie un message à un destinataire.
+
+        Une connexion fermée par le serveur entre deux messages est rouverte
+        une fois. Lève DeliveryError en cas d'échec.
+        """
+        for attempt in range(2):
+            if self._smtp is None:
+                self._smtp = self._connect()
+            try:
+                self._smtp.send_message(message, NOTIFY_SENDER, [recipient])
+                return
+            except smtplib.SMTPServerDisconnected as e:
+                self._smtp = None
+                if attempt:
+                    raise DeliveryError(f"Connexion SMTP perdue: {e}", unreachable=True)
+            except smtplib.SMTPRecipientsRefused as e:
+                code, reason = next(iter(e.recipients.values()))
+                raise DeliveryError(f"Destinataire refusé ({code}): {_decode(reason)}", code < 500)
+            except smtplib.SMTPResponseException as e:
+                # 421: le serveur ferme la connexion
+                if e.smtp_code == 421:
+                    self.close()
+                raise DeliveryError(f"Refus du serveur ({e.smtp_code}): {_decode(e.smtp_error)}",
+                                    e.smtp_code < 500, e.smtp_code == 421)
+            except (smtplib.SMTPException, OSError) as e:
+                self.close()
+                raise DeliveryError(f"Serveur SMTP injoignable: {e or type(e).__name__}",
+                                    unreachable=True)
+
+    def close(self):
+        """Ferme la connexion (QUIT), sans erreur si elle est déjà perdue."""
+        smtp, self._smtp = self._smtp, None
+        if smtp is not None:
+            try:
+                smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                smtp.close()
+
+
+def _decode(reason) -> str:
+    return reason.decode('utf-8', 'replace') if isinstance(reason, bytes) else str(reason)
+
+
+def retry_delay(attempts: int) -> float:
+    """Délai avant la tentative suivante (secondes), doublé à chaque échec."""
+    return min(NOTIFY_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), NOTIFY_RETRY_MAX_SECONDS)
+
+
+def _describe(notification: Notification, users: Dict[int, User]) -> str:
+    """Ligne d'un message décrivant une notification."""
+    data = notification.payload
+    task = f"« {data.get('title')} »" + (f" ({data['project']})" if data.get('project') else "")
+    actor = users.get(data.get('actor'))
+    by = f" par {actor.full_name or actor.username}" if actor else ""
+    if notification.event == EVENT_ASSIGNED:
+        details = [TASK_PRIORITY.get(data.get('priority'), data.get('priority'))]
+        if data.get('deadline'):
+            details.append(f"échéance {data['deadline']}")
+        return f"{task}{by}, {', '.join(filter(None, details))}"
+    if notification.event == EVENT_STATUS:
+        old, new = data.get('old_status'), data.get('new_status')
+        return f"{task}: {TASK_STATUS.get(old, old)} -> {TASK_STATUS.get(new, new)}{by}"
+    if notification.event == EVENT_COMMENT:
+        return f"{task}{by}:\n    {data.get('comment', '')}"
+    if notification.event == EVENT_OVERDUE:
+        return f"{task}, échéance dépassée le {data.get('deadline')}"
+    return task
+
+
+def render_notification_message(user: User, notifications: List[Notification],
+                                users: Dict[int, User]) -> MIMEText:
+    """
+    Message regroupant les notifications d'un destinataire, par rubrique.
+
+    Args:
+        users: utilisateurs connus (auteurs des modifications)
+    """
+    lines = [f"Bonjour {user.full_name or user.username},", ""]
+    for event, title in EVENT_SECTIONS.items():
+        entries = [n for n in notifications if n.event == event]
+        if entries:
+            lines.append(f"{title} ({len(entries)})")
+            lines += [f"- {_describe(n, users)}" for n in entries]
+            lines.append("")
+    lines.append(f"-- \n{APP_TITLE}")
+
+    if len(notifications) == 1:
+        subject = f"{EVENT_SUBJECTS.get(notifications[0].event, 'Notification')}: " \
+                  f"{notifications[0].payload.get('title')}"
+    else:
+        subject = f"{len(notifications)} notifications de vos projets"
+    message = MIMEText("\n".join(lines) + "\n", 'plain', 'utf-8')
+    message['Subject'] = Header(subject, 'utf-8')
+    message['From'] = NOTIFY_SENDER
+    message['To'] = user.email
+    message['Date'] = format_datetime(datetime.now().astimezone())
+    message['Message-ID'] = make_msgid(domain=NOTIFY_SENDER.rpartition('@')[2])
+    return message
+
+
+class NotificationWorker:
+    """Thread d'envoi des notifications en attente, et recherche des tâches en retard."""
+
+    def __init__(self, poll: float = NOTIFY_POLL_SECONDS, batch_size: int = NOTIFY_BATCH_SIZE,
+                 session_factory: Callable[[], SmtpSession] = SmtpSession):
+        self.poll = poll
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self.last_error: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._swept_at = 0.0
+
+    def start(self):
+        """Démarre le thread s'il n'est pas déjà lancé (rien sans serveur SMTP configuré)."""
+        if not SMTP_HOST:
+            return
+        with self._lock:
+            self._stop.clear()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="notifications", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Arrête le thread après son passage en cours."""
+        self._stop.set()
+        self._wake.set()
+
+    def wake(self):
+        """Demande un passage immédiat."""
+        self._wake.set()
+
+    def sweep(self) -> Dict[str, int]:
+        """Ajoute les tâches en retard et supprime les notifications envoyées anciennes."""
+        self._swept_at = time.monotonic()
+        purge_before = datetime.now() - timedelta(days=NOTIFY_RETENTION_DAYS)
+        return {
+            'overdue': crud.enqueue_overdue_notifications(),
+            'purged': crud.purge_notifications(purge_before.isoformat())
+        }
+
+    def deliver_pending(self) -> Dict[str, int]:
+        """
+        Envoie toutes les notifications dues, lot par lot, sur une même
+        connexion SMTP (dans le thread appelant: scripts, tests).
+
+        Le passage s'arrête si le serveur est injoignable: le lot en cours
+        est replanifié et les lots suivants restent en attente.
+
+        Returns:
+            Dict avec 'messages', 'notifications' (envoyées), 'retried',
+            'failed' (notifications) et 'connections'
+        """
+        result = {'messages': 0, 'notifications': 0, 'retried': 0, 'failed': 0}
+        session = self.session_factory()
+        try:
+            while not self._stop.is_set():
+                batch = crud.claim_notifications(self.batch_size, NOTIFY_LEASE_SECONDS)
+                if not batch:
+                    break
+                if not self.send_batch(session, batch, result):
+                    break
+        finally:
+            session.close()
+        result['connections'] = session.connections
+        return result
+
+    def send_batch(self, session: SmtpSession, batch: Dict[int, List[Notification]],
+                   result: Dict[str, int]) -> bool:
+        """
+        Envoie un message par destinataire d'un lot et enregistre le résultat.
+
+        Returns:
+            False si le serveur est injoignable (le reste du lot est replanifié)
+        """
+        actor_ids = {n.payload.get('actor') for items in batch.values() for n in items}
+        users = crud.get_users_by_ids([uid for uid in set(batch) | actor_ids if uid])
+
+        pending = sorted(batch.items())
+        for position, (user_id, notifications) in enumerate(pending):
+            ids = [n.id for n in notifications]
+            user = users.get(user_id)
+            if user is None or not user.is_active or not user.email:
+                crud.fail_notifications(ids, "Destinataire inactif ou sans adresse email")
+                result['failed'] += len(ids)
+                continue
+            try:
+                session.send(render_notification_message(user, notifications, users), user.email)
+            except DeliveryError as e:
+                if e.unreachable:
+                    # Le reste du lot (ce destinataire compris) est replanifié
+                    self._reschedule(pending[position:], str(e), result)
+                    return False
+                if e.temporary:
+                    self._reschedule([(user_id, notifications)], str(e), result)
+                else:
+                    crud.fail_notifications(ids, str(e))
+                    result['failed'] += len(ids)
+                continue
+            crud.finish_notifications(ids)
+            result['messages'] += 1
+            result['notifications'] += len(ids)
+        return True
+
+    def _reschedule(self, items, error: str, result: Dict[str, int]):
+        """Replanifie l'envoi de notifications après un échec temporaire."""
+        now = datetime.now()
+        for _, notifications in items:
+            attempts = max(n.attempts for n in notifications) + 1
+            ids = [n.id for n in notifications]
+            if attempts >= NOTIFY_MAX_ATTEMPTS:
+                crud.fail_notifications(ids, error)
+                result['failed'] += len(ids)
+            else:
+                retry_at = now + timedelta(seconds=retry_delay(attempts))
+                crud.fail_notifications(ids, error, retry_at.isoformat())
+                result['retried'] += len(ids)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() - self._swept_at >= NOTIFY_OVERDUE_INTERVAL:
+                    self.sweep()
+                self.deliver_pending()
+            except Exception:
+                self.last_error = traceback.format_exc(limit=3)
+            self._wake.wait(self.poll)
+            self._wake.clear()
+
+
+worker = NotificationWorker()
+
+
+def main(argv: List[str] = None):
+    """Point d'entrée en ligne de commande: envoi hors du serveur web."""
+    parser = argparse.ArgumentParser(description="Envoi des notifications par email en attente.")
+    parser.add_argument('--once', action='store_true',
+                        help="un seul passage (tâches en retard puis envoi), sans boucle")
+    args = parser.parse_args(argv)
+    if not SMTP_HOST:
+        parser.error("SMTP_HOST n'est pas défini")
+
+    if not args.once:
+        print(f"Envoi des notifications via {SMTP_HOST}:{SMTP_PORT} (Ctrl+C pour arrêter)")
+        worker.start()
+        try:
+            while True:
+                time.sleep(60)
+        except KeyboardInterrupt:
+            worker.stop()
+        return
+
+    swept = worker.sweep()
+    result = worker.deliver_pending()
+    counts = crud.get_notification_counts()
+    print(f"{swept['overdue']} tâches en retard ajoutées, {result['notifications']} notifications "
+          f"envoyées en {result['messages']} messages ({result['connections']} connexion(s)), "
+          f"{result['retried']} replanifiées, {result['failed']} en échec; "
+          f"{counts.get('PENDING', 0)} en attente dans la boîte d'envoi")
+
+
+if __name__ == "__main__":
+    main()
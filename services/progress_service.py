@@ -7,27 +7,35 @@ from typing import List, Dict, Any
 import sys
 import os
 
+import numpy as np
+
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database import crud
+from utils.cache import cached
 from database.models import DashboardStats, MemberPerformance
+from config import WEEKLY_CAPACITY_HOURS
 
 
+@cached('projects', 'tasks', 'users', shared=True)
 def get_dashboard_statistics() -> DashboardStats:
     """Récupère les statistiques globales pour le tableau de bord."""
     return crud.get_dashboard_stats()
 
 
+@cached('tasks', 'users', shared=True)
 def get_all_members_performance() -> List[MemberPerformance]:
     """Récupère les performances de tous les membres."""
     return crud.get_member_performance()
 
 
+@cached('tasks', 'users')
 def get_member_individual_performance(user_id: int) -> MemberPerformance:
     """Récupère la performance d'un membre spécifique."""
     performances = crud.get_member_performance(user_id)
     return performances[0] if performances else None
 
 
+@cached('projects', 'tasks', 'members', shared=True)
 def calculate_project_health(project_id: int) -> Dict[str, Any]:
     """
     Calcule la "santé" d'un projet basé sur plusieurs métriques.
@@ -37,7 +45,19 @@ def calculate_project_health(project_id: int) -> Dict[str, Any]:
     """
     stats = crud.get_project_stats(project_id)
     project = crud.get_project_by_id(project_id)
-    
+    blocked_tasks = len(crud.get_all_tasks(project_id=project_id, status='BLOCKED')) if project else 0
+    return compute_project_health(project, stats, blocked_tasks)
+
+
+def compute_project_health(project, stats: Dict[str, Any], blocked_tasks: int) -> Dict[str, Any]:
+    """
+    Santé d'un projet à partir de données déjà chargées (voir calculate_project_health).
+
+    Args:
+        project: le projet (Project), ou None
+        stats: statistiques au format de crud.get_project_stats
+        blocked_tasks: nombre de tâches bloquées
+    """
     if not project or stats['total_tasks'] == 0:
         return {
             'score': 0,
@@ -58,11 +78,10 @@ def calculate_project_health(project_id: int) -> Dict[str, Any]:
     
     # Pénalité pour tâches bloquées (max -20 points)
     # On considère les tâches TODO qui auraient dû commencer
-    blocked_tasks = crud.get_all_tasks(project_id=project_id, status='BLOCKED')
     if blocked_tasks:
-        blocked_penalty = min((len(blocked_tasks) / stats['total_tasks']) * 100, 20)
+        blocked_penalty = min((blocked_tasks / stats['total_tasks']) * 100, 20)
         score -= blocked_penalty
-        issues.append(f"{len(blocked_tasks)} tâche(s) bloquée(s)")
+        issues.append(f"{blocked_tasks} tâche(s) bloquée(s)")
     
     # Bonus pour progression (+10 points si > 50%)
     if stats['progress'] >= 50:
@@ -118,6 +137,7 @@ def _calculate_expected_progress(start_date, end_date) -> float:
     return min(max(expected, 0), 100)
 
 
+@cached('tasks', shared=True)
 def get_team_velocity() -> Dict[str, Any]:
     """
     Calcule la vélocité de l'équipe (tâches complétées par semaine).
@@ -155,12 +175,12 @@ def get_team_velocity() -> Dict[str, Any]:
         'weekly_data': list(reversed(weeks_data)),
         'average_velocity': round(avg_velocity, 1),
         'total_completed': total,
-        'trend': _calculate_trend(weeks_data)
+        'trend': calculate_trend(weeks_data)
     }
 
 
-def _calculate_trend(weeks_data: List[Dict]) -> str:
-    """Calcule la tendance basée sur les données hebdomadaires."""
+def calculate_trend(weeks_data: List[Dict]) -> str:
+    """Calcule la tendance (up/down/stable) à partir des semaines, de la plus récente à la plus ancienne."""
     if len(weeks_data) < 2:
         return 'stable'
     
@@ -174,6 +194,7 @@ def _calculate_trend(weeks_data: List[Dict]) -> str:
     return 'stable'
 
 
+@cached('tasks', shared=True)
 def get_progress_over_time(project_id: int = None, days: int = 30) -> List[Dict[str, Any]]:
     """
     Récupère l'évolution de la progression dans le temps.
@@ -216,6 +237,7 @@ def get_progress_over_time(project_id: int = None, days: int = 30) -> List[Dict[
     return data
 
 
+@cached('tasks', 'users', shared=True)
 def get_workload_distribution() -> Dict[str, Any]:
     """
     Analyse la distribution de la charge de travail.
@@ -257,6 +279,82 @@ def get_workload_distribution() -> Dict[str, Any]:
     }
 
 
+@cached('tasks', 'users', shared=True)
+def get_capacity_heatmap(weeks: int = 12, 
+                         weekly_capacity: float = WEEKLY_CAPACITY_HOURS) -> Dict[str, Any]:
+    """
+    Calcule la charge planifiée de chaque membre par semaine.
+    
+    La charge correspond aux heures estimées des tâches non terminées,
+    rangées dans la semaine de leur deadline (les tâches en retard comptent
+    pour la semaine en cours). Une seule requête groupée est exécutée puis
+    pivotée en matrice membres × semaines.
+    
+    Returns:
+        Dict avec 'members', 'weeks', 'hours' et 'load' (% de la capacité)
+    """
+    week_start = date.today() - timedelta(days=date.today().weekday())
+    window_end = week_start + timedelta(weeks=weeks)
+    
+    conn = crud.get_connection()
+    conn.row_factory = None
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT u.id, COALESCE(u.full_name, u.username),
+               CAST((julianday(MAX(t.deadline, ?)) - julianday(?)) / 7 AS INTEGER),
+               SUM(COALESCE(t.estimated_hours, 0))
+        FROM users u
+        LEFT JOIN tasks t ON t.assigned_to = u.id
+            AND t.status != 'COMPLETED'
+            AND t.deadline IS NOT NULL
+            AND t.deadline < ?
+        WHERE u.role = 'member' AND u.is_active = 1
+        GROUP BY u.id, 3
+        ORDER BY u.full_name, u.username
+    ''', (week_start.isoformat(), week_start.isoformat(), window_end.isoformat()))
+    rows = cursor.fetchall()
+    conn.close()
+    
+    week_labels = [(week_start + timedelta(weeks=i)).isoformat() for i in range(weeks)]
+    if not rows:
+        return {
+            'members': [],
+            'member_ids': [],
+            'weeks': week_labels,
+            'hours': np.zeros((0, weeks)),
+            'load': np.zeros((0, weeks)),
+            'capacity': weekly_capacity,
+            'overloaded_cells': 0
+        }
+    
+    user_ids, names, week_idx, hours = zip(*rows)
+    user_ids = np.array(user_ids, dtype=np.int64)
+    member_ids, first, member_idx = np.unique(user_ids, return_index=True, return_inverse=True)
+    # Conserver l'ordre alphabétique de la requête
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    
+    week_idx = np.array([-1 if w is None else w for w in week_idx], dtype=np.int64)
+    hours = np.array(hours, dtype=float)
+    valid = (week_idx >= 0) & (week_idx < weeks)
+    
+    matrix = np.zeros((len(member_ids), weeks))
+    np.add.at(matrix, (rank[member_idx[valid]], week_idx[valid]), hours[valid])
+    load = matrix / weekly_capacity * 100 if weekly_capacity > 0 else np.zeros_like(matrix)
+    
+    return {
+        'members': [names[i] for i in first[order]],
+        'member_ids': member_ids[order].tolist(),
+        'weeks': week_labels,
+        'hours': matrix,
+        'load': np.round(load, 1),
+        'capacity': weekly_capacity,
+        'overloaded_cells': int((load > 100).sum())
+    }
+
+
+@cached('projects', 'tasks', 'members')
 def get_deadline_forecast(project_id: int) -> Dict[str, Any]:
     """
     Prévoit si le projet sera terminé à temps.
@@ -9,6 +9,7 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database import crud
+from utils.cache import cached
 from database.models import Project, Milestone
 
 
@@ -32,16 +33,19 @@ def create_new_project(name: str, description: str = None,
     )
 
 
+@cached('projects', 'tasks', 'members')
 def get_project_details(project_id: int) -> Optional[Project]:
     """Récupère les détails complets d'un projet."""
     return crud.get_project_by_id(project_id)
 
 
+@cached('projects', 'tasks', 'members')
 def get_all_projects_with_stats() -> List[Project]:
     """Récupère tous les projets avec leurs statistiques."""
     return crud.get_all_projects()
 
 
+@cached('projects', 'tasks', 'members')
 def get_user_projects_list(user_id: int) -> List[Project]:
     """Récupère les projets d'un utilisateur."""
     return crud.get_user_projects(user_id)
@@ -87,6 +91,7 @@ def create_project_milestone(project_id: int, name: str,
     )
 
 
+@cached('milestones', 'tasks')
 def get_project_milestones_list(project_id: int) -> List[Milestone]:
     """Récupère les milestones d'un projet."""
     return crud.get_project_milestones(project_id)
@@ -102,21 +107,19 @@ def delete_milestone(milestone_id: int) -> bool:
     return crud.delete_milestone(milestone_id)
 
 
+@cached('projects', 'milestones', 'tasks', 'members', 'users')
 def get_project_summary(project_id: int) -> Dict[str, Any]:
     """Génère un résumé complet d'un projet."""
-    project = crud.get_project_by_id(project_id)
-    if not project:
+    bundle = crud.load_project_bundle(project_id, parts=('stats', 'milestones', 'members'))
+    if not bundle:
         return None
     
-    stats = crud.get_project_stats(project_id)
-    milestones = crud.get_project_milestones(project_id)
-    members = crud.get_project_members(project_id)
-    
+    project, stats = bundle.project, bundle.stats
     return {
         'project': project,
         'stats': stats,
-        'milestones': milestones,
-        'members': members,
+        'milestones': bundle.milestones,
+        'members': bundle.members,
         'is_on_track': stats['overdue_tasks'] == 0,
         'days_remaining': _calculate_days_remaining(project.end_date) if project.end_date else None
     }
@@ -129,6 +132,7 @@ def _calculate_days_remaining(end_date) -> int:
     return (end_date - date.today()).days
 
 
+@cached('projects', 'tasks', 'members')
 def get_projects_by_status() -> Dict[str, List[Project]]:
     """Récupère les projets groupés par statut."""
     all_projects = crud.get_all_projects()
@@ -3,29 +3,47 @@ Service de génération de rapports et exports.
 """
 
 import io
-import csv
 from datetime import date, datetime
-from typing import List, Dict, Any
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database import crud
-from database.models import Project, Task, MemberPerformance
+from database.db_setup import in_read_snapshot
+from utils.cache import cached
+from config import PDF_TABLE_CHUNK_ROWS
+from database.models import Project, ProjectBundle, Task, MemberPerformance
+from services.evm_service import get_portfolio_evm, get_project_evm, format_evm_index
+from services.export_service import (
+    iter_project_tasks_csv, iter_all_projects_csv, iter_team_performance_csv
+)
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import cm
+    from reportlab.platypus import (
+        SimpleDocTemplate, Paragraph, Spacer, Table, LongTable, TableStyle
+    )
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
 
 
+@cached('projects', 'milestones', 'tasks', 'members', 'users', 'time', shared=True)
+@in_read_snapshot
 def generate_project_report(project_id: int) -> Dict[str, Any]:
     """
     Génère un rapport complet pour un projet.
     """
-    project = crud.get_project_by_id(project_id)
-    if not project:
+    bundle = crud.load_project_bundle(project_id)
+    if not bundle:
         return None
     
-    stats = crud.get_project_stats(project_id)
-    milestones = crud.get_project_milestones(project_id)
-    members = crud.get_project_members(project_id)
-    tasks = crud.get_all_tasks(project_id=project_id)
+    tasks = bundle.tasks
     
     # Calculer les statistiques par priorité
     priority_stats = {'LOW': 0, 'MEDIUM': 0, 'HIGH': 0, 'CRITICAL': 0}
@@ -47,17 +65,20 @@ def generate_project_report(project_id: int) -> Dict[str, Any]:
                 member_stats[task.assigned_to]['completed'] += 1
     
     return {
-        'project': project,
-        'stats': stats,
-        'milestones': milestones,
-        'members': members,
+        'project': bundle.project,
+        'stats': bundle.stats,
+        'milestones': bundle.milestones,
+        'members': bundle.members,
         'tasks': tasks,
         'priority_stats': priority_stats,
         'member_stats': list(member_stats.values()),
+        'logged_hours': bundle.logged_hours,
         'generated_at': datetime.now().isoformat()
     }
 
 
+@cached('projects', 'tasks', 'users', 'activity', shared=True)
+@in_read_snapshot
 def generate_team_performance_report() -> Dict[str, Any]:
     """
     Génère un rapport de performance de l'équipe.
@@ -88,290 +109,395 @@ def export_project_to_csv(project_id: int) -> str:
     """
     Exporte les tâches d'un projet au format CSV.
     
+    Pour les gros projets, préférer iter_project_tasks_csv (en flux).
+    
     Returns:
         Contenu CSV en string
     """
-    tasks = crud.get_all_tasks(project_id=project_id)
-    project = crud.get_project_by_id(project_id)
-    
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # En-têtes
-    writer.writerow([
-        'ID', 'Titre', 'Description', 'Statut', 'Priorité', 
-        'Progression (%)', 'Assigné à', 'Deadline', 'Créé le'
-    ])
-    
-    # Données
-    for task in tasks:
-        writer.writerow([
-            task.id,
-            task.title,
-            task.description or '',
-            task.status,
-            task.priority,
-            task.progress,
-            task.assigned_to_name or 'Non assigné',
-            task.deadline or '',
-            task.created_at or ''
-        ])
-    
-    return output.getvalue()
+    return b''.join(iter_project_tasks_csv(project_id)).decode('utf-8')
 
 
 def export_all_projects_to_csv() -> str:
     """
     Exporte tous les projets au format CSV.
     """
-    projects = crud.get_all_projects()
-    
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # En-têtes
-    writer.writerow([
-        'ID', 'Nom', 'Description', 'Statut', 'Date début', 
-        'Date fin', 'Progression (%)', 'Nombre tâches', 'Nombre membres'
-    ])
-    
-    # Données
-    for project in projects:
-        writer.writerow([
-            project.id,
-            project.name,
-            project.description or '',
-            project.status,
-            project.start_date or '',
-            project.end_date or '',
-            project.progress,
-            project.task_count,
-            project.member_count
-        ])
-    
-    return output.getvalue()
+    return b''.join(iter_all_projects_csv()).decode('utf-8')
 
 
 def export_team_performance_to_csv() -> str:
     """
     Exporte les performances de l'équipe au format CSV.
     """
-    performances = crud.get_member_performance()
-    
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # En-têtes
-    writer.writerow([
-        'ID', 'Nom', 'Total tâches', 'Complétées', 'En cours',
-        'En retard', 'Taux de complétion (%)', 'Progression moyenne (%)'
+    return b''.join(iter_team_performance_csv()).decode('utf-8')
+
+
+# Tables lues par les rapports PDF (version des exports en cache)
+PDF_REPORT_TAGS = ('projects', 'milestones', 'tasks', 'members', 'users', 'time')
+
+# Styles des rapports PDF, créés une fois au chargement du module
+if REPORTLAB_AVAILABLE:
+    _PDF_STYLES = getSampleStyleSheet()
+    _PDF_TITLE_STYLE = ParagraphStyle(
+        'Title',
+        parent=_PDF_STYLES['Heading1'],
+        fontSize=18,
+        spaceAfter=30
+    )
+    # Tableau clé / valeur (informations générales, vue d'ensemble)
+    _PDF_INFO_TABLE_STYLE = TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('PADDING', (0, 0), (-1, -1), 8),
+    ])
+    _PDF_HEADER_COMMANDS = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ]
+    _PDF_MEMBER_TABLE_STYLE = TableStyle(_PDF_HEADER_COMMANDS + [
+        ('PADDING', (0, 0), (-1, -1), 6),
+    ])
+    _PDF_STATS_TABLE_STYLE = TableStyle(_PDF_HEADER_COMMANDS + [
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('PADDING', (0, 0), (-1, -1), 8),
+    ])
+    _PDF_EVM_TABLE_STYLE = TableStyle(_PDF_HEADER_COMMANDS + [
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+        ('PADDING', (0, 0), (-1, -1), 4),
     ])
+    # Dernière ligne: total du portefeuille
+    _PDF_PORTFOLIO_EVM_TABLE_STYLE = TableStyle([
+        ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
+    ], parent=_PDF_EVM_TABLE_STYLE)
+    _PDF_TASK_TABLE_STYLE = TableStyle(_PDF_HEADER_COMMANDS + [
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('PADDING', (0, 0), (-1, -1), 4),
+        ('ALIGN', (3, 1), (5, -1), 'CENTER'),  # Centrer Prio, Avancement, Deadline
+    ])
+    _PDF_PROJECT_TABLE_STYLE = TableStyle(_PDF_HEADER_COMMANDS + [
+        ('PADDING', (0, 0), (-1, -1), 5),
+    ])
+    # Largeurs de colonnes pour A4 (21cm - marges)
+    _PDF_TASK_COL_WIDTHS = [5*cm, 3.5*cm, 2.5*cm, 1.5*cm, 2*cm, 2.5*cm]
+    _PDF_PROJECT_COL_WIDTHS = [7*cm, 3*cm, 2.5*cm, 2*cm]
+
+
+class _ChunkedRows:
+    """
+    Lignes d'un long tableau PDF, mises en page par blocs de PDF_TABLE_CHUNK_ROWS.
+
+    Placé dans la liste des éléments du document à la place du tableau: le
+    document le remplace au moment de la mise en page par le bloc suivant
+    (LongTable dont l'en-tête est répété à chaque page), suivi de lui-même
+    tant qu'il reste des lignes. Seules les lignes du bloc courant sont en
+    mémoire, et chaque bloc n'est découpé que sur quelques pages.
+    """
     
-    # Données
-    for perf in performances:
-        writer.writerow([
-            perf.user_id,
-            perf.user_name,
-            perf.total_tasks,
-            perf.completed_tasks,
-            perf.in_progress_tasks,
-            perf.overdue_tasks,
-            perf.completion_rate,
-            perf.average_progress
-        ])
+    def __init__(self, header: List[str], rows: Iterable[List[Any]], style, col_widths=None,
+                 chunk_rows: int = PDF_TABLE_CHUNK_ROWS, on_chunk=None):
+        self.header = header
+        self.rows = iter(rows)
+        self.style = style
+        self.col_widths = col_widths
+        self.chunk_rows = chunk_rows
+        self.on_chunk = on_chunk
+        self.count = 0
     
-    return output.getvalue()
+    def next_table(self):
+        """Tableau du bloc suivant (None quand toutes les lignes ont été mises en page)."""
+        chunk = list(islice(self.rows, self.chunk_rows))
+        if not chunk:
+            return None
+        self.count += len(chunk)
+        if self.on_chunk:
+            self.on_chunk(self.count)
+        table = LongTable([self.header] + chunk, colWidths=self.col_widths, repeatRows=1)
+        table.setStyle(self.style)
+        return table
+
+
+if REPORTLAB_AVAILABLE:
+    class _StreamingDocTemplate(SimpleDocTemplate):
+        """Document A4 qui développe les _ChunkedRows au fil de la mise en page."""
+        
+        def filterFlowables(self, flowables):
+            first = flowables[0]
+            if isinstance(first, _ChunkedRows):
+                table = first.next_table()
+                flowables[0:1] = [table, first] if table is not None else [None]
+
+
+def _task_pdf_row(task: Task) -> List[Any]:
+    title = task.title[:25] + "..." if len(task.title) > 25 else task.title
+    return [
+        title,
+        task.assigned_to_name if task.assigned_to_name else "Non assigné",
+        task.status,
+        task.priority,
+        f"{task.progress}%",
+        str(task.deadline) if task.deadline else "-"
+    ]
+
+
+def _project_pdf_row(proj: Project) -> List[Any]:
+    return [
+        proj.name[:25] + "..." if len(proj.name) > 25 else proj.name,
+        proj.status,
+        f"{proj.progress}%",
+        proj.task_count
+    ]
 
 
 def generate_pdf_report(project_id: int = None) -> bytes:
     """
-    Génère un rapport PDF.
+    Génère un rapport PDF en mémoire.
+    
+    Les pages passent par la file des travaux (job_service), dont les
+    fichiers sont mis en cache sur disque. Pour les gros projets, préférer
+    write_pdf_report vers un fichier.
     
     Note: Nécessite reportlab. Si non disponible, retourne None.
     """
-    try:
-        from reportlab.lib.pagesizes import A4
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import cm
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-        from reportlab.lib import colors
-    except ImportError:
+    if not REPORTLAB_AVAILABLE:
         return None
+    buffer = io.BytesIO()
+    write_pdf_report(buffer, project_id)
+    return buffer.getvalue()
+
+
+@in_read_snapshot
+def write_pdf_report(out: BinaryIO, project_id: int = None, progress=None):
+    """
+    Écrit le rapport PDF d'un projet (ou le rapport global) dans un fichier binaire.
     
+    Les tâches (et les projets du rapport global) sont lues en flux et mises
+    en page par blocs: la mémoire utilisée ne dépend pas du nombre de
+    tâches, hormis le PDF produit lui-même.
+    
+    Args:
+        out: fichier binaire ouvert en écriture
+        project_id: projet du rapport (None: rapport global)
+        progress: appelée avec le nombre de lignes mises en page
+    """
+    if not REPORTLAB_AVAILABLE:
+        raise RuntimeError("ReportLab non installé pour la génération PDF")
+    
+    if project_id:
+        data = load_project_report_data(project_id)
+        if data is None:
+            raise ValueError(f"Projet introuvable: {project_id}")
+        elements = _project_pdf_elements(data['bundle'], data['evm'], data['tasks'], progress)
+    else:
+        elements = _global_pdf_elements(load_global_report_data(), progress)
+    _build_pdf(out, elements)
+
+
+def load_project_report_data(project_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Données du rapport d'un projet, communes aux rapports PDF et HTML.
+    
+    À appeler dans un read_snapshot(): les tâches ('tasks') sont un
+    itérateur lu en flux au moment de la mise en page.
+    
+    Returns:
+        Dict avec 'bundle' (ProjectBundle: stats, membres, temps saisi),
+        'evm' (format get_project_evm) et 'tasks', ou None si le projet n'existe pas
+    """
+    bundle = crud.load_project_bundle(project_id, parts=('stats', 'members', 'logged_hours'))
+    if bundle is None:
+        return None
+    return {
+        'bundle': bundle,
+        'evm': get_project_evm(project_id),
+        'tasks': crud.iter_tasks(project_id=project_id)
+    }
+
+
+def load_global_report_data() -> Dict[str, Any]:
+    """
+    Données du rapport global, communes aux rapports PDF et HTML.
+    
+    À appeler dans un read_snapshot(): les projets ('projects') sont lus en flux.
+    """
+    return {
+        'dashboard_stats': crud.get_dashboard_stats(),
+        'evm': get_portfolio_evm(),
+        'projects': crud.iter_projects()
+    }
+
+
+def render_project_pdf(bundle: ProjectBundle, evm: Optional[Dict[str, Any]]) -> bytes:
+    """
+    Rapport PDF d'un projet à partir de données déjà chargées.
+    
+    N'accède pas à la base: utilisée par les processus de calcul des
+    rapports par lots (services/batch_report_service), avec un ProjectBundle
+    chargé par crud.load_project_bundles.
+    """
+    if not REPORTLAB_AVAILABLE:
+        raise RuntimeError("ReportLab non installé pour la génération PDF")
     buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    styles = getSampleStyleSheet()
+    _build_pdf(buffer, _project_pdf_elements(bundle, evm, bundle.tasks))
+    return buffer.getvalue()
+
+
+def _build_pdf(out: BinaryIO, elements: list):
+    elements.append(Spacer(1, 30))
+    elements.append(Paragraph(
+        "Rapport généré automatiquement par le système de Gestion de Projets",
+        _PDF_STYLES['Italic']
+    ))
+    doc = _StreamingDocTemplate(out, pagesize=A4, pageCompression=1)
+    doc.build(elements)
+
+
+def _project_pdf_elements(bundle: ProjectBundle, evm: Optional[Dict[str, Any]],
+                          tasks: Iterable[Task], progress=None) -> list:
+    """Éléments du rapport d'un projet (tâches mises en page par blocs au fil de tasks)."""
+    styles = _PDF_STYLES
     elements = []
+    project, stats = bundle.project, bundle.stats
     
-    # Titre
-    title_style = ParagraphStyle(
-        'Title',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=30
-    )
+    elements.append(Paragraph(f"Rapport du projet: {project.name}", _PDF_TITLE_STYLE))
+    elements.append(Spacer(1, 12))
     
-    if project_id:
-        project = crud.get_project_by_id(project_id)
-        stats = crud.get_project_stats(project_id)
-        tasks = crud.get_all_tasks(project_id=project_id)
-        
-        elements.append(Paragraph(f"Rapport du projet: {project.name}", title_style))
-        elements.append(Spacer(1, 12))
-        
-        # Informations générales
-        elements.append(Paragraph("Informations générales", styles['Heading2']))
-        info_data = [
-            ["Statut", project.status],
-            ["Date de début", str(project.start_date) if project.start_date else "Non définie"],
-            ["Date de fin", str(project.end_date) if project.end_date else "Non définie"],
-            ["Budget", f"{project.budget:,.2f} €" if project.budget else "Non défini"],
-            ["Progression", f"{project.progress}%"]
-        ]
-        info_table = Table(info_data, colWidths=[5*cm, 10*cm])
-        info_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('PADDING', (0, 0), (-1, -1), 8),
-        ]))
-        elements.append(info_table)
-        elements.append(Spacer(1, 20))
+    # Informations générales
+    elements.append(Paragraph("Informations générales", styles['Heading2']))
+    info_data = [
+        ["Statut", project.status],
+        ["Date de début", str(project.start_date) if project.start_date else "Non définie"],
+        ["Date de fin", str(project.end_date) if project.end_date else "Non définie"],
+        ["Budget", f"{project.budget:,.2f} €" if project.budget else "Non défini"],
+        ["Progression", f"{project.progress}%"],
+        ["Temps saisi", f"{bundle.logged_hours:,.1f} h"]
+    ]
+    info_table = Table(info_data, colWidths=[5*cm, 10*cm])
+    info_table.setStyle(_PDF_INFO_TABLE_STYLE)
+    elements.append(info_table)
+    elements.append(Spacer(1, 20))
+
+    # Équipe du projet
+    members = bundle.members
+    if members:
+        elements.append(Paragraph("Équipe du projet", styles['Heading2']))
+        member_data = [["Nom", "Rôle", "Email", "Date d'assignation"]]
 
-        # Équipe du projet
-        members = crud.get_project_members(project_id)
-        if members:
-            elements.append(Paragraph("Équipe du projet", styles['Heading2']))
-            member_data = [["Nom", "Rôle", "Email", "Date d'assignation"]]
-
-            for member in members:
-                assigned_date = "-"
-                if member.assigned_at:
-                    if isinstance(member.assigned_at, str):
-                        assigned_date = member.assigned_at[:10]
-                    else:
-                        assigned_date = member.assigned_at.strftime('%Y-%m-%d')
-                
-                member_data.append([
-                    member.user_name,
-                    member.role_in_project,
-                    member.user_email,
-                    assigned_date
-                ])
+        for member in members:
+            assigned_date = "-"
+            if member.assigned_at:
+                if isinstance(member.assigned_at, str):
+                    assigned_date = member.assigned_at[:10]
+                else:
+                    assigned_date = member.assigned_at.strftime('%Y-%m-%d')
             
-            member_table = Table(member_data, colWidths=[5*cm, 4*cm, 6*cm, 4*cm])
-            member_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('PADDING', (0, 0), (-1, -1), 6),
-            ]))
-            elements.append(member_table)
-            elements.append(Spacer(1, 20))
+            member_data.append([
+                member.user_name,
+                member.role_in_project,
+                member.user_email,
+                assigned_date
+            ])
         
-        # Statistiques des tâches
-        elements.append(Paragraph("Statistiques des tâches", styles['Heading2']))
-        stats_data = [
-            ["Total", "Complétées", "En cours", "À faire", "En retard"],
-            [stats['total_tasks'], stats['completed_tasks'], stats['in_progress_tasks'],
-             stats['todo_tasks'], stats['overdue_tasks']]
-        ]
-        stats_table = Table(stats_data)
-        stats_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('PADDING', (0, 0), (-1, -1), 8),
-        ]))
-        elements.append(stats_table)
+        member_table = Table(member_data, colWidths=[5*cm, 4*cm, 6*cm, 4*cm])
+        member_table.setStyle(_PDF_MEMBER_TABLE_STYLE)
+        elements.append(member_table)
         elements.append(Spacer(1, 20))
-        
-        # Liste des tâches détaillée
-        if tasks:
-            elements.append(Paragraph("Détail des tâches", styles['Heading2']))
-            task_data = [["Titre", "Assigné à", "Statut", "Prio.", "Avancement", "Deadline"]]
-            for task in tasks:
-                assignee = task.assigned_to_name if task.assigned_to_name else "Non assigné"
-                deadline = str(task.deadline) if task.deadline else "-"
-                title = task.title[:25] + "..." if len(task.title) > 25 else task.title
-                
-                task_data.append([
-                    title,
-                    assignee,
-                    task.status,
-                    task.priority,
-                    f"{task.progress}%",
-                    deadline
-                ])
-            
-            # Ajustement des largeurs de colonnes pour A4 (21cm - marges)
-            task_table = Table(task_data, colWidths=[5*cm, 3.5*cm, 2.5*cm, 1.5*cm, 2*cm, 2.5*cm])
-            task_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('FONTSIZE', (0, 0), (-1, -1), 8),
-                ('PADDING', (0, 0), (-1, -1), 4),
-                ('ALIGN', (3, 1), (5, -1), 'CENTER'), # Centrer Prio, Avancement, Deadline
-            ]))
-            elements.append(task_table)
     
-    else:
-        # Rapport global
-        dashboard_stats = crud.get_dashboard_stats()
-        projects = crud.get_all_projects()
-        
-        elements.append(Paragraph("Rapport Global - Gestion de Projets", title_style))
-        elements.append(Paragraph(f"Généré le: {datetime.now().strftime('%d/%m/%Y %H:%M')}", styles['Normal']))
-        elements.append(Spacer(1, 20))
-        
-        # Statistiques globales
-        elements.append(Paragraph("Vue d'ensemble", styles['Heading2']))
-        overview_data = [
-            ["Projets actifs", dashboard_stats.active_projects],
-            ["Total projets", dashboard_stats.total_projects],
-            ["Tâches totales", dashboard_stats.total_tasks],
-            ["Tâches complétées", dashboard_stats.completed_tasks],
-            ["Tâches en retard", dashboard_stats.overdue_tasks],
-            ["Membres actifs", dashboard_stats.total_members],
-        ]
-        overview_table = Table(overview_data, colWidths=[8*cm, 5*cm])
-        overview_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('PADDING', (0, 0), (-1, -1), 8),
-        ]))
-        elements.append(overview_table)
+    # Statistiques des tâches
+    elements.append(Paragraph("Statistiques des tâches", styles['Heading2']))
+    stats_data = [
+        ["Total", "Complétées", "En cours", "À faire", "En retard"],
+        [stats['total_tasks'], stats['completed_tasks'], stats['in_progress_tasks'],
+         stats['todo_tasks'], stats['overdue_tasks']]
+    ]
+    stats_table = Table(stats_data)
+    stats_table.setStyle(_PDF_STATS_TABLE_STYLE)
+    elements.append(stats_table)
+    elements.append(Spacer(1, 20))
+    
+    # Valeur acquise (EVM)
+    if evm:
+        elements.append(Paragraph("Valeur acquise", styles['Heading2']))
+        evm_table = Table(evm_table_data([evm['project']] + evm['milestones']))
+        evm_table.setStyle(_PDF_EVM_TABLE_STYLE)
+        elements.append(evm_table)
         elements.append(Spacer(1, 20))
-        
-        # Liste des projets
-        if projects:
-            elements.append(Paragraph("Liste des projets", styles['Heading2']))
-            proj_data = [["Nom", "Statut", "Progression", "Tâches"]]
-            for proj in projects:
-                proj_data.append([
-                    proj.name[:25] + "..." if len(proj.name) > 25 else proj.name,
-                    proj.status,
-                    f"{proj.progress}%",
-                    proj.task_count
-                ])
-            proj_table = Table(proj_data, colWidths=[7*cm, 3*cm, 2.5*cm, 2*cm])
-            proj_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('PADDING', (0, 0), (-1, -1), 5),
-            ]))
-            elements.append(proj_table)
     
-    elements.append(Spacer(1, 30))
-    elements.append(Paragraph(
-        "Rapport généré automatiquement par le système de Gestion de Projets",
-        styles['Italic']
-    ))
+    # Liste des tâches détaillée
+    if stats['total_tasks']:
+        elements.append(Paragraph("Détail des tâches", styles['Heading2']))
+        elements.append(_ChunkedRows(
+            ["Titre", "Assigné à", "Statut", "Prio.", "Avancement", "Deadline"],
+            (_task_pdf_row(task) for task in tasks),
+            _PDF_TASK_TABLE_STYLE, _PDF_TASK_COL_WIDTHS, on_chunk=progress
+        ))
+
+    return elements
+
+
+def _global_pdf_elements(data: Dict[str, Any], progress=None) -> list:
+    """Éléments du rapport global (projets mis en page par blocs au fil de data['projects'])."""
+    styles = _PDF_STYLES
+    elements = []
+    dashboard_stats = data['dashboard_stats']
     
-    doc.build(elements)
-    return buffer.getvalue()
+    elements.append(Paragraph("Rapport Global - Gestion de Projets", _PDF_TITLE_STYLE))
+    elements.append(Paragraph(f"Généré le: {datetime.now().strftime('%d/%m/%Y %H:%M')}", styles['Normal']))
+    elements.append(Spacer(1, 20))
+    
+    # Statistiques globales
+    elements.append(Paragraph("Vue d'ensemble", styles['Heading2']))
+    overview_data = [
+        ["Projets actifs", dashboard_stats.active_projects],
+        ["Total projets", dashboard_stats.total_projects],
+        ["Tâches totales", dashboard_stats.total_tasks],
+        ["Tâches complétées", dashboard_stats.completed_tasks],
+        ["Tâches en retard", dashboard_stats.overdue_tasks],
+        ["Membres actifs", dashboard_stats.total_members],
+    ]
+    overview_table = Table(overview_data, colWidths=[8*cm, 5*cm])
+    overview_table.setStyle(_PDF_INFO_TABLE_STYLE)
+    elements.append(overview_table)
+    elements.append(Spacer(1, 20))
+    
+    # Valeur acquise du portefeuille
+    evm = data['evm']
+    if evm['projects']:
+        elements.append(Paragraph("Valeur acquise du portefeuille", styles['Heading2']))
+        evm_table = Table(evm_table_data(evm['projects'] + [evm['portfolio']]))
+        evm_table.setStyle(_PDF_PORTFOLIO_EVM_TABLE_STYLE)
+        elements.append(evm_table)
+        elements.append(Spacer(1, 20))
+    
+    # Liste des projets, lue en flux
+    if dashboard_stats.total_projects:
+        elements.append(Paragraph("Liste des projets", styles['Heading2']))
+        elements.append(_ChunkedRows(
+            ["Nom", "Statut", "Progression", "Tâches"],
+            (_project_pdf_row(proj) for proj in data['projects']),
+            _PDF_PROJECT_TABLE_STYLE, _PDF_PROJECT_COL_WIDTHS, on_chunk=progress
+        ))
+
+    return elements
+
+
+def evm_table_data(values) -> List[List[Any]]:
+    """Construit les lignes (en-tête compris) d'un tableau d'indicateurs EVM (PDF, HTML)."""
+    data = [["Nom", "BAC", "PV", "EV", "AC", "CPI", "SPI", "EAC"]]
+    for ev in values:
+        name = ev.name[:22] + "..." if len(ev.name) > 22 else ev.name
+        eac = f"{ev.estimate_at_completion:,.0f}" if ev.estimate_at_completion is not None else "N/A"
+        data.append([
+            name,
+            f"{ev.budget_at_completion:,.0f}",
+            f"{ev.planned_value:,.0f}",
+            f"{ev.earned_value:,.0f}",
+            f"{ev.actual_cost:,.0f}",
+            format_evm_index(ev.cpi),
+            format_evm_index(ev.spi),
+            eac
+        ])
+    return data
 
 
 def get_activity_timeline(days: int = 7) -> List[Dict[str, Any]]:
@@ -9,13 +9,14 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database import crud
+from utils.cache import cached
 from database.models import Task, TaskComment
 
 
 def create_new_task(project_id: int, title: str, description: str = None,
                     priority: str = "MEDIUM", assigned_to: int = None,
                     deadline: date = None, milestone_id: int = None,
-                    estimated_hours: float = None) -> Optional[int]:
+                    estimated_hours: float = None, user_id: int = None) -> Optional[int]:
     """Crée une nouvelle tâche avec validation."""
     if not title or len(title.strip()) < 3:
         raise ValueError("Le titre de la tâche doit contenir au moins 3 caractères.")
@@ -32,26 +33,31 @@ def create_new_task(project_id: int, title: str, description: str = None,
         assigned_to=assigned_to,
         deadline=deadline,
         milestone_id=milestone_id,
-        estimated_hours=estimated_hours
+        estimated_hours=estimated_hours,
+        user_id=user_id
     )
 
 
+@cached('tasks', 'projects', 'milestones', 'users')
 def get_task_details(task_id: int) -> Optional[Task]:
     """Récupère les détails complets d'une tâche."""
     return crud.get_task_by_id(task_id)
 
 
+@cached('tasks', 'projects', 'milestones', 'users')
 def get_all_tasks_list(project_id: int = None, status: str = None,
                        assigned_to: int = None) -> List[Task]:
     """Récupère les tâches avec filtres."""
     return crud.get_all_tasks(project_id=project_id, status=status, assigned_to=assigned_to)
 
 
+@cached('tasks', 'projects', 'milestones', 'users')
 def get_user_assigned_tasks(user_id: int, status: str = None) -> List[Task]:
     """Récupère les tâches assignées à un utilisateur."""
     return crud.get_user_tasks(user_id, status=status)
 
 
+@cached('tasks', 'projects', 'milestones', 'users')
 def get_overdue_tasks_list() -> List[Task]:
     """Récupère les tâches en retard."""
     return crud.get_overdue_tasks()
@@ -85,12 +91,15 @@ def update_task_status(task_id: int, status: str, user_id: int = None) -> bool:
 
 
 def update_task_progress_value(task_id: int, progress: int, user_id: int = None,
-                               comment: str = None) -> bool:
-    """Met à jour la progression d'une tâche."""
+                               comment: str = None, hours: float = None) -> bool:
+    """Met à jour la progression d'une tâche et enregistre le temps passé."""
     if progress < 0 or progress > 100:
         raise ValueError("La progression doit être entre 0 et 100%.")
+    if hours is not None and (hours < 0 or hours > 24):
+        raise ValueError("Le temps passé doit être compris entre 0 et 24 heures.")
     
-    return crud.update_task_progress(task_id, progress, user_id=user_id, comment=comment)
+    return crud.update_task_progress(task_id, progress, user_id=user_id, comment=comment,
+                                     hours=hours)
 
 
 def assign_task_to_member(task_id: int, member_id: int) -> bool:
@@ -111,11 +120,13 @@ def add_comment_to_task(task_id: int, user_id: int, comment: str) -> Optional[in
     return crud.add_task_comment(task_id, user_id, comment.strip())
 
 
+@cached('comments', 'users')
 def get_task_comments_list(task_id: int) -> List[TaskComment]:
     """Récupère les commentaires d'une tâche."""
     return crud.get_task_comments(task_id)
 
 
+@cached('tasks')
 def get_tasks_summary_by_project(project_id: int) -> Dict[str, Any]:
     """Génère un résumé des tâches d'un projet."""
     tasks = crud.get_all_tasks(project_id=project_id)
@@ -153,6 +164,7 @@ def get_tasks_summary_by_project(project_id: int) -> Dict[str, Any]:
     return summary
 
 
+@cached('tasks', 'projects', 'milestones', 'users')
 def get_tasks_grouped_by_status(project_id: int = None) -> Dict[str, List[Task]]:
     """Récupère les tâches groupées par statut."""
     tasks = crud.get_all_tasks(project_id=project_id)
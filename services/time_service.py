@@ -0,0 +1,149 @@
+"""
+Service de saisie des temps passés.
+
+Les saisies sont ajoutées par lots (une transaction par lot) et les
+cumuls par tâche, utilisateur et projet sont maintenus à chaque ajout:
+les rapports lisent les cumuls plutôt que les saisies brutes.
+"""
+
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import crud
+from utils.cache import cached
+
+
+# Durée maximale d'une saisie (heures)
+MAX_ENTRY_HOURS = 24
+
+
+def _validate_entry(entry: Dict[str, Any]):
+    """Vérifie une saisie de temps."""
+    hours = entry.get('duration_hours')
+    if hours is None or hours <= 0 or hours > MAX_ENTRY_HOURS:
+        raise ValueError(f"La durée doit être comprise entre 0 et {MAX_ENTRY_HOURS} heures.")
+    if not entry.get('task_id'):
+        raise ValueError("La tâche est obligatoire.")
+
+
+def log_time(task_id: int, user_id: int, hours: float, started_at: datetime = None,
+             note: str = None) -> bool:
+    """Enregistre le temps passé par un utilisateur sur une tâche."""
+    entry = {'task_id': task_id, 'user_id': user_id, 'duration_hours': hours,
+             'started_at': started_at, 'note': note}
+    _validate_entry(entry)
+    return crud.add_time_entries([entry]) == 1
+
+
+def log_time_batch(entries: List[Dict[str, Any]]) -> int:
+    """
+    Enregistre un lot de saisies de temps en une seule transaction.
+
+    Returns:
+        Nombre de saisies enregistrées
+    """
+    for entry in entries:
+        _validate_entry(entry)
+    return crud.add_time_entries(entries)
+
+
+class TimeEntryBuffer:
+    """
+    Tampon d'ajout pour les saisies à haut débit (imports, intégrations).
+
+    Les saisies sont accumulées puis écrites en un seul lot dès que
+    max_size saisies sont en attente ou que la plus ancienne a plus de
+    max_age secondes. flush() doit être appelé en fin de traitement.
+    """
+
+    def __init__(self, max_size: int = 500, max_age: float = 5.0):
+        self.max_size = max_size
+        self.max_age = max_age
+        self._pending = []
+        self._oldest = None
+        self._lock = threading.Lock()
+
+    def append(self, task_id: int, user_id: int, hours: float,
+               started_at: datetime = None, note: str = None) -> int:
+        """Ajoute une saisie; retourne le nombre de saisies écrites (0 si aucun flush)."""
+        entry = {'task_id': task_id, 'user_id': user_id, 'duration_hours': hours,
+                 'started_at': started_at or datetime.now(), 'note': note}
+        _validate_entry(entry)
+        with self._lock:
+            self._pending.append(entry)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            due = (len(self._pending) >= self.max_size
+                   or time.monotonic() - self._oldest >= self.max_age)
+        return self.flush() if due else 0
+
+    def flush(self) -> int:
+        """Écrit les saisies en attente; retourne leur nombre."""
+        with self._lock:
+            pending, self._pending, self._oldest = self._pending, [], None
+        return crud.add_time_entries(pending)
+
+    def __len__(self):
+        return len(self._pending)
+
+
+def get_task_time(task_id: int) -> Dict[str, Any]:
+    """
+    Récupère le temps passé sur une tâche.
+
+    Returns:
+        Dict avec 'total_hours' (cumul) et 'entries' (dernières saisies)
+    """
+    rollups = crud.get_time_rollups('task', task_id)
+    return {
+        'total_hours': round(sum(r['hours'] for r in rollups), 2),
+        'entries': crud.get_task_time_entries(task_id)
+    }
+
+
+@cached('time', 'projects', 'users', shared=True)
+def get_time_summary(days: int = 30, project_id: int = None) -> Dict[str, Any]:
+    """
+    Synthèse des temps saisis sur une période, lue depuis les cumuls.
+
+    Returns:
+        Dict avec 'total_hours', 'daily' (heures par jour), 'by_project'
+        et 'by_user' (triés par heures décroissantes).
+    """
+    end = date.today()
+    start = end - timedelta(days=days - 1)
+    project_rollups = crud.get_time_rollups('project', project_id, start.isoformat(), end.isoformat())
+
+    daily = {(start + timedelta(days=i)).isoformat(): 0.0 for i in range(days)}
+    by_project = {}
+    for r in project_rollups:
+        daily[r['day']] = daily.get(r['day'], 0.0) + r['hours']
+        by_project[r['key']] = by_project.get(r['key'], 0.0) + r['hours']
+
+    by_user = {}
+    if project_id is None:
+        for r in crud.get_time_rollups('user', None, start.isoformat(), end.isoformat()):
+            by_user[r['key']] = by_user.get(r['key'], 0.0) + r['hours']
+
+    project_names = {p.id: p.name for p in crud.get_all_projects()} if by_project else {}
+    user_names = {u.id: u.full_name or u.username for u in crud.get_all_users()} if by_user else {}
+
+    return {
+        'total_hours': round(sum(by_project.values()), 2),
+        'daily': [{'date': d, 'hours': round(h, 2)} for d, h in sorted(daily.items())],
+        'by_project': sorted(
+            [{'id': k, 'name': project_names.get(k, f"Projet #{k}"), 'hours': round(h, 2)}
+             for k, h in by_project.items()],
+            key=lambda x: x['hours'], reverse=True
+        ),
+        'by_user': sorted(
+            [{'id': k, 'name': user_names.get(k, f"Utilisateur #{k}"), 'hours': round(h, 2)}
+             for k, h in by_user.items()],
+            key=lambda x: x['hours'], reverse=True
+        )
+    }
@@ -0,0 +1,37 @@
+"""
+Configuration des tests: l'application est pointée vers une base et des
+caches temporaires avant tout import de ses modules.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+TEST_DIR = tempfile.mkdtemp(prefix="gp_tests_")
+os.environ["DATABASE_PATH"] = os.path.join(TEST_DIR, "gestion_projets.db")
+os.environ["SHARED_CACHE_PATH"] = os.path.join(TEST_DIR, "shared_cache.db")
+os.environ["ARTIFACT_CACHE_DIR"] = os.path.join(TEST_DIR, "artifacts")
+os.environ["DIGEST_OUTBOX_DIR"] = os.path.join(TEST_DIR, "digests")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.db_setup import init_database
+from database import crud
+
+init_database()
+
+
+@pytest.fixture
+def users():
+    """IDs des utilisateurs par défaut, par nom d'utilisateur."""
+    return {user.username: user.id for user in crud.get_all_users()}
+
+
+@pytest.fixture
+def project(users):
+    """Projet du chef de projet par défaut, avec deux membres."""
+    project_id = crud.create_project("Projet de test", created_by=users['chef.projet'])
+    crud.add_project_member(project_id, users['jean.dupont'])
+    crud.add_project_member(project_id, users['marie.martin'])
+    return project_id
@@ -0,0 +1,69 @@
+"""Cache des fichiers d'export: réutilisation, déduplication et éviction."""
+
+import os
+
+import pytest
+
+from utils.artifact_cache import ArtifactCache
+from utils.cache import invalidate
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ArtifactCache(str(tmp_path / "artifacts"), max_bytes=1000)
+
+
+def _writer(content: bytes, builds: list):
+    def write(out):
+        builds.append(content)
+        out.write(content)
+    return write
+
+
+def test_same_data_is_built_once(cache):
+    builds = []
+    first = cache.get_or_build('export', {'a': 1}, ('projects',), _writer(b"contenu", builds), '.csv')
+    second = cache.get_or_build('export', {'a': 1}, ('projects',), _writer(b"contenu", builds), '.csv')
+
+    assert second == first
+    assert len(builds) == 1
+    assert cache.read_bytes(first.path) == b"contenu"
+
+
+def test_changed_data_is_rebuilt(cache):
+    builds = []
+    first = cache.get_or_build('export', {}, ('projects',), _writer(b"avant", builds))
+    invalidate('projects')
+    second = cache.get_or_build('export', {}, ('projects',), _writer(b"apres", builds))
+
+    assert len(builds) == 2
+    assert cache.read_bytes(second.path) == b"apres"
+    assert first.path != second.path
+
+
+def test_identical_content_is_stored_once(cache):
+    builds = []
+    first = cache.get_or_build('export', {'format': 'a'}, ('projects',), _writer(b"identique", builds))
+    second = cache.get_or_build('export', {'format': 'b'}, ('projects',), _writer(b"identique", builds))
+
+    assert len(builds) == 2
+    assert first.path == second.path
+    stats = cache.stats()
+    assert (stats['keys'], stats['files'], stats['deduplicated']) == (2, 1, 1)
+
+
+def test_least_recently_read_is_evicted(cache):
+    builds = []
+    artifacts = [
+        cache.get_or_build('export', {'n': n}, ('projects',), _writer(bytes([n]) * 400, builds))
+        for n in range(2)
+    ]
+    # La première clé est relue: la seconde devient la moins récemment lue
+    cache.get_or_build('export', {'n': 0}, ('projects',), _writer(b"", builds))
+    cache.get_or_build('export', {'n': 2}, ('projects',), _writer(b"\x02" * 400, builds))
+
+    assert len(builds) == 3
+    assert cache.stats()['bytes'] <= 1000
+    assert os.path.exists(artifacts[0].path)
+    assert not os.path.exists(artifacts[1].path)
+    assert cache.read_bytes(artifacts[1].path) is None
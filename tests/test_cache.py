@@ -0,0 +1,139 @@
+"""Cache de lecture des services et invalidation par les écritures."""
+
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from database import crud
+from utils.cache import cached, change_token, read_cache, SharedCache
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def counted():
+    """Lecture mise en cache qui compte ses calculs réels."""
+    calls = []
+
+    @cached('tasks')
+    def count_tasks(project_id):
+        calls.append(project_id)
+        return len(crud.get_all_tasks(project_id=project_id))
+
+    return count_tasks, calls
+
+
+def test_successful_write_invalidates(project, users, counted):
+    count_tasks, calls = counted
+    token = change_token('tasks')
+    assert count_tasks(project) == 0
+    assert count_tasks(project) == 0
+    assert len(calls) == 1
+
+    crud.create_task(project, "Nouvelle tâche", user_id=users['chef.projet'])
+
+    assert change_token('tasks') != token
+    assert count_tasks(project) == 1
+    assert len(calls) == 2
+
+
+def test_failed_write_keeps_cache(project, counted):
+    count_tasks, calls = counted
+    count_tasks(project)
+    token = change_token('tasks')
+
+    assert crud.update_task(999999, status='COMPLETED') is False
+    assert crud.update_task(999999) is False
+
+    assert change_token('tasks') == token
+    count_tasks(project)
+    assert len(calls) == 1
+
+
+def test_write_error_keeps_cache(project, users, counted, monkeypatch):
+    count_tasks, calls = counted
+    task_id = crud.create_task(project, "Tâche à modifier", user_id=users['chef.projet'])
+    count_tasks(project)
+    token = change_token('tasks')
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("écriture interrompue")
+
+    monkeypatch.setattr(crud.journal, 'record_changes', broken)
+    with pytest.raises(RuntimeError):
+        crud.update_task(task_id, users['chef.projet'], status='IN_PROGRESS')
+    assert change_token('tasks') == token
+    count_tasks(project)
+    assert len(calls) == 1
+
+
+def test_write_and_version_commit_together(project, users, monkeypatch):
+    task_id = crud.create_task(project, "Tâche disputée", user_id=users['chef.projet'])
+    token = change_token('tasks')
+
+    def locked(cursor, *tags):
+        raise sqlite3.OperationalError("database is locked")
+
+    # Une version qui ne peut pas être incrémentée annule l'écriture
+    monkeypatch.setattr(crud, 'bump_versions', locked)
+    with pytest.raises(sqlite3.OperationalError):
+        crud.update_task(task_id, users['chef.projet'], status='IN_PROGRESS')
+    assert crud.get_task_by_id(task_id).status == 'TODO'
+    assert change_token('tasks') == token
+
+    monkeypatch.undo()
+    assert crud.update_task(task_id, users['chef.projet'], status='IN_PROGRESS')
+    assert change_token('tasks') != token
+
+
+def test_log_activity_bumps_activity(users):
+    token = change_token('activity')
+    crud.log_activity(users['admin'], "TEST", "task", 1, "Entrée de test")
+    assert change_token('activity') != token
+
+
+def test_write_from_another_process_makes_entry_stale(project, counted):
+    count_tasks, calls = counted
+    assert count_tasks(project) == 0
+
+    subprocess.run([sys.executable, '-c', (
+        "from database import crud\n"
+        f"crud.create_task({project}, 'Tâche écrite par un autre processus')\n"
+    )], cwd=ROOT_DIR, check=True)
+
+    assert count_tasks(project) == 1
+    assert len(calls) == 2
+
+
+def test_shared_entry_reused_by_another_process(project, users):
+    calls = []
+
+    @cached('tasks', shared=True)
+    def shared_count(project_id):
+        calls.append(project_id)
+        return len(crud.get_all_tasks(project_id=project_id))
+
+    assert shared_count(project) == 0
+    # Un autre processus n'a que le cache partagé
+    read_cache.clear()
+    assert shared_count(project) == 0
+    assert len(calls) == 1
+
+    crud.create_task(project, "Nouvelle tâche", user_id=users['chef.projet'])
+    read_cache.clear()
+    assert shared_count(project) == 1
+    assert len(calls) == 2
+
+
+def test_shared_cache_size_is_bounded(tmp_path):
+    cache = SharedCache(str(tmp_path / "shared.db"), max_bytes=4000)
+    for i in range(10):
+        cache.set(f"clé {i}", b"x" * 800, (1,), ttl=60)
+
+    assert cache.stats()['bytes'] <= 4000
+    assert cache.get("clé 0", (1,)) == (False, None)
+    assert cache.get("clé 9", (1,)) == (True, b"x" * 800)
+    assert cache.get("clé 9", (2,)) == (False, None)
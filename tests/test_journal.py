@@ -0,0 +1,86 @@
+"""Journal des modifications et reconstitution des tâches à une date donnée."""
+
+from datetime import datetime
+
+import pytest
+
+from database import crud, journal
+
+
+def _states(project_id, as_of):
+    return {task.id: (task.status, task.progress)
+            for task in journal.get_project_tasks_as_of(project_id, as_of)}
+
+
+def test_as_of_replays_updates(project, users):
+    task_id = crud.create_task(project, "Rédiger le cahier des charges",
+                               assigned_to=users['jean.dupont'], user_id=users['chef.projet'])
+    created = datetime.now()
+    crud.update_task(task_id, users['jean.dupont'], status='IN_PROGRESS', progress=40)
+    started = datetime.now()
+    crud.update_task(task_id, users['jean.dupont'], status='COMPLETED')
+
+    assert _states(project, created) == {task_id: ('TODO', 0)}
+    assert _states(project, started) == {task_id: ('IN_PROGRESS', 40)}
+    assert _states(project, datetime.now()) == {task_id: ('COMPLETED', 100)}
+
+
+def test_as_of_before_creation_and_after_deletion(project, users):
+    before = datetime.now()
+    task_id = crud.create_task(project, "Préparer la démonstration", user_id=users['chef.projet'])
+    created = datetime.now()
+    crud.delete_task(task_id)
+
+    assert _states(project, before) == {}
+    assert _states(project, created) == {task_id: ('TODO', 0)}
+    assert _states(project, datetime.now()) == {}
+
+
+def test_as_of_after_checkpoints(project, users, monkeypatch):
+    monkeypatch.setattr(journal, 'JOURNAL_CHECKPOINT_INTERVAL', 3)
+    task_id = crud.create_task(project, "Migrer les données", user_id=users['chef.projet'])
+    history = []
+    for progress in (10, 20, 30, 40, 50, 60, 70):
+        crud.update_task(task_id, users['chef.projet'], progress=progress)
+        history.append((datetime.now(), progress))
+
+    conn = crud.get_connection()
+    checkpoints = conn.execute(
+        "SELECT COUNT(*) FROM journal_checkpoints WHERE project_id = ?", (project,)
+    ).fetchone()[0]
+    conn.close()
+    assert checkpoints > 1
+    for as_of, progress in history:
+        assert _states(project, as_of) == {task_id: ('TODO', progress)}
+
+
+def test_time_entries_are_journaled(project, users):
+    task_id = crud.create_task(project, "Saisir les heures", assigned_to=users['jean.dupont'],
+                               user_id=users['chef.projet'])
+    before = datetime.now()
+    crud.add_time_entries([{'task_id': task_id, 'user_id': users['jean.dupont'],
+                            'duration_hours': 2.5}])
+
+    def actual_hours(as_of):
+        return {task.id: task.actual_hours
+                for task in journal.get_project_tasks_as_of(project, as_of)}[task_id]
+
+    assert not actual_hours(before)
+    assert actual_hours(datetime.now()) == 2.5
+
+
+def test_failed_write_releases_the_lock(project, users, monkeypatch):
+    task_id = crud.create_task(project, "Tâche à modifier", user_id=users['chef.projet'])
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("notification impossible")
+
+    monkeypatch.setattr(crud.notifications, 'record_task_events', broken)
+    # L'exception (et donc la pile de l'écriture) reste référencée, comme dans Streamlit
+    with pytest.raises(RuntimeError) as failure:
+        crud.update_task(task_id, users['chef.projet'], status='IN_PROGRESS')
+
+    assert failure.value is not None
+    assert crud.update_project(project, description="Écriture suivante")
+    assert crud.get_task_by_id(task_id).status == 'TODO'
+    assert _states(project, datetime.now()) == {task_id: ('TODO', 0)}
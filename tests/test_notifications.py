@@ -0,0 +1,123 @@
+"""Boîte d'envoi des notifications: destinataires, prise atomique, reprise et purge."""
+
+import threading
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from database import crud
+from database.db_setup import get_connection
+
+
+@pytest.fixture(autouse=True)
+def empty_outbox():
+    conn = get_connection()
+    conn.execute("DELETE FROM notification_outbox")
+    conn.commit()
+    conn.close()
+
+
+def _outbox(*where, params=()):
+    conn = get_connection()
+    rows = conn.execute(
+        "SELECT user_id, event, task_id FROM notification_outbox"
+        + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY id", params
+    ).fetchall()
+    conn.close()
+    return [tuple(row) for row in rows]
+
+
+def _add_due(user_ids, per_user=3):
+    past = (datetime.now() - timedelta(minutes=1)).isoformat()
+    conn = get_connection()
+    conn.executemany('''
+        INSERT INTO notification_outbox (user_id, event, payload, next_attempt_at, created_at)
+        VALUES (?, 'TASK_COMMENT', '{}', ?, ?)
+    ''', [(user_id, past, past) for user_id in user_ids for _ in range(per_user)])
+    conn.commit()
+    conn.close()
+
+
+def test_author_is_not_notified(project, users):
+    manager, member = users['chef.projet'], users['jean.dupont']
+    assigned = crud.create_task(project, "Tâche assignée", assigned_to=member, user_id=manager)
+    own = crud.create_task(project, "Tâche personnelle", assigned_to=manager, user_id=manager)
+    assert _outbox() == [(member, 'TASK_ASSIGNED', assigned)]
+
+    crud.update_task(assigned, member, status='IN_PROGRESS')
+    assert _outbox("event = 'TASK_STATUS'") == [(manager, 'TASK_STATUS', assigned)]
+    assert not _outbox("task_id = ?", params=(own,))
+
+
+def test_claim_is_atomic_between_connections():
+    _add_due(range(1000, 1020))
+    claims, errors = [], []
+
+    def worker():
+        try:
+            while True:
+                claimed = crud.claim_notifications(3, lease_seconds=300)
+                if not claimed:
+                    return
+                claims.append(claimed)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    recipients = [user_id for claimed in claims for user_id in claimed]
+    assert sorted(recipients) == list(range(1000, 1020))
+    # Toutes les notifications d'un destinataire sont prises ensemble
+    assert all(len(notifications) == 3 for claimed in claims for notifications in claimed.values())
+    ids = [n.id for claimed in claims for notifications in claimed.values() for n in notifications]
+    assert len(ids) == len(set(ids)) == 60
+
+
+def test_expired_lease_is_recovered():
+    _add_due([1000])
+    first = crud.claim_notifications(10, lease_seconds=300)
+    assert list(first) == [1000]
+    assert crud.claim_notifications(10, lease_seconds=300) == {}
+
+    conn = get_connection()
+    conn.execute("UPDATE notification_outbox SET claimed_at = ?",
+                 ((datetime.now() - timedelta(minutes=10)).isoformat(),))
+    conn.commit()
+    conn.close()
+
+    recovered = crud.claim_notifications(10, lease_seconds=300)
+    assert [n.id for n in recovered[1000]] == [n.id for n in first[1000]]
+
+
+def test_failed_delivery_is_retried_later():
+    _add_due([1000])
+    ids = [n.id for n in crud.claim_notifications(10, lease_seconds=300)[1000]]
+    crud.fail_notifications(ids, "Serveur indisponible",
+                            (datetime.now() + timedelta(minutes=5)).isoformat())
+    assert crud.claim_notifications(10, lease_seconds=300) == {}
+
+    crud.fail_notifications(ids, "Adresse invalide")
+    assert crud.get_notification_counts() == {'FAILED': 3}
+
+
+def test_overdue_is_sent_once_across_purges(project, users):
+    member = users['jean.dupont']
+    task_id = crud.create_task(project, "Tâche en retard", assigned_to=member,
+                               deadline=date.today() - timedelta(days=2), user_id=member)
+    assert crud.enqueue_overdue_notifications() == 1
+    assert crud.enqueue_overdue_notifications() == 0
+
+    ids = [n.id for n in crud.claim_notifications(10, lease_seconds=300)[member]]
+    crud.finish_notifications(ids)
+    later = (datetime.now() + timedelta(days=60)).isoformat()
+    assert crud.purge_notifications(later) == 0
+    assert crud.enqueue_overdue_notifications() == 0
+
+    crud.update_task(task_id, member, status='COMPLETED')
+    assert crud.purge_notifications(later) == 1
+    assert _outbox("event = 'TASK_OVERDUE'") == []
@@ -0,0 +1,104 @@
+"""File des travaux d'export: prise atomique, réutilisation et expiration."""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import crud
+from database.db_setup import get_connection
+from services import job_service
+from utils.cache import invalidate
+
+
+@pytest.fixture(autouse=True)
+def empty_queue(monkeypatch):
+    """File vide, sans threads d'exécution: les tests exécutent les travaux eux-mêmes."""
+    monkeypatch.setattr(job_service.runner, 'start', lambda: None)
+    conn = get_connection()
+    conn.execute("DELETE FROM report_jobs")
+    conn.commit()
+    conn.close()
+
+
+def _set(job_id, **values):
+    conn = get_connection()
+    conn.execute(f"UPDATE report_jobs SET {', '.join(f'{k} = ?' for k in values)} WHERE id = ?",
+                 (*values.values(), job_id))
+    conn.commit()
+    conn.close()
+
+
+def test_claim_is_atomic_between_connections():
+    job_ids = {crud.create_report_job('projects_csv', json.dumps({'n': i})) for i in range(40)}
+    claimed, errors = [], []
+
+    def worker():
+        try:
+            while True:
+                job = crud.claim_report_job()
+                if job is None:
+                    return
+                claimed.append(job.id)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert sorted(claimed) == sorted(job_ids)
+    assert {job.status for job in map(crud.get_report_job, job_ids)} == {'RUNNING'}
+
+
+def test_identical_request_reuses_job(users):
+    first = job_service.submit_report_job('projects_csv', {}, users['admin'], "projets.csv")
+    assert job_service.submit_report_job('projects_csv', {}, users['admin'], "projets.csv") == first
+    assert job_service.submit_report_job('projects_csv', {}, users['chef.projet']) != first
+
+    job_service.runner.run_pending()
+    assert job_service.submit_report_job('projects_csv', {}, users['admin']) == first
+
+    invalidate('projects')
+    assert job_service.submit_report_job('projects_csv', {}, users['admin']) != first
+
+
+def test_done_job_serves_its_file(users):
+    job_id = job_service.submit_report_job('projects_csv', {}, users['admin'])
+    job_service.runner.run_pending()
+
+    job = job_service.get_report_job(job_id)
+    assert job.status == 'DONE'
+    data = job_service.read_job_artifact(job_id)
+    assert data.startswith(b'ID,Nom,') and len(data) == job.artifact_size
+
+
+def test_evicted_file_expires_job(users):
+    job_id = job_service.submit_report_job('projects_csv', {}, users['admin'])
+    job_service.runner.run_pending()
+    os.remove(crud.get_report_job(job_id).artifact_path)
+
+    assert job_service.get_report_job(job_id).status == 'EXPIRED'
+    assert job_service.read_job_artifact(job_id) is None
+    assert job_service.submit_report_job('projects_csv', {}, users['admin']) != job_id
+
+
+def test_cleanup_expires_old_and_abandons_stale_jobs(users):
+    done = job_service.submit_report_job('projects_csv', {}, users['admin'])
+    job_service.runner.run_pending()
+    stale = crud.create_report_job('team_performance_csv', '{}')
+    crud.claim_report_job()
+    past = (datetime.now() - timedelta(days=1)).isoformat()
+    _set(done, expires_at=past)
+    _set(stale, heartbeat_at=past)
+
+    assert job_service.runner.cleanup() == 1
+
+    assert crud.get_report_job(done).status == 'EXPIRED'
+    assert crud.get_report_job(stale).status == 'FAILED'
+    assert crud.claim_report_job() is None
@@ -0,0 +1,41 @@
+"""Chargement concurrent des sections: erreurs, délais, portée et connexions."""
+
+import time
+
+from database.db_setup import get_connection, read_snapshot
+from utils.cache import current_scope, is_cache_bypassed, scope_context
+from utils.section_loader import load_all_sections
+
+
+def test_errors_and_timeouts_are_reported_per_section():
+    def broken():
+        raise ValueError("section cassée")
+
+    results = load_all_sections({
+        'slow': lambda: time.sleep(0.5),
+        'broken': broken,
+        'fast': lambda: 42
+    }, timeout=5, timeouts={'slow': 0.05})
+
+    assert results['slow'].timed_out and not results['slow'].ok
+    assert isinstance(results['broken'].error, ValueError)
+    assert results['fast'].ok and results['fast'].value == 42
+    # Le délai d'une section n'est pas celui des autres
+    assert results['fast'].seconds < 0.5
+
+
+def test_caller_context_is_carried_into_workers():
+    def own_connection(snapshot):
+        conn = get_connection()
+        conn.close()
+        return conn is not snapshot
+
+    with scope_context('admin'), read_snapshot() as snapshot:
+        results = load_all_sections({
+            'context': lambda: (current_scope(), is_cache_bypassed()),
+            'connection': lambda: own_connection(snapshot)
+        })
+
+    assert results['context'].value == ('admin', True)
+    # Chaque appel ouvre sa propre connexion, pas celle de l'instantané
+    assert results['connection'].value is True
@@ -0,0 +1,239 @@
+"""
+Cache des fichiers d'export (PDF, CSV, sauvegardes) adressé par contenu.
+
+Un fichier est identifié par (type d'export, paramètres, version des tables
+lues): tant que les données n'ont pas changé, le même export est relu au
+lieu d'être reconstruit, pour toutes les sessions et tous les processus.
+Les fichiers sont stockés sur disque sous leur empreinte SHA-256 (deux
+versions au contenu identique partagent un seul fichier) et relus par
+projection en mémoire (mmap).
+
+L'index est un fichier SQLite du répertoire du cache. La taille totale est
+bornée par ARTIFACT_CACHE_MAX_BYTES: les clés les moins récemment lues sont
+évincées, puis les fichiers qui ne sont plus référencés.
+"""
+
+import hashlib
+import json
+import mmap
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Optional
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.cache import change_token
+from config import ARTIFACT_CACHE_DIR, ARTIFACT_CACHE_MAX_BYTES
+
+
+@dataclass(frozen=True)
+class Artifact:
+    """Fichier d'export stocké dans le cache."""
+    path: str
+    sha256: str
+    size: int
+
+
+class ArtifactCache:
+    """Index SQLite (clé -> empreinte) et fichiers nommés par empreinte."""
+
+    def __init__(self, directory: str = ARTIFACT_CACHE_DIR,
+                 max_bytes: int = ARTIFACT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._conn = None
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'builds': 0, 'deduplicated': 0,
+                       'evictions': 0, 'bytes_served': 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.directory, 'index.db'), timeout=5,
+                                   check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS artifact_blobs (
+                    sha256 TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS artifact_keys (
+                    key TEXT PRIMARY KEY,
+                    sha256 TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_artifact_keys_access ON artifact_keys(last_access)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_artifact_keys_sha ON artifact_keys(sha256)")
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def make_key(kind: str, params: Dict[str, Any], version) -> str:
+        """Clé d'un export: type, paramètres et version des données."""
+        return json.dumps([kind, params or {}, version], sort_keys=True, default=str)
+
+    def lookup(self, key: str) -> Optional[Artifact]:
+        """Retourne l'export en cache pour la clé (None si absent)."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute('''
+                SELECT b.sha256, b.path, b.size
+                FROM artifact_keys k JOIN artifact_blobs b ON b.sha256 = k.sha256
+                WHERE k.key = ?
+            ''', (key,)).fetchone()
+            if row is None or not os.path.exists(row[1]):
+                self._stats['misses'] += 1
+                return None
+            conn.execute("UPDATE artifact_keys SET last_access = ?, hits = hits + 1 WHERE key = ?",
+                         (now, key))
+            self._stats['hits'] += 1
+            return Artifact(path=row[1], sha256=row[0], size=row[2])
+
+    def store(self, key: str, source: str, suffix: str = '') -> Artifact:
+        """
+        Ajoute un fichier au cache (déplacé, ou supprimé si son contenu y est déjà).
+        """
+        digest = hashlib.sha256()
+        with open(source, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        sha256 = digest.hexdigest()
+        size = os.path.getsize(source)
+        path = os.path.join(self.directory, sha256[:2], sha256 + suffix)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if os.path.exists(path):
+                    os.remove(source)
+                    self._stats['deduplicated'] += 1
+                else:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.replace(source, path)
+                conn.execute('''
+                    INSERT OR IGNORE INTO artifact_blobs (sha256, path, size, created_at)
+                    VALUES (?, ?, ?, ?)
+                ''', (sha256, path, size, now))
+                conn.execute('''
+                    INSERT OR REPLACE INTO artifact_keys (key, sha256, created_at, last_access)
+                    VALUES (?, ?, ?, ?)
+                ''', (key, sha256, now, now))
+                self._evict(conn, keep=sha256)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return Artifact(path=path, sha256=sha256, size=size)
+
+    def _evict(self, conn: sqlite3.Connection, keep: str):
+        """Évince les clés les moins récemment lues au-delà de max_bytes."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifact_blobs").fetchone()[0]
+        while total > self.max_bytes:
+            oldest = conn.execute('''
+                SELECT key, sha256 FROM artifact_keys WHERE sha256 != ?
+                ORDER BY last_access LIMIT 1
+            ''', (keep,)).fetchone()
+            if oldest is None:
+                break
+            conn.execute("DELETE FROM artifact_keys WHERE key = ?", (oldest[0],))
+            self._stats['evictions'] += 1
+            referenced = conn.execute(
+                "SELECT 1 FROM artifact_keys WHERE sha256 = ? LIMIT 1", (oldest[1],)
+            ).fetchone()
+            if referenced is None:
+                blob = conn.execute(
+                    "SELECT path, size FROM artifact_blobs WHERE sha256 = ?", (oldest[1],)
+                ).fetchone()
+                conn.execute("DELETE FROM artifact_blobs WHERE sha256 = ?", (oldest[1],))
+                if blob is not None:
+                    total -= blob[1]
+                    try:
+                        os.remove(blob[0])
+                    except OSError:
+                        pass
+
+    def get_or_build(self, kind: str, params: Dict[str, Any], tags: Iterable[str],
+                     write: Callable[[BinaryIO], None], suffix: str = '') -> Artifact:
+        """
+        Retourne l'export en cache, ou l'écrit avec write(fichier) et le met en cache.
+
+        La version des données est le jeton de modification des tags, lu
+        avant la construction: si les données changent pendant l'écriture,
+        l'export sera simplement reconstruit à la prochaine demande.
+        """
+        token = change_token(*tags)
+        # Sans jeton de version, l'export ne peut pas être retrouvé: clé unique
+        version = repr(token) if token is not None else f"sans-version-{uuid.uuid4().hex}"
+        key = self.make_key(kind, params, version)
+        artifact = self.lookup(key)
+        if artifact is not None:
+            return artifact
+        os.makedirs(self.directory, exist_ok=True)
+        fd, partial = tempfile.mkstemp(suffix='.part', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                write(out)
+            artifact = self.store(key, partial, suffix)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        self._stats['builds'] += 1
+        return artifact
+
+    def read_bytes(self, path: str) -> Optional[bytes]:
+        """Contenu d'un fichier du cache, lu par projection en mémoire (None s'il a été évincé)."""
+        try:
+            with open(path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    return b''
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    data = mapped[:]
+        except OSError:
+            return None
+        self._stats['bytes_served'] += len(data)
+        return data
+
+    def clear(self):
+        """Vide le cache (index et fichiers)."""
+        with self._lock:
+            conn = self._connection()
+            paths = [row[0] for row in conn.execute("SELECT path FROM artifact_blobs")]
+            conn.execute("DELETE FROM artifact_keys")
+            conn.execute("DELETE FROM artifact_blobs")
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs locaux, taux de succès, et taille du cache sur disque."""
+        stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups * 100, 1) if lookups else 0.0
+        with self._lock:
+            conn = self._connection()
+            stats['keys'] = conn.execute("SELECT COUNT(*) FROM artifact_keys").fetchone()[0]
+            stats['files'], stats['bytes'] = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifact_blobs"
+            ).fetchone()
+        return stats
+
+
+artifact_cache = ArtifactCache()
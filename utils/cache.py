@@ -0,0 +1,478 @@
+"""
+Cache de lecture des services (LRU + TTL) invalidé par les écritures.
+
+Les fonctions de lecture des services sont décorées avec @cached(*tags):
+les tags désignent les tables lues. Les fonctions d'écriture du module
+crud incrémentent le compteur de leurs tags dans la table change_counters
+dans la transaction de l'écriture (bump_versions): les données et leur
+version sont validées ensemble, ou pas du tout. Après la validation,
+invalidated() supprime les entrées locales portant l'un de ces tags.
+
+Chaque entrée mémorise la version de ses tags au moment du calcul: une
+écriture faite par un autre processus rend donc l'entrée obsolète. Les
+versions sont relues seulement quand PRAGMA data_version signale une
+écriture d'une autre connexion.
+
+Avec @cached(..., shared=True), le résultat est aussi stocké dans un
+fichier SQLite commun (SHARED_CACHE_PATH) et réutilisé par les autres
+processus Streamlit du même hôte.
+
+Les valeurs en cache sont partagées entre les sessions: elles doivent
+être traitées en lecture seule par les appelants.
+"""
+
+import functools
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Optional
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    READ_CACHE_ENABLED, READ_CACHE_MAX_ENTRIES, READ_CACHE_TTL_SECONDS,
+    SHARED_CACHE_ENABLED, SHARED_CACHE_PATH, SHARED_CACHE_MAX_BYTES
+)
+
+
+class ReadCache:
+    """Cache LRU avec expiration, index de tags et compteurs."""
+
+    def __init__(self, max_entries: int = READ_CACHE_MAX_ENTRIES,
+                 ttl: float = READ_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # clé -> (valeur, expiration, tags, versions)
+        self._tags = {}                 # tag -> ensemble de clés
+        self._lock = threading.RLock()
+        # Incrémenté à chaque invalidation: un résultat calculé pendant une
+        # écriture concurrente n'est pas mis en cache
+        self.generation = 0
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0,
+                       'expirations': 0, 'invalidations': 0, 'stale': 0}
+
+    def get(self, key, versions: tuple = None) -> tuple:
+        """Retourne (trouvé, valeur); une entrée calculée avec d'autres versions est obsolète."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return False, None
+            value, expires_at, _, entry_versions = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return False, None
+            if entry_versions != versions:
+                self._remove(key)
+                self._stats['stale'] += 1
+                self._stats['misses'] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return True, value
+
+    def set(self, key, value, tags: Iterable[str] = (), ttl: float = None,
+            generation: int = None, versions: tuple = None):
+        """Ajoute une entrée, en évinçant les moins récemment utilisées."""
+        tags = frozenset(tags)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + (ttl or self.ttl), tags, versions)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, *tags: str) -> int:
+        """Supprime les entrées portant l'un des tags; retourne leur nombre."""
+        removed = 0
+        with self._lock:
+            self.generation += 1
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+                    removed += 1
+            self._stats['invalidations'] += removed
+        return removed
+
+    def clear(self):
+        """Vide le cache (les compteurs sont conservés)."""
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs du cache et taux de succès."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups * 100, 1) if lookups else 0.0
+        return stats
+
+    def _remove(self, key):
+        """Retire une entrée et ses références de tags (verrou déjà pris)."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class VersionTracker:
+    """
+    Versions des tags (table change_counters), partagées par tous les processus.
+
+    PRAGMA data_version change dès qu'une autre connexion a écrit dans la
+    base: tant qu'il ne change pas, les versions connues restent valides et
+    aucune lecture de change_counters n'est nécessaire.
+    """
+
+    def __init__(self):
+        self._conn = None
+        self._data_version = None
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def versions(self, tags: Iterable[str]) -> Optional[tuple]:
+        """Retourne les versions des tags, ou None si elles sont indisponibles."""
+        with self._lock:
+            try:
+                if self._conn is None:
+                    from database import db_setup
+                    self._conn = sqlite3.connect(db_setup.DATABASE_PATH, check_same_thread=False)
+                data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+                if data_version != self._data_version:
+                    self._versions = dict(
+                        self._conn.execute("SELECT tag, version FROM change_counters").fetchall()
+                    )
+                    self._data_version = data_version
+            except sqlite3.Error:
+                return None
+            return tuple(self._versions.get(tag, 0) for tag in tags)
+
+    def bump(self, tags: Iterable[str], cursor=None):
+        """
+        Incrémente les compteurs des tags, dans la transaction de l'appelant
+        si un curseur est donné (sinon dans une transaction dédiée).
+
+        Une erreur est propagée: avec un curseur, elle annule l'écriture de
+        l'appelant, qui ne peut donc pas être validée sans changer de version.
+        """
+        query = '''
+            INSERT INTO change_counters (tag, version) VALUES (?, 1)
+            ON CONFLICT (tag) DO UPDATE SET version = version + 1
+        '''
+        if cursor is not None:
+            cursor.executemany(query, [(tag,) for tag in tags])
+            return
+        from database.db_setup import get_connection
+        conn = get_connection(use_snapshot=False)
+        try:
+            conn.executemany(query, [(tag,) for tag in tags])
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+
+class SharedCache:
+    """
+    Cache commun aux processus, stocké dans un fichier SQLite (mode WAL).
+
+    Chaque écriture est atomique (une transaction) et la taille totale est
+    bornée par max_bytes: les entrées les moins récemment lues sont
+    évincées. Une erreur du cache partagé n'empêche jamais la lecture:
+    elle est traitée comme un échec de cache.
+    """
+
+    def __init__(self, path: str = SHARED_CACHE_PATH, max_bytes: int = SHARED_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._conn = None
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'errors': 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False,
+                                   isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS shared_cache (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    versions TEXT,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_shared_cache_access ON shared_cache(last_access)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str, versions: tuple) -> tuple:
+        """Retourne (trouvé, valeur)."""
+        with self._lock:
+            try:
+                conn = self._connection()
+                row = conn.execute(
+                    "SELECT value, versions, expires_at, last_access FROM shared_cache WHERE key = ?",
+                    (key,)
+                ).fetchone()
+                now = time.time()
+                if row is None or row[2] <= now or row[1] != json.dumps(versions):
+                    if row is not None:
+                        conn.execute("DELETE FROM shared_cache WHERE key = ?", (key,))
+                    self._stats['misses'] += 1
+                    return False, None
+                value = pickle.loads(row[0])
+                # La date de dernier accès n'est rafraîchie qu'au plus une fois par seconde
+                if now - row[3] > 1:
+                    conn.execute("UPDATE shared_cache SET last_access = ? WHERE key = ?", (now, key))
+                self._stats['hits'] += 1
+                return True, value
+            except (sqlite3.Error, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                self._stats['errors'] += 1
+                return False, None
+
+    def set(self, key: str, value, versions: tuple, ttl: float):
+        """Stocke une valeur et évince les entrées les plus anciennes au-delà de max_bytes."""
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            self._stats['errors'] += 1
+            return
+        if len(data) > self.max_bytes // 4:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute('''
+                    INSERT OR REPLACE INTO shared_cache (key, value, versions, size, expires_at, last_access)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (key, data, json.dumps(versions), len(data), now + ttl, now))
+                conn.execute("DELETE FROM shared_cache WHERE expires_at <= ?", (now,))
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM shared_cache").fetchone()[0]
+                while total > self.max_bytes:
+                    oldest = conn.execute(
+                        "SELECT key, size FROM shared_cache ORDER BY last_access LIMIT 1"
+                    ).fetchone()
+                    conn.execute("DELETE FROM shared_cache WHERE key = ?", (oldest[0],))
+                    total -= oldest[1]
+                    self._stats['evictions'] += 1
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._stats['errors'] += 1
+                try:
+                    self._conn.execute("ROLLBACK")
+                except (sqlite3.Error, AttributeError):
+                    pass
+
+    def clear(self):
+        """Vide le cache partagé (pour tous les processus)."""
+        with self._lock:
+            try:
+                self._connection().execute("DELETE FROM shared_cache")
+            except sqlite3.Error:
+                self._stats['errors'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs locaux et taille du cache partagé."""
+        stats = dict(self._stats)
+        with self._lock:
+            try:
+                count, size = self._connection().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM shared_cache"
+                ).fetchone()
+            except sqlite3.Error:
+                count, size = 0, 0
+        stats['size'] = count
+        stats['bytes'] = size
+        return stats
+
+
+read_cache = ReadCache()
+version_tracker = VersionTracker()
+shared_cache = SharedCache()
+
+_local = threading.local()
+_MISSING = object()
+_scope_provider: Optional[Callable[[], Any]] = None
+_invalidation_listeners = []
+
+
+def set_scope_provider(provider: Callable[[], Any]):
+    """Définit la fonction qui retourne la portée (rôle) incluse dans les clés."""
+    global _scope_provider
+    _scope_provider = provider
+
+
+def current_scope():
+    """Portée courante: celle fixée par scope_context() dans ce thread, sinon le fournisseur."""
+    if hasattr(_local, 'scope'):
+        return _local.scope
+    if _scope_provider is None:
+        return None
+    try:
+        return _scope_provider()
+    except Exception:
+        return None
+
+
+@contextmanager
+def scope_context(scope):
+    """Fixe la portée des clés dans le thread courant (threads de travail)."""
+    previous = getattr(_local, 'scope', _MISSING)
+    _local.scope = scope
+    try:
+        yield
+    finally:
+        if previous is _MISSING:
+            del _local.scope
+        else:
+            _local.scope = previous
+
+
+def is_cache_bypassed() -> bool:
+    """Indique si le cache est désactivé (configuration ou contexte courant)."""
+    return not READ_CACHE_ENABLED or getattr(_local, 'bypass', 0) > 0
+
+
+@contextmanager
+def cache_bypass():
+    """Contexte dans lequel les lectures ignorent le cache (débogage)."""
+    _local.bypass = getattr(_local, 'bypass', 0) + 1
+    try:
+        yield
+    finally:
+        _local.bypass -= 1
+
+
+def _make_key(name: str, args: tuple, kwargs: dict):
+    key = (name, current_scope(), args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        key = repr(key)
+    return key
+
+
+def cached(*tags: str, ttl: float = None, shared: bool = False):
+    """
+    Met en cache le résultat d'une fonction de lecture.
+
+    Args:
+        tags: tables lues par la fonction (invalidation par les écritures)
+        ttl: durée de vie en secondes (par défaut READ_CACHE_TTL_SECONDS)
+        shared: partager aussi le résultat avec les autres processus
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if is_cache_bypassed():
+                return func(*args, **kwargs)
+            key = _make_key(name, args, kwargs)
+            versions = version_tracker.versions(tags)
+            found, value = read_cache.get(key, versions)
+            if found:
+                return value
+            use_shared = shared and SHARED_CACHE_ENABLED and versions is not None
+            generation = read_cache.generation
+            if use_shared:
+                found, value = shared_cache.get(repr(key), versions)
+                if found:
+                    read_cache.set(key, value, tags, ttl, generation, versions)
+                    return value
+            value = func(*args, **kwargs)
+            read_cache.set(key, value, tags, ttl, generation, versions)
+            if use_shared:
+                shared_cache.set(repr(key), value, versions, ttl or read_cache.ttl)
+            return value
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
+
+
+def add_invalidation_listener(listener: Callable[[tuple], None]):
+    """Enregistre une fonction appelée avec les tags de chaque écriture."""
+    _invalidation_listeners.append(listener)
+
+
+def bump_versions(cursor, *tags: str):
+    """
+    Incrémente les versions des tags dans la transaction d'écriture de
+    l'appelant (à appeler juste avant commit); appeler invalidated après
+    la validation.
+    """
+    version_tracker.bump(tags, cursor)
+
+
+def invalidated(*tags: str):
+    """Invalide les tags dans le cache local et prévient les abonnés (versions déjà incrémentées)."""
+    read_cache.invalidate(*tags)
+    for listener in _invalidation_listeners:
+        listener(tags)
+
+
+def change_token(*tags: str) -> Optional[tuple]:
+    """
+    Jeton de modification des tags: il change dès qu'une écriture touche
+    l'une des tables (quel que soit le processus). Coût: un PRAGMA.
+    """
+    return version_tracker.versions(tags)
+
+
+def invalidate(*tags: str) -> int:
+    """
+    Invalide explicitement des tags (dans tous les processus).
+
+    Les caches locaux sont vidés avant l'incrément des versions, qui lève
+    une exception s'il échoue.
+    """
+    removed = read_cache.invalidate(*tags)
+    for listener in _invalidation_listeners:
+        listener(tags)
+    version_tracker.bump(tags)
+    return removed
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Compteurs du cache de lecture local et du cache partagé ('shared')."""
+    stats = read_cache.stats()
+    stats['shared'] = shared_cache.stats() if SHARED_CACHE_ENABLED else None
+    return stats
+
+
+def clear_cache():
+    """Vide le cache de lecture local et le cache partagé."""
+    read_cache.clear()
+    if SHARED_CACHE_ENABLED:
+        shared_cache.clear()
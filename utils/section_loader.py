@@ -0,0 +1,112 @@
+"""
+Chargement concurrent des sections indépendantes d'une page.
+
+Les appels de service d'une page sont lancés ensemble dans un pool de
+threads. Chaque appel ouvre ses propres connexions SQLite dans son thread
+(jamais le read_snapshot() de l'appelant), et le module sqlite3 libère le
+GIL pendant l'exécution des requêtes: les agrégats de plusieurs sections
+s'exécutent donc en parallèle sur un hôte multi-cœur. Les résultats sont
+produits dans l'ordre où ils arrivent, avec un délai maximal par appel et
+la durée de chaque section.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.cache import current_scope, scope_context, is_cache_bypassed, cache_bypass
+from database.identity_map import current_identity_map, request_scope
+from config import SECTION_LOADER_WORKERS, SECTION_TIMEOUT_SECONDS
+
+
+_executor = ThreadPoolExecutor(max_workers=SECTION_LOADER_WORKERS, thread_name_prefix="section")
+
+
+@dataclass
+class SectionResult:
+    """Résultat du chargement d'une section."""
+    name: str
+    value: Any = None
+    error: Optional[BaseException] = None
+    seconds: float = 0.0
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.timed_out
+
+
+def _run(func: Callable[[], Any], scope, bypass: bool, identity_map) -> tuple:
+    """
+    Exécute un appel dans un thread du pool avec la portée de cache et la
+    carte d'identité de l'appelant.
+    """
+    started = time.perf_counter()
+    with scope_context(scope), request_scope(identity_map):
+        if bypass:
+            with cache_bypass():
+                value = func()
+        else:
+            value = func()
+    return value, time.perf_counter() - started
+
+
+def load_sections(calls: Dict[str, Callable[[], Any]], timeout: float = SECTION_TIMEOUT_SECONDS,
+                  timeouts: Dict[str, float] = None) -> Iterator[SectionResult]:
+    """
+    Lance les appels en parallèle et produit les résultats au fur et à mesure.
+
+    Args:
+        calls: fonctions sans argument, par nom de section
+        timeout: délai maximal par appel (secondes)
+        timeouts: délais spécifiques par section
+
+    Yields:
+        SectionResult dans l'ordre de complétion; une exception est conservée
+        dans error, et un appel qui dépasse son délai produit un résultat
+        timed_out (le thread termine en arrière-plan).
+    """
+    timeouts = timeouts or {}
+    scope, bypass, identity_map = current_scope(), is_cache_bypassed(), current_identity_map()
+    started = time.perf_counter()
+    pending = {
+        _executor.submit(_run, func, scope, bypass, identity_map): name
+        for name, func in calls.items()
+    }
+    deadlines = {future: started + timeouts.get(name, timeout) for future, name in pending.items()}
+
+    while pending:
+        next_deadline = min(deadlines[f] for f in pending)
+        done, _ = wait(pending, timeout=max(next_deadline - time.perf_counter(), 0),
+                       return_when=FIRST_COMPLETED)
+        for future in done:
+            name = pending.pop(future)
+            try:
+                value, seconds = future.result()
+                yield SectionResult(name, value=value, seconds=seconds)
+            except Exception as e:
+                yield SectionResult(name, error=e, seconds=time.perf_counter() - started)
+        now = time.perf_counter()
+        for future in [f for f in pending if deadlines[f] <= now]:
+            name = pending.pop(future)
+            future.cancel()
+            yield SectionResult(name, seconds=now - started, timed_out=True)
+
+
+def load_all_sections(calls: Dict[str, Callable[[], Any]], timeout: float = SECTION_TIMEOUT_SECONDS,
+                      timeouts: Dict[str, float] = None) -> Dict[str, SectionResult]:
+    """Charge toutes les sections en parallèle et retourne les résultats par nom."""
+    return {r.name: r for r in load_sections(calls, timeout, timeouts)}
+
+
+def format_timings(results) -> str:
+    """Résumé lisible des durées de chargement par section."""
+    parts = []
+    for r in results:
+        status = " (délai dépassé)" if r.timed_out else " (erreur)" if r.error else ""
+        parts.append(f"{r.name}: {r.seconds * 1000:.0f} ms{status}")
+    return " · ".join(parts)